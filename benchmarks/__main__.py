@@ -0,0 +1,55 @@
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.runner import compare_with_baseline, merge_baseline, results_to_dict, run_all
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_MODULES = ["benchmarks.bench_database", "benchmarks.bench_recovery"]
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="BookStorage benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", dest="pattern", help="Run only benchmarks containing this")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--output", type=Path, default=Path("bench_output.json"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as the new baseline"
+    )
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+
+    results = run_all(args.sizes, args.repeat, args.pattern)
+    report = results_to_dict(results)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        if args.baseline.exists():
+            report = merge_baseline(json.loads(args.baseline.read_text()), report)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}, skipping comparison")
+        return 0
+
+    regressions = compare_with_baseline(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"\n{len(results)} benchmarks, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
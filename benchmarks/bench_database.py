@@ -0,0 +1,260 @@
+from pathlib import Path
+from typing import Any
+
+from benchmarks.runner import Case, benchmark
+from src.core.domain.book import BookStatus
+from src.core.dto.book_dto import BookDTO
+from src.core.service.book_service import BookService
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.database.json_database import JsonDatabase, SimpleDatabase
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
+from src.infrastructure.util import object_to_dict
+
+MUTATIONS = 5
+LOOKUPS = 10_000
+TRANSACTIONS_IN_LOG = 100
+
+
+def make_book(i: int) -> dict[str, Any]:
+    return {
+        "title": f"title {i}",
+        "author": f"author {i % 1000}",
+        "year": 1900 + i % 120,
+        "status": BookStatus.IN_STOCK,
+    }
+
+
+def seeded_json_database(size: int, workdir: Path) -> JsonDatabase:
+    database = JsonDatabase(str(workdir / "data.json"), WriteAheadLog(str(workdir / "wal.json")))
+    database.data = {i: make_book(i) for i in range(size)}
+    database._next_id = size
+    return database
+
+
+def seeded_log(size: int) -> dict[int, dict[int, dict[str, Any]]]:
+    per_transaction = max(size // TRANSACTIONS_IN_LOG, 1)
+    log: dict[int, dict[int, dict[str, Any]]] = {}
+    for key in range(size):
+        tid = key // per_transaction
+        log.setdefault(tid, {})[key] = {"operation": "create", "key": key, "value": make_book(key)}
+    return log
+
+
+@benchmark("json_database.create")
+def json_database_create(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    return Case(lambda: [database.create(make_book(i)) for i in range(MUTATIONS)], MUTATIONS)
+
+
+@benchmark("json_database.set")
+def json_database_set(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    return Case(
+        lambda: [database.set(i % size, make_book(i + 1)) for i in range(MUTATIONS)], MUTATIONS
+    )
+
+
+@benchmark("json_database.delete")
+def json_database_delete(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    return Case(lambda: [database.delete(i) for i in range(min(MUTATIONS, size))], MUTATIONS)
+
+
+@benchmark("json_database.get")
+def json_database_get(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    return Case(lambda: [database.get(i % size) for i in range(LOOKUPS)], LOOKUPS)
+
+
+def transaction_commit(operations: int):
+    def factory(size: int, workdir: Path) -> Case:
+        database = seeded_json_database(size, workdir)
+        transaction = database.begin_transaction()
+        for i in range(operations):
+            transaction.set(i % size, make_book(i + 1))
+        return Case(transaction.commit, operations)
+
+    return factory
+
+
+for operations in (1, 100, 10_000):
+    benchmark(f"transaction.commit[{operations}]")(transaction_commit(operations))
+
+
+@benchmark("transaction.bulk_create")
+def transaction_bulk_create(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(0, workdir)
+
+    def run() -> str:
+        transaction = Transaction(database.next_tid, database)
+        for i in range(size):
+            transaction.create(make_book(i))
+        return transaction.to_json()
+
+    return Case(run, size)
+
+
+@benchmark("wal.write_log")
+def wal_write_log(size: int, workdir: Path) -> Case:
+    wal = WriteAheadLog(str(workdir / "wal.json"))
+    wal._log = seeded_log(size)
+    database = SimpleDatabase(SimpleWAL())
+    transaction = database.begin_transaction()
+    transaction.tid = len(wal._log)
+    transaction.create(make_book(0))
+    return Case(lambda: wal.write_log(transaction), 1)
+
+
+@benchmark("wal.apply_log")
+def wal_apply_log(size: int, workdir: Path) -> Case:
+    wal = WriteAheadLog(str(workdir / "wal.json"))
+    wal._log = seeded_log(size)
+    database = SimpleDatabase(SimpleWAL())
+    return Case(lambda: wal.apply_log(database), size)
+
+
+@benchmark("book_service.get_set_status")
+def book_service_end_to_end(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    service = BookService(BookRepository())
+
+    def run():
+        for i in range(MUTATIONS):
+            session = database.begin_transaction()
+            service.get(i % size, session)
+            service.set_status(i % size, BookStatus.ISSUED, session)
+            session.commit()
+
+    return Case(run, MUTATIONS)
+
+
+@benchmark("book_service.stats")
+def book_service_stats(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    database.create_aggregates()
+    service = BookService(BookRepository())
+    session = Transaction(database.next_tid, database)
+    return Case(lambda: [service.stats(10, session) for _ in range(MUTATIONS)], MUTATIONS)
+
+
+def stats_in_new_process(cached: bool):
+    def factory(size: int, workdir: Path) -> Case:
+        cache = str(workdir / "data.cache") if cached else None
+
+        def open_database() -> JsonDatabase:
+            wal = WriteAheadLog(str(workdir / "wal.json"))
+            return JsonDatabase(str(workdir / "data.json"), wal, state_cache_filepath=cache)
+
+        database = open_database()
+        database.data = {i: make_book(i) for i in range(size)}
+        database._next_id = size
+        database.create_aggregates()
+        database.checkpoint()
+        service = BookService(BookRepository())
+
+        def run():
+            # What one CLI `stats books` call pays: the views are rebuilt by a scan unless the
+            # state cache brings them back with the records.
+            reopened = open_database()
+            service.stats(10, Transaction(reopened.next_tid, reopened))
+
+        return Case(run, 1)
+
+    return factory
+
+
+benchmark("book_service.stats_new_process")(stats_in_new_process(False))
+benchmark("book_service.stats_new_process_state_cache")(stats_in_new_process(True))
+
+
+@benchmark("convert.get_book")
+def convert_get_book(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    service = BookService(BookRepository())
+    session = Transaction(database.next_tid, database)
+    return Case(lambda: [service.get(i % size, session) for i in range(LOOKUPS)], LOOKUPS)
+
+
+@benchmark("convert.encode_book")
+def convert_encode_book(size: int, workdir: Path) -> Case:
+    books = [BookDTO(**make_book(i)) for i in range(LOOKUPS)]
+    return Case(lambda: [object_to_dict(book) for book in books], LOOKUPS)
+
+
+@benchmark("transaction.repeated_sets")
+def transaction_repeated_sets(size: int, workdir: Path) -> Case:
+    database = seeded_json_database(size, workdir)
+    operations = MUTATIONS * 20
+
+    def run() -> None:
+        transaction = Transaction(database.next_tid, database)
+        for i in range(operations):
+            transaction.set(i % MUTATIONS % size, make_book(i))
+        transaction.commit()
+
+    return Case(run, operations)
+
+
+def checkpoint_after_changes(change_rate: float, delta: bool):
+    def factory(size: int, workdir: Path) -> Case:
+        database = JsonDatabase(
+            str(workdir / "data.json"),
+            WriteAheadLog(str(workdir / "wal.json")),
+            delta_merge_ratio=1e9,
+        )
+        database.data = {i: make_book(i) for i in range(size)}
+        database._next_id = size
+        database.delta_merge_ratio = None
+        database.checkpoint()
+        database.delta_merge_ratio = 1e9 if delta else None
+        changed = max(int(size * change_rate), 1)
+
+        def run() -> None:
+            keys = range(min(changed, size))
+            for key in keys:
+                database.data[key] = make_book(key + 1)
+            database.notify_commit(keys)
+            database.checkpoint()
+
+        return Case(run, 1)
+
+    return factory
+
+
+for change_rate in (0.001, 0.01, 0.1):
+    benchmark(f"checkpoint.delta[{change_rate}]")(checkpoint_after_changes(change_rate, True))
+benchmark("checkpoint.full")(checkpoint_after_changes(0.01, False))
+
+
+def cold_start(cached: bool):
+    def factory(size: int, workdir: Path) -> Case:
+        cache = str(workdir / "data.cache") if cached else None
+        database = seeded_json_database(size, workdir)
+        database.checkpoint()
+        for n in range(TRANSACTIONS_IN_LOG):
+            transaction = Transaction(database.next_tid, database)
+            transaction.set(n % size, make_book(n + 1))
+            transaction.commit()
+        if cached:
+            # Warm the cache the way the first start after a checkpoint does.
+            JsonDatabase(
+                str(workdir / "data.json"),
+                WriteAheadLog(str(workdir / "wal.json")),
+                state_cache_filepath=cache,
+            )
+
+        def run() -> None:
+            JsonDatabase(
+                str(workdir / "data.json"),
+                WriteAheadLog(str(workdir / "wal.json")),
+                state_cache_filepath=cache,
+            )
+
+        return Case(run, 1)
+
+    return factory
+
+
+benchmark("startup.json")(cold_start(False))
+benchmark("startup.state_cache")(cold_start(True))
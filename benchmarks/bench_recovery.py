@@ -0,0 +1,82 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from benchmarks.bench_database import make_book
+from benchmarks.runner import Case, benchmark
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.recovery import recover
+from src.infrastructure.database.segmented_wal import CODECS, Segment, SegmentedWriteAheadLog
+from src.infrastructure.database.transaction import TransactionFactory
+from src.infrastructure.database.write_ahead_logger import SimpleWAL
+
+OPERATIONS_PER_TRANSACTION = 100
+SEGMENTS = 16
+
+
+def status_heavy_log(size: int) -> list[tuple[int, dict[int, dict[str, Any]]]]:
+    records = max(size // 10, 1)
+    operations: list[dict[str, Any]] = [
+        {"operation": "create", "key": key, "value": make_book(key)} for key in range(records)
+    ]
+    statuses = ("issued", "in_stock")
+    for lsn in range(records, size):
+        key = (lsn * 7919) % records
+        if lsn % 50 == 0:
+            operations.append({"operation": "delete", "key": key})
+        else:
+            operations.append(
+                {"operation": "set", "key": key, "changes": {"status": statuses[lsn % 2]}}
+            )
+    log = []
+    for tid, start in enumerate(range(0, len(operations), OPERATIONS_PER_TRANSACTION)):
+        chunk = operations[start : start + OPERATIONS_PER_TRANSACTION]
+        log.append((tid, {start + i: operation for i, operation in enumerate(chunk)}))
+    return log
+
+
+@benchmark("recovery.fold_apply")
+def fold_apply(size: int, workdir: Path) -> Case:
+    log = status_heavy_log(size)
+    database = SimpleDatabase(SimpleWAL())
+    return Case(lambda: recover(database, log), size)
+
+
+@benchmark("recovery.sequential_replay", max_size=100_000)
+def sequential_replay(size: int, workdir: Path) -> Case:
+    log = status_heavy_log(size)
+    database = SimpleDatabase(SimpleWAL())
+
+    def run():
+        for tid, operations in log:
+            TransactionFactory.create(tid, database, operations).commit(with_wal=False)
+
+    return Case(run, size)
+
+
+def write_segments(log: list[tuple[int, dict[int, dict[str, Any]]]], directory: Path) -> None:
+    per_segment = max(len(log) // SEGMENTS, 1)
+    for start in range(0, len(log), per_segment):
+        records = log[start : start + per_segment]
+        lsns = [lsn for _, operations in records for lsn in operations]
+        lines = b"".join(
+            json.dumps({"tid": tid, "operations": operations}).encode() + b"\n"
+            for tid, operations in records
+        )
+        name = Segment.name(min(lsns), max(lsns)) + CODECS["zlib"].suffix
+        (directory / name).write_bytes(CODECS["zlib"].compress(lines))
+
+
+def segmented_recovery(workers: int):
+    def factory(size: int, workdir: Path) -> Case:
+        write_segments(status_heavy_log(size), workdir)
+        wal = SegmentedWriteAheadLog(str(workdir), replay_workers=workers, parallel_threshold=0)
+        database = SimpleDatabase(SimpleWAL())
+        return Case(lambda: wal.apply_log(database), size)
+
+    return factory
+
+
+for workers in sorted({1, 2, os.cpu_count() or 1}):
+    benchmark(f"recovery.segmented[workers={workers}]")(segmented_recovery(workers))
@@ -0,0 +1,114 @@
+import platform
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+
+@dataclass
+class Case:
+    run: Callable[[], object]
+    ops: int
+
+
+@dataclass
+class Benchmark:
+    name: str
+    factory: Callable[[int, Path], Case]
+    max_size: int | None = None
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    ops: int
+    repeat: int
+    best: float
+    mean: float
+
+    @property
+    def per_op(self) -> float:
+        return self.best / self.ops if self.ops else self.best
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, max_size: int | None = None):
+    def decorator(factory: Callable[[int, Path], Case]) -> Callable[[int, Path], Case]:
+        BENCHMARKS.append(Benchmark(name, factory, max_size))
+        return factory
+
+    return decorator
+
+
+def run_benchmark(bench: Benchmark, size: int, repeat: int) -> BenchmarkResult:
+    samples = []
+    ops = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            case = bench.factory(size, Path(workdir))
+            ops = case.ops
+            start = time.perf_counter()
+            case.run()
+            samples.append(time.perf_counter() - start)
+    return BenchmarkResult(bench.name, size, ops, repeat, min(samples), statistics.mean(samples))
+
+
+def run_all(sizes: list[int], repeat: int, pattern: str | None = None) -> list[BenchmarkResult]:
+    results = []
+    for bench in BENCHMARKS:
+        if pattern is not None and pattern not in bench.name:
+            continue
+        for size in sizes:
+            if bench.max_size is not None and size > bench.max_size:
+                print(f"{bench.name:<45} size={size:<9} skipped (max size {bench.max_size})")
+                continue
+            result = run_benchmark(bench, size, repeat)
+            print(
+                f"{result.name:<45} size={result.size:<9} best={result.best:.6f}s "
+                f"per_op={result.per_op * 1e6:.2f}us"
+            )
+            results.append(result)
+    return results
+
+
+def results_to_dict(results: list[BenchmarkResult]) -> dict:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+        "results": [{**asdict(result), "per_op": result.per_op} for result in results],
+    }
+
+
+def merge_baseline(baseline: dict, report: dict) -> dict:
+    fresh = {(item["name"], item["size"]) for item in report["results"]}
+    kept = [
+        item for item in baseline.get("results", []) if (item["name"], item["size"]) not in fresh
+    ]
+    return {"meta": report["meta"], "results": kept + report["results"]}
+
+
+def compare_with_baseline(
+    results: list[BenchmarkResult], baseline: dict, tolerance: float
+) -> list[str]:
+    expected = {(item["name"], item["size"]): item for item in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        reference = expected.get((result.name, result.size))
+        if reference is None:
+            continue
+        ratio = result.per_op / reference["per_op"] if reference["per_op"] else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{result.name} size={result.size}: {ratio:.2f}x slower than baseline "
+                f"({result.per_op * 1e6:.2f}us vs {reference['per_op'] * 1e6:.2f}us per op)"
+            )
+    return regressions
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from os import environ
+from os import cpu_count, environ
 
 
 def get_env_variable(name: str, default: str | None = None) -> str:
@@ -14,6 +14,14 @@ class WALConfig:
     filepath: str = field(
         default_factory=lambda: get_env_variable("WAL_FILEPATH", "test_data/wal.json")
     )
+    segment_dir: str = field(default_factory=lambda: get_env_variable("WAL_SEGMENT_DIR", ""))
+    segment_size: int = field(
+        default_factory=lambda: int(get_env_variable("WAL_SEGMENT_SIZE", str(16 * 1024 * 1024)))
+    )
+    compression: str = field(default_factory=lambda: get_env_variable("WAL_COMPRESSION", "zlib"))
+    replay_workers: int = field(
+        default_factory=lambda: int(get_env_variable("WAL_REPLAY_WORKERS", "1"))
+    )
 
 
 @dataclass
@@ -23,9 +31,69 @@ class DatabaseConfig:
             "DATABASE_FILEPATH", "test_data/database_data.json"
         )
     )
+    shards: int = field(default_factory=lambda: int(get_env_variable("DATABASE_SHARDS", "1")))
+    shard_dir: str = field(
+        default_factory=lambda: get_env_variable("DATABASE_SHARD_DIR", "test_data/shards")
+    )
+    replica: bool = field(default_factory=lambda: get_env_variable("DATABASE_REPLICA", "0") == "1")
+    mapped_snapshot: str = field(
+        default_factory=lambda: get_env_variable("DATABASE_MAPPED_SNAPSHOT", "")
+    )
+    indexes: str = field(default_factory=lambda: get_env_variable("DATABASE_INDEXES", ""))
+    mapped_reader: bool = field(
+        default_factory=lambda: get_env_variable("DATABASE_MAPPED_READER", "0") == "1"
+    )
+    spill_threshold: int = field(
+        default_factory=lambda: int(get_env_variable("DATABASE_SPILL_THRESHOLD", "0"))
+    )
+    spill_dir: str = field(default_factory=lambda: get_env_variable("DATABASE_SPILL_DIR", ""))
+    delta_merge_ratio: float = field(
+        default_factory=lambda: float(get_env_variable("DATABASE_DELTA_MERGE_RATIO", "0"))
+    )
+    state_cache: str = field(default_factory=lambda: get_env_variable("DATABASE_STATE_CACHE", ""))
+    aggregates: bool = field(
+        default_factory=lambda: get_env_variable("DATABASE_AGGREGATES", "0") == "1"
+    )
+
+
+@dataclass
+class CacheConfig:
+    max_size: int = field(default_factory=lambda: int(get_env_variable("BOOK_CACHE_SIZE", "1024")))
+    collect_stats: bool = field(
+        default_factory=lambda: get_env_variable("BOOK_CACHE_STATS", "0") == "1"
+    )
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = field(default_factory=lambda: get_env_variable("METRICS_ENABLED", "0") == "1")
+    filepath: str = field(
+        default_factory=lambda: get_env_variable("METRICS_FILEPATH", "test_data/metrics.json")
+    )
+
+
+@dataclass
+class ServerConfig:
+    host: str = field(default_factory=lambda: get_env_variable("SERVER_HOST", "127.0.0.1"))
+    port: int = field(default_factory=lambda: int(get_env_variable("SERVER_PORT", "8765")))
+    workers: int = field(
+        default_factory=lambda: int(get_env_variable("SERVER_WORKERS", str(cpu_count() or 1)))
+    )
+
+
+@dataclass
+class DurabilityConfig:
+    mode: str = field(default_factory=lambda: get_env_variable("DURABILITY_MODE", "strict"))
+    group_interval_ms: int = field(
+        default_factory=lambda: int(get_env_variable("DURABILITY_GROUP_INTERVAL_MS", "50"))
+    )
 
 
 @dataclass
 class Config:
     wal: WALConfig = field(default_factory=lambda: WALConfig())
     database: DatabaseConfig = field(default_factory=lambda: DatabaseConfig())
+    cache: CacheConfig = field(default_factory=lambda: CacheConfig())
+    metrics: MetricsConfig = field(default_factory=lambda: MetricsConfig())
+    server: ServerConfig = field(default_factory=lambda: ServerConfig())
+    durability: DurabilityConfig = field(default_factory=lambda: DurabilityConfig())
@@ -1,4 +1,4 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from enum import StrEnum
 from typing import Any
 
@@ -31,14 +31,18 @@ class Book:
             )
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "status": self.enum_status,
+        }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]):
-        return cls(
-            id=data["id"],
-            title=data["title"],
-            author=data["author"],
-            year=data["year"],
-            enum_status=data["status"],
-        )
+        return cls.from_record(data["id"], data)
+
+    @classmethod
+    def from_record(cls, id: int, data: dict[str, Any]):
+        return cls(id, data["title"], data["author"], data["year"], data["status"])
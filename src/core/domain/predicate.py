@@ -0,0 +1,52 @@
+import operator
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+LOOKUPS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "in": lambda value, options: value in options,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    lookup: str
+    value: Any
+
+    def matches(self, record: dict[str, Any]) -> bool:
+        if self.field not in record:
+            return False
+        try:
+            return LOOKUPS[self.lookup](record[self.field], self.value)
+        except TypeError:
+            return False
+
+
+@dataclass(frozen=True)
+class Where:
+    conditions: tuple[Condition, ...]
+
+    @classmethod
+    def of(cls, **criteria: Any) -> "Where":
+        """`Where.of(status="issued", year__lt=1950)`: every condition must hold."""
+        conditions = []
+        for name, value in criteria.items():
+            field, _, lookup = name.partition("__")
+            lookup = lookup or "eq"
+            if lookup not in LOOKUPS:
+                raise ValueError(f"Unknown lookup: {lookup}")
+            conditions.append(Condition(field, lookup, value))
+        return cls(tuple(conditions))
+
+    def __call__(self, record: dict[str, Any]) -> bool:
+        return all(condition.matches(record) for condition in self.conditions)
+
+    def equalities(self) -> dict[str, Any]:
+        return {c.field: c.value for c in self.conditions if c.lookup == "eq"}
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class BatchItemResultDTO[ResultType]:
+    id: int
+    result: ResultType | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
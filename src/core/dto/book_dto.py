@@ -1,7 +1,7 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from typing import Any
 
-from src.core.domain.book import BookStatus
+from src.core.domain.book import Book, BookStatus
 
 
 @dataclass
@@ -12,9 +12,27 @@ class BookDTO:
     status: BookStatus
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        return {
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "status": self.status,
+        }
 
 
 @dataclass
 class ReadBookDTO(BookDTO):
     id: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "status": self.status,
+            "id": self.id,
+        }
+
+    @classmethod
+    def from_book(cls, book: Book) -> "ReadBookDTO":
+        return cls(book.title, book.author, book.year, book.enum_status, book.id)
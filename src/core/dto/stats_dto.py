@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class BookStatsDTO:
+    total: int
+    by_status: dict[str, int]
+    top_authors: list[tuple[str, int]]
+    by_decade: dict[int, int]
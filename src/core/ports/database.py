@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
 from typing import Any, Protocol
 
 
@@ -33,7 +34,7 @@ class TransactionInterface(Protocol):
         pass
 
     @abstractmethod
-    def commit(self, with_wal: bool = True):
+    def commit(self, with_wal: bool = True) -> bool:
         pass
 
     @abstractmethod
@@ -65,10 +66,32 @@ class TransactionInterface(Protocol):
     def get_all(self) -> list[object]:
         pass
 
+    @abstractmethod
+    def has_pending(self, key: int) -> bool:
+        pass
+
     @abstractmethod
     def create(self, value: object) -> int:
         pass
 
+    @abstractmethod
+    def set_if(self, key: int, expected: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def delete_where(self, predicate: Callable[[dict[str, Any]], bool]) -> list[int]:
+        pass
+
+    @abstractmethod
+    def update_where(
+        self, predicate: Callable[[dict[str, Any]], bool], changes: dict[str, Any]
+    ) -> list[int]:
+        pass
+
+    @abstractmethod
+    def aggregates(self) -> Any:
+        pass
+
 
 class DatabaseInterface[ValueType, TransactionType: TransactionInterface](Protocol):
     wal: "WriteAheadLogInterface"
@@ -76,6 +99,7 @@ class DatabaseInterface[ValueType, TransactionType: TransactionInterface](Protoc
     _next_id: int
     _next_tid: int
     _next_lsn: int
+    checkpoint_lsn: int
 
     @abstractmethod
     def sync(self) -> None:
@@ -107,6 +131,14 @@ class DatabaseInterface[ValueType, TransactionType: TransactionInterface](Protoc
     ) -> TransactionType:
         pass
 
+    @abstractmethod
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        pass
+
+    @abstractmethod
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        pass
+
     @property
     def next_id(self) -> int:
         pass
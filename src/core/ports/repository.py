@@ -1,8 +1,10 @@
 from abc import abstractmethod
-from typing import Protocol
+from collections.abc import Callable
+from typing import Any, Protocol
 
 from src.core.domain.book import Book
 from src.core.dto.book_dto import BookDTO
+from src.core.dto.stats_dto import BookStatsDTO
 from src.core.ports.database import TransactionInterface
 
 
@@ -22,3 +24,32 @@ class BookRepositoryInterface(Protocol):
     @abstractmethod
     def delete(self, id: int, session: TransactionInterface) -> None:
         pass
+
+    @abstractmethod
+    def compare_and_set(
+        self,
+        id: int,
+        expected: dict[str, Any],
+        changes: dict[str, Any],
+        session: TransactionInterface,
+    ) -> Book:
+        pass
+
+    @abstractmethod
+    def delete_where(
+        self, predicate: Callable[[dict[str, Any]], bool], session: TransactionInterface
+    ) -> list[int]:
+        pass
+
+    @abstractmethod
+    def update_where(
+        self,
+        predicate: Callable[[dict[str, Any]], bool],
+        changes: dict[str, Any],
+        session: TransactionInterface,
+    ) -> list[int]:
+        pass
+
+    @abstractmethod
+    def stats(self, top: int, session: TransactionInterface) -> BookStatsDTO:
+        pass
@@ -1,5 +1,10 @@
+from collections.abc import Callable, Iterable
+
 from src.core.domain.book import Book, BookStatus
+from src.core.domain.predicate import Where
+from src.core.dto.batch_dto import BatchItemResultDTO
 from src.core.dto.book_dto import BookDTO, ReadBookDTO
+from src.core.dto.stats_dto import BookStatsDTO
 from src.core.ports.repository import BookRepositoryInterface, TransactionInterface
 
 
@@ -11,15 +16,68 @@ class BookService:
         return self.repository.create(book, session)
 
     def set_status(self, id: int, status: BookStatus, session: TransactionInterface) -> Book:
-        old_book = self.repository.get(id, session)
-        new_book = BookDTO(
-            title=old_book.title, author=old_book.author, year=old_book.year, status=status
+        return self.repository.compare_and_set(id, {}, {"status": status}, session)
+
+    def set_status_if(
+        self, id: int, expected: BookStatus, status: BookStatus, session: TransactionInterface
+    ) -> Book:
+        return self.repository.compare_and_set(
+            id, {"status": expected}, {"status": status}, session
         )
-        return self.repository.update(id, new_book, session)
+
+    def checkout(self, id: int, session: TransactionInterface) -> Book:
+        return self.set_status_if(id, BookStatus.IN_STOCK, BookStatus.ISSUED, session)
+
+    def return_book(self, id: int, session: TransactionInterface) -> Book:
+        return self.set_status_if(id, BookStatus.ISSUED, BookStatus.IN_STOCK, session)
 
     def delete(self, id: int, session: TransactionInterface):
+        self.repository.get(id, session)
         self.repository.delete(id, session)
 
+    def delete_where(self, predicate: Where, session: TransactionInterface) -> list[int]:
+        return self.repository.delete_where(predicate, session)
+
+    def set_status_where(
+        self, predicate: Where, status: BookStatus, session: TransactionInterface
+    ) -> list[int]:
+        return self.repository.update_where(predicate, {"status": status}, session)
+
     def get(self, id: int, session: TransactionInterface) -> ReadBookDTO:
         result = self.repository.get(id, session)
-        return ReadBookDTO(**result.to_dict())
+        return ReadBookDTO.from_book(result)
+
+    def stats(self, top: int, session: TransactionInterface) -> BookStatsDTO:
+        return self.repository.stats(top, session)
+
+    def get_many(
+        self, ids: Iterable[int], session: TransactionInterface
+    ) -> list[BatchItemResultDTO[ReadBookDTO]]:
+        return self._run_many(ids, lambda id: self.get(id, session))
+
+    def set_status_many(
+        self, ids: Iterable[int], status: BookStatus, session: TransactionInterface
+    ) -> list[BatchItemResultDTO[Book]]:
+        return self._run_many(ids, lambda id: self.set_status(id, status, session))
+
+    def delete_many(
+        self, ids: Iterable[int], session: TransactionInterface
+    ) -> list[BatchItemResultDTO[None]]:
+        return self._run_many(ids, lambda id: self.delete(id, session))
+
+    @staticmethod
+    def _run_many[ResultType](
+        ids: Iterable[int], action: Callable[[int], ResultType]
+    ) -> list[BatchItemResultDTO[ResultType]]:
+        results: list[BatchItemResultDTO[ResultType]] = []
+        seen: set[int] = set()
+        for id in ids:
+            if id in seen:
+                results.append(BatchItemResultDTO(id, error=f"Duplicate id {id} in batch"))
+                continue
+            seen.add(id)
+            try:
+                results.append(BatchItemResultDTO(id, result=action(id)))
+            except Exception as e:
+                results.append(BatchItemResultDTO(id, error=str(e)))
+        return results
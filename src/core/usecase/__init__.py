@@ -1,6 +1,27 @@
 from .add_book import addBookUsecase
+from .checkout_book import checkoutBookUsecase
 from .delete_book import deleteBookUsecase
+from .delete_books import deleteBooksUsecase
+from .delete_books_where import deleteBooksWhereUsecase
 from .get_book import getBookUsecase
+from .get_books import getBooksUsecase
+from .get_stats import getBookStatsUsecase
+from .return_book import returnBookUsecase
 from .set_status import setBookStatusUsecase
+from .set_statuses import setBooksStatusUsecase
+from .set_statuses_where import setBooksStatusWhereUsecase
 
-__all__ = ["addBookUsecase", "deleteBookUsecase", "getBookUsecase", "setBookStatusUsecase"]
+__all__ = [
+    "addBookUsecase",
+    "checkoutBookUsecase",
+    "deleteBookUsecase",
+    "deleteBooksUsecase",
+    "deleteBooksWhereUsecase",
+    "getBookUsecase",
+    "getBookStatsUsecase",
+    "getBooksUsecase",
+    "returnBookUsecase",
+    "setBookStatusUsecase",
+    "setBooksStatusUsecase",
+    "setBooksStatusWhereUsecase",
+]
@@ -0,0 +1,11 @@
+from src.core.domain.book import Book
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class checkoutBookUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(self, id: int, session: TransactionInterface) -> Book:
+        return self.service.checkout(id, session)
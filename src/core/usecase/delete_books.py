@@ -0,0 +1,15 @@
+from collections.abc import Iterable
+
+from src.core.dto.batch_dto import BatchItemResultDTO
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class deleteBooksUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(
+        self, ids: Iterable[int], session: TransactionInterface
+    ) -> list[BatchItemResultDTO[None]]:
+        return self.service.delete_many(ids, session)
@@ -0,0 +1,11 @@
+from src.core.domain.predicate import Where
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class deleteBooksWhereUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(self, predicate: Where, session: TransactionInterface) -> list[int]:
+        return self.service.delete_where(predicate, session)
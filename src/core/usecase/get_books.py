@@ -0,0 +1,16 @@
+from collections.abc import Iterable
+
+from src.core.dto.batch_dto import BatchItemResultDTO
+from src.core.dto.book_dto import ReadBookDTO
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class getBooksUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(
+        self, ids: Iterable[int], session: TransactionInterface
+    ) -> list[BatchItemResultDTO[ReadBookDTO]]:
+        return self.service.get_many(ids, session)
@@ -0,0 +1,11 @@
+from src.core.dto.stats_dto import BookStatsDTO
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class getBookStatsUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(self, top: int, session: TransactionInterface) -> BookStatsDTO:
+        return self.service.stats(top, session)
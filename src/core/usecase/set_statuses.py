@@ -0,0 +1,16 @@
+from collections.abc import Iterable
+
+from src.core.domain.book import Book, BookStatus
+from src.core.dto.batch_dto import BatchItemResultDTO
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class setBooksStatusUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(
+        self, ids: Iterable[int], status: BookStatus, session: TransactionInterface
+    ) -> list[BatchItemResultDTO[Book]]:
+        return self.service.set_status_many(ids, status, session)
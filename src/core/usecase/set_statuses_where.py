@@ -0,0 +1,14 @@
+from src.core.domain.book import BookStatus
+from src.core.domain.predicate import Where
+from src.core.ports.database import TransactionInterface
+from src.core.service.book_service import BookService
+
+
+class setBooksStatusWhereUsecase:
+    def __init__(self, service: BookService):
+        self.service = service
+
+    def execute(
+        self, predicate: Where, status: BookStatus, session: TransactionInterface
+    ) -> list[int]:
+        return self.service.set_status_where(predicate, status, session)
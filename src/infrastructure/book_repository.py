@@ -1,16 +1,33 @@
+from collections.abc import Callable
+from dataclasses import replace
+from typing import Any
+
 from src.core.domain.book import Book
 from src.core.dto.book_dto import BookDTO
+from src.core.dto.stats_dto import BookStatsDTO
 from src.core.ports.database import TransactionInterface
 from src.core.ports.repository import BookRepositoryInterface
+from src.infrastructure.cache import LRUCache
 
 
 class BookRepository(BookRepositoryInterface):
+    def __init__(self, cache: LRUCache[int, Book] | None = None):
+        self.cache = cache
+
     def get(self, id: int, session: TransactionInterface) -> Book:
+        cache = self.cache if not session.has_pending(id) else None
+        if cache is not None:
+            book = cache.get(id)
+            if book is not None:
+                # Books are mutable, so callers get their own copy of the cached entry.
+                return replace(book)
         data = session.get(id)
         if isinstance(data, dict):
-            book = Book.from_dict(data)
+            book = Book.from_record(id, data)
         else:
-            raise Exception
+            raise Exception(f"Book with id {id} not found")
+        if cache is not None:
+            cache.put(id, replace(book))
         return book
 
     def create(self, book: BookDTO, session: TransactionInterface) -> int:
@@ -20,9 +37,52 @@ class BookRepository(BookRepositoryInterface):
         if session.get(book_id) is None:
             raise Exception("Book not found")
         else:
-            book_with_id = Book(id=book_id, **book.__dict__)
-            session.set(book_id, book_with_id)
-        return self.get(book_id, session)
+            book_with_id = Book(
+                id=book_id,
+                title=book.title,
+                author=book.author,
+                year=book.year,
+                enum_status=book.status,
+            )
+            session.set(book_id, book)
+        return book_with_id
 
     def delete(self, id: int, session: TransactionInterface) -> None:
         session.delete(id)
+
+    def compare_and_set(
+        self,
+        id: int,
+        expected: dict[str, Any],
+        changes: dict[str, Any],
+        session: TransactionInterface,
+    ) -> Book:
+        try:
+            data = session.set_if(id, expected, changes)
+        except LookupError:
+            raise Exception(f"Book with id {id} not found") from None
+        return Book.from_record(id, data)
+
+    def delete_where(
+        self, predicate: Callable[[dict[str, Any]], bool], session: TransactionInterface
+    ) -> list[int]:
+        return session.delete_where(predicate)
+
+    def update_where(
+        self,
+        predicate: Callable[[dict[str, Any]], bool],
+        changes: dict[str, Any],
+        session: TransactionInterface,
+    ) -> list[int]:
+        return session.update_where(predicate, changes)
+
+    def stats(self, top: int, session: TransactionInterface) -> BookStatsDTO:
+        aggregates = session.aggregates()
+        if aggregates is None:
+            raise Exception("Book statistics are not available for this database")
+        return BookStatsDTO(
+            total=aggregates.total,
+            by_status={str(status): count for status, count in aggregates.by_status.counts.items()},
+            top_authors=[(str(author), count) for author, count in aggregates.by_author.top(top)],
+            by_decade=dict(sorted(aggregates.by_decade.counts.items())),
+        )
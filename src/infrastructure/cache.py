@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache[KeyType, ValueType]:
+    def __init__(self, max_size: int, collect_stats: bool = False):
+        if max_size <= 0:
+            raise ValueError(f"Cache size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.collect_stats = collect_stats
+        self.stats = CacheStats()
+        self._entries: OrderedDict[KeyType, ValueType] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._entries
+
+    def get(self, key: KeyType) -> ValueType | None:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            if self.collect_stats:
+                self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if self.collect_stats:
+            self.stats.hits += 1
+        return value
+
+    def put(self, key: KeyType, value: ValueType) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            if self.collect_stats:
+                self.stats.evictions += 1
+
+    def invalidate(self, keys: Iterable[KeyType]) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None and self.collect_stats:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
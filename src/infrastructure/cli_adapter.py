@@ -1,9 +1,73 @@
 import argparse
+import json
+import sys
+from dataclasses import asdict
 
 from src.core.domain.book import BookStatus
+from src.core.domain.predicate import Where
+from src.core.dto.batch_dto import BatchItemResultDTO
 from src.core.dto.book_dto import BookDTO
-from src.core.ports.database import DatabaseInterface
-from src.core.usecase import addBookUsecase, deleteBookUsecase, getBookUsecase, setBookStatusUsecase
+from src.core.dto.stats_dto import BookStatsDTO
+from src.core.ports.database import DatabaseInterface, TransactionInterface
+from src.core.usecase import (
+    addBookUsecase,
+    checkoutBookUsecase,
+    deleteBooksUsecase,
+    deleteBooksWhereUsecase,
+    deleteBookUsecase,
+    getBookStatsUsecase,
+    getBooksUsecase,
+    getBookUsecase,
+    returnBookUsecase,
+    setBooksStatusUsecase,
+    setBooksStatusWhereUsecase,
+    setBookStatusUsecase,
+)
+from src.infrastructure.database.backup import backup
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.replica import ReplicaDatabase
+from src.infrastructure.metrics import MetricsRegistry
+from src.infrastructure.prefork_server import PreforkServer
+from src.infrastructure.profiler import PROFILER, add_profiling_arguments
+
+
+def read_ids(stream=sys.stdin) -> list[int]:
+    return [int(token) for token in stream.read().split()]
+
+
+def parse_where(expressions: list[str]) -> Where:
+    criteria: dict[str, object] = {}
+    for expression in expressions:
+        name, separator, value = expression.partition("=")
+        if not separator:
+            raise ValueError(f"Expected field[__lookup]=value, got {expression!r}")
+        criteria[name] = int(value) if value.lstrip("-").isdigit() else value
+    return Where.of(**criteria)
+
+
+def commit(session: TransactionInterface) -> None:
+    if not session.commit():
+        sys.exit("Commit failed, the changes were rolled back")
+
+
+def print_batch_results(results: list[BatchItemResultDTO]) -> None:
+    for item in results:
+        if item.ok:
+            print(f"{item.id}: {item.result if item.result is not None else 'ok'}")
+        else:
+            print(f"{item.id}: error: {item.error}")
+    failed = sum(1 for item in results if not item.ok)
+    print(f"\n{len(results) - failed} succeeded, {failed} failed\n")
+
+
+def print_book_stats(stats: BookStatsDTO) -> None:
+    print(f"total {stats.total}")
+    for status, count in stats.by_status.items():
+        print(f"status {status} {count}")
+    for author, count in stats.top_authors:
+        print(f"author {author} {count}")
+    for decade, count in stats.by_decade.items():
+        print(f"decade {decade}s {count}")
 
 
 class CLIAdapter:
@@ -14,12 +78,32 @@ class CLIAdapter:
         delete_book_usecase: deleteBookUsecase,
         get_book_usecase: getBookUsecase,
         set_book_status_usecase: setBookStatusUsecase,
+        get_books_usecase: getBooksUsecase,
+        delete_books_usecase: deleteBooksUsecase,
+        set_books_status_usecase: setBooksStatusUsecase,
+        delete_books_where_usecase: deleteBooksWhereUsecase,
+        set_books_status_where_usecase: setBooksStatusWhereUsecase,
+        checkout_book_usecase: checkoutBookUsecase,
+        return_book_usecase: returnBookUsecase,
+        get_book_stats_usecase: getBookStatsUsecase,
+        metrics: MetricsRegistry,
+        server: PreforkServer,
     ):
         self.add_book_usecase = add_book_usecase
         self.delete_book_usecase = delete_book_usecase
         self.get_book_usecase = get_book_usecase
         self.set_book_status_usecase = set_book_status_usecase
+        self.get_books_usecase = get_books_usecase
+        self.delete_books_usecase = delete_books_usecase
+        self.set_books_status_usecase = set_books_status_usecase
+        self.delete_books_where_usecase = delete_books_where_usecase
+        self.set_books_status_where_usecase = set_books_status_where_usecase
+        self.checkout_book_usecase = checkout_book_usecase
+        self.return_book_usecase = return_book_usecase
+        self.get_book_stats_usecase = get_book_stats_usecase
         self.database = database
+        self.metrics = metrics
+        self.server = server
 
     @property
     def session(self):
@@ -27,6 +111,7 @@ class CLIAdapter:
 
     def run(self):
         parser = argparse.ArgumentParser(description="Book Management CLI")
+        add_profiling_arguments(parser)
         subparsers = parser.add_subparsers(dest="command")
 
         add_parser = subparsers.add_parser("add", help="Add a new book")
@@ -49,38 +134,218 @@ class CLIAdapter:
             "status", choices=[status.value for status in BookStatus], help="Status of the book"
         )
 
+        checkout_parser = subparsers.add_parser("checkout", help="Issue a book that is in stock")
+        checkout_parser.add_argument("id", type=int, help="ID of the book to issue")
+
+        return_parser = subparsers.add_parser("return", help="Return an issued book")
+        return_parser.add_argument("id", type=int, help="ID of the book to return")
+
+        get_many_parser = subparsers.add_parser("get_many", help="Get books by ids read from stdin")
+
+        delete_many_parser = subparsers.add_parser(
+            "delete_many", help="Delete books by ids read from stdin in one transaction"
+        )
+
+        set_many_parser = subparsers.add_parser(
+            "set_status_many",
+            help="Set the status of books by ids read from stdin in one transaction",
+        )
+        set_many_parser.add_argument(
+            "status", choices=[status.value for status in BookStatus], help="Status of the books"
+        )
+
+        where_help = "Condition as field[__lookup]=value, lookups: eq ne lt le gt ge"
+        delete_where_parser = subparsers.add_parser(
+            "delete_where", help="Delete every book matching the conditions in one transaction"
+        )
+        delete_where_parser.add_argument("--where", action="append", required=True, help=where_help)
+
+        set_where_parser = subparsers.add_parser(
+            "set_status_where",
+            help="Set the status of every book matching the conditions in one transaction",
+        )
+        set_where_parser.add_argument(
+            "status", choices=[status.value for status in BookStatus], help="Status of the books"
+        )
+        set_where_parser.add_argument("--where", action="append", required=True, help=where_help)
+
+        stats_parser = subparsers.add_parser("stats", help="Show collected metrics or book counts")
+        stats_parser.add_argument(
+            "query",
+            nargs="?",
+            choices=["metrics", "books"],
+            default="metrics",
+            help="metrics (default) or book counts by status, author and decade",
+        )
+        stats_parser.add_argument(
+            "--format", choices=["prometheus", "json"], default="prometheus", help="Output format"
+        )
+        stats_parser.add_argument("--top", type=int, default=10, help="Number of authors to show")
+
+        subparsers.add_parser("serve", help="Serve requests from a prefork worker pool")
+
+        subparsers.add_parser("checkpoint", help="Write the database snapshot")
+
+        subparsers.add_parser("replica_status", help="Show how far a replica trails its primary")
+
+        backup_parser = subparsers.add_parser(
+            "backup", help="Copy the snapshot and WAL to a directory while commits continue"
+        )
+        backup_parser.add_argument("target", type=str, help="Backup directory")
+        backup_parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Copy only the WAL segments created since the last backup in the directory",
+        )
+        backup_parser.add_argument(
+            "--lsn", type=int, default=None, help="Leave out transactions at or after this LSN"
+        )
+
         args = parser.parse_args()
 
-        if args.command == "add":
-            try:
-                book = BookDTO(args.title, args.author, args.year, args.status)
-                book_id = self.add_book_usecase.execute(book, self.session)
-                print(f"\nBook with id {book_id} added\n")
-            except Exception as e:
-                print(e)
-                add_parser.print_help()
-        elif args.command == "delete":
-            try:
-                self.delete_book_usecase.execute(args.id, self.session)
-            except Exception as e:
-                print(e)
-                delete_parser.print_help()
-        elif args.command == "get":
-            try:
-                book = self.get_book_usecase.execute(args.id, self.session)
-                if book:
+        with PROFILER.phase("execute"):
+            if args.command == "add":
+                try:
+                    session = self.session
+                    book = BookDTO(args.title, args.author, args.year, args.status)
+                    book_id = self.add_book_usecase.execute(book, session)
+                    commit(session)
+                    print(f"\nBook with id {book_id} added\n")
+                except Exception as e:
+                    print(e)
+                    add_parser.print_help()
+            elif args.command == "delete":
+                try:
+                    session = self.session
+                    self.delete_book_usecase.execute(args.id, session)
+                    commit(session)
+                except Exception as e:
+                    print(e)
+                    delete_parser.print_help()
+            elif args.command == "get":
+                try:
+                    book = self.get_book_usecase.execute(args.id, self.session)
+                    if book:
+                        print(book)
+                    else:
+                        print(f"Book with {args.id=} not found")
+                except Exception as e:
+                    print(e)
+                    get_parser.print_help()
+            elif args.command == "set_status":
+                try:
+                    session = self.session
+                    book = self.set_book_status_usecase.execute(args.id, args.status, session)
+                    commit(session)
+                    print(book)
+                except Exception as e:
+                    print(e)
+                    set_parser.print_help()
+            elif args.command in ("checkout", "return"):
+                usecase = (
+                    self.checkout_book_usecase
+                    if args.command == "checkout"
+                    else self.return_book_usecase
+                )
+                try:
+                    session = self.session
+                    book = usecase.execute(args.id, session)
+                    commit(session)
                     print(book)
+                except Exception as e:
+                    print(e)
+                    (checkout_parser if args.command == "checkout" else return_parser).print_help()
+            elif args.command == "get_many":
+                try:
+                    results = self.get_books_usecase.execute(read_ids(), self.session)
+                    print_batch_results(results)
+                except Exception as e:
+                    print(e)
+                    get_many_parser.print_help()
+            elif args.command == "delete_many":
+                try:
+                    session = self.session
+                    results = self.delete_books_usecase.execute(read_ids(), session)
+                    commit(session)
+                    print_batch_results(results)
+                except Exception as e:
+                    print(e)
+                    delete_many_parser.print_help()
+            elif args.command == "set_status_many":
+                try:
+                    session = self.session
+                    results = self.set_books_status_usecase.execute(
+                        read_ids(), args.status, session
+                    )
+                    commit(session)
+                    print_batch_results(results)
+                except Exception as e:
+                    print(e)
+                    set_many_parser.print_help()
+            elif args.command == "delete_where":
+                try:
+                    session = self.session
+                    keys = self.delete_books_where_usecase.execute(parse_where(args.where), session)
+                    commit(session)
+                    print(f"\nDeleted {len(keys)} books\n")
+                except Exception as e:
+                    print(e)
+                    delete_where_parser.print_help()
+            elif args.command == "set_status_where":
+                try:
+                    session = self.session
+                    keys = self.set_books_status_where_usecase.execute(
+                        parse_where(args.where), args.status, session
+                    )
+                    commit(session)
+                    print(f"\nUpdated {len(keys)} books\n")
+                except Exception as e:
+                    print(e)
+                    set_where_parser.print_help()
+            elif args.command == "stats" and args.query == "books":
+                try:
+                    stats = self.get_book_stats_usecase.execute(args.top, self.session)
+                    if args.format == "json":
+                        print(json.dumps(asdict(stats)))
+                    else:
+                        print_book_stats(stats)
+                except Exception as e:
+                    print(e)
+                    stats_parser.print_help()
+            elif args.command == "stats":
+                if not self.metrics.enabled:
+                    print("Metrics are disabled. Set METRICS_ENABLED=1 to collect them.")
+                elif args.format == "json":
+                    print(self.metrics.to_json())
                 else:
-                    print(f"Book with {args.id=} not found")
-            except Exception as e:
-                print(e)
-                get_parser.print_help()
-        elif args.command == "set_status":
-            try:
-                book = self.set_book_status_usecase.execute(args.id, args.status, self.session)
-                print(book)
-            except Exception as e:
-                print(e)
-                set_parser.print_help()
-        else:
-            parser.print_help()
+                    print(self.metrics.to_prometheus(), end="")
+            elif args.command == "serve":
+                host, port = self.server.bind()
+                print(f"Serving on {host}:{port} with {self.server.workers} workers")
+                self.server.serve_forever()
+            elif args.command == "checkpoint":
+                if not isinstance(self.database, JsonDatabase):
+                    print("This database does not support checkpoints.")
+                else:
+                    self.database.checkpoint()
+                    print(f"Checkpoint written at lsn {self.database.checkpoint_lsn}")
+            elif args.command == "replica_status":
+                if not isinstance(self.database, ReplicaDatabase):
+                    print("Not a replica. Set DATABASE_REPLICA=1 to follow a primary.")
+                else:
+                    print(f"applied_lsn {self.database.applied_lsn}")
+                    print(f"primary_lsn {self.database.wal.head_lsn}")
+                    print(f"replay_lag {self.database.replay_lag}")
+            elif args.command == "backup":
+                if not isinstance(self.database, JsonDatabase):
+                    print("This database does not support backups.")
+                else:
+                    try:
+                        manifest = backup(self.database, args.target, args.incremental, args.lsn)
+                        print(f"Backup written to {args.target} at lsn {manifest['lsn']}")
+                    except Exception as e:
+                        print(e)
+                        backup_parser.print_help()
+            else:
+                parser.print_help()
+        self.metrics.flush()
@@ -0,0 +1,96 @@
+from bisect import bisect_left, insort
+from collections.abc import Hashable, Iterable, Mapping
+from typing import Any
+
+type Row = tuple[Hashable, Hashable, Hashable]
+
+
+class CountView:
+    """Record counts per value. Values are also bucketed by count, with the non-empty counts
+    kept sorted, so `top(n)` reads n entries whatever the number of records."""
+
+    def __init__(self):
+        self.counts: dict[Hashable, int] = {}
+        # Dicts rather than sets so ties come out in a stable order.
+        self._by_count: dict[int, dict[Hashable, None]] = {}
+        self._sorted_counts: list[int] = []
+
+    def _move(self, value: Hashable, old: int, new: int) -> None:
+        if old:
+            bucket = self._by_count[old]
+            del bucket[value]
+            if not bucket:
+                del self._by_count[old]
+                del self._sorted_counts[bisect_left(self._sorted_counts, old)]
+        if new:
+            bucket = self._by_count.get(new)
+            if bucket is None:
+                bucket = self._by_count[new] = {}
+                insort(self._sorted_counts, new)
+            bucket[value] = None
+            self.counts[value] = new
+        else:
+            self.counts.pop(value, None)
+
+    def add(self, value: Hashable, delta: int) -> None:
+        old = self.counts.get(value, 0)
+        self._move(value, old, old + delta)
+
+    def top(self, n: int) -> list[tuple[Hashable, int]]:
+        result: list[tuple[Hashable, int]] = []
+        for count in reversed(self._sorted_counts):
+            for value in self._by_count[count]:
+                if len(result) == n:
+                    return result
+                result.append((value, count))
+        return result
+
+
+def _row(record: Any) -> Row | None:
+    if not isinstance(record, dict):
+        return None
+    year = record.get("year")
+    decade = year // 10 * 10 if isinstance(year, int) else None
+    status, author = record.get("status"), record.get("author")
+    return (
+        status if isinstance(status, Hashable) else None,
+        author if isinstance(author, Hashable) else None,
+        decade,
+    )
+
+
+class AggregateView:
+    """Book counts by status, author and decade, kept current through the commit listeners
+    like `FieldIndex`, so reading them never scans the records.
+
+    The view is built by one scan when first used. Only a long-lived process, such as the
+    server, reads it for free afterwards. A one-shot CLI call pays the scan again unless
+    the state cache (`DATABASE_STATE_CACHE`) brings the view back with the records.
+    """
+
+    def __init__(self, data: Mapping[int, Any]):
+        self.total = 0
+        self.by_status = CountView()
+        self.by_author = CountView()
+        self.by_decade = CountView()
+        self._row_by_key: dict[int, Row] = {}
+        self.update(data.keys(), data)
+
+    def _count(self, row: Row, delta: int) -> None:
+        self.total += delta
+        for view, value in zip((self.by_status, self.by_author, self.by_decade), row, strict=True):
+            if value is not None:
+                view.add(value, delta)
+
+    def update(self, keys: Iterable[int], data: Mapping[int, Any]) -> None:
+        for key in keys:
+            row = _row(data.get(key))
+            old = self._row_by_key.get(key)
+            if row == old:
+                continue
+            if old is not None:
+                self._count(old, -1)
+                del self._row_by_key[key]
+            if row is not None:
+                self._count(row, 1)
+                self._row_by_key[key] = row
@@ -0,0 +1,253 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+from src.infrastructure.database.json_database import DELTA_INFIX, JsonDatabase
+from src.infrastructure.database.segmented_wal import (
+    ACTIVE_SEGMENT,
+    CODECS_BY_SUFFIX,
+    Segment,
+    SegmentedWriteAheadLog,
+    iter_records,
+    list_segments,
+)
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+from src.infrastructure.metrics import METRICS
+
+MANIFEST = "backup.json"
+RETRIES = 10
+
+
+def read_backup_manifest(target: Path) -> dict[str, Any] | None:
+    path = target / MANIFEST
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class Backup:
+    """Copies a database's snapshot and the WAL records after it into `target` while commits
+    continue. Every source file is either replaced atomically or only appended to, so the copy
+    is consistent at `lsn`: the snapshot plus every transaction whose operations end below it.
+
+    An incremental backup keeps the snapshot and the closed segments of the previous backup in
+    `target` and copies only the segments created since. A full backup replaces an earlier one
+    in `target` but refuses any other non-empty directory, or one holding the database itself.
+    """
+
+    def __init__(self, database: JsonDatabase, target: str | Path):
+        self.database = database
+        self.target = Path(target)
+        self.written: list[Path] = []
+
+    def run(self, incremental: bool = False, lsn: int | None = None) -> dict[str, Any]:
+        existing = self._check_target()
+        previous = existing if incremental else None
+        if previous is None and existing is not None:
+            # Only a directory holding a backup manifest was written by us and may be cleared.
+            shutil.rmtree(self.target)
+        self.target.mkdir(parents=True, exist_ok=True)
+
+        checkpoint_lsn = self._copy_snapshot() if previous is None else previous["checkpoint_lsn"]
+        if lsn is not None and lsn < checkpoint_lsn:
+            raise ValueError(f"The snapshot is already at lsn {checkpoint_lsn}, past {lsn}")
+        if lsn is not None and previous is not None and lsn < previous["lsn"]:
+            raise ValueError(f"The previous backup is already at lsn {previous['lsn']}")
+
+        wal = self.database.wal
+        if isinstance(wal, SegmentedWriteAheadLog):
+            manifest = self._copy_segments(wal, checkpoint_lsn, lsn, previous)
+        elif isinstance(wal, WriteAheadLog):
+            manifest = self._copy_log(wal, checkpoint_lsn, lsn, previous)
+        else:
+            raise TypeError(f"Cannot back up a {type(wal).__name__}")
+        manifest.update(
+            snapshot=self.database.json_filepath.name,
+            checkpoint_lsn=checkpoint_lsn,
+            backups=previous["backups"] + 1 if previous else 1,
+        )
+        self._write(self.target / MANIFEST, json.dumps(manifest).encode())
+        if METRICS.enabled:
+            METRICS.inc("backups_total")
+        return manifest
+
+    def _check_target(self) -> dict[str, Any] | None:
+        target = self.target.resolve()
+        wal = self.database.wal
+        sources = [self.database.json_filepath]
+        if isinstance(wal, SegmentedWriteAheadLog):
+            sources.append(wal.directory)
+        elif isinstance(wal, WriteAheadLog):
+            sources.append(wal.log_filepath)
+        for source in sources:
+            if Path(source).resolve().is_relative_to(target):
+                raise ValueError(f"{self.target} holds the database's own {Path(source).name}")
+        manifest = read_backup_manifest(self.target)
+        if manifest is None and self.target.exists() and any(self.target.iterdir()):
+            raise ValueError(f"{self.target} is not empty and holds no backup")
+        return manifest
+
+    def _write(self, path: Path, content: bytes) -> None:
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+        self.written.append(path)
+        if METRICS.enabled:
+            METRICS.inc("backup_bytes_copied_total", len(content))
+
+    def _copy_snapshot(self) -> int:
+        source = self.database.json_filepath
+        prefix = source.name + DELTA_INFIX
+        for _ in range(RETRIES):
+            try:
+                base = source.read_bytes()
+                snapshot = json.loads(base)
+                merged = snapshot.get("merged_delta", 0)
+                deltas = []
+                for path in sorted(source.parent.glob(prefix + "*")):
+                    suffix = path.name[len(prefix) :]
+                    if suffix.isdigit() and int(suffix) > merged:
+                        deltas.append((path.name, path.read_bytes()))
+            except (FileNotFoundError, json.JSONDecodeError):
+                # A merge folded a delta into a newer base while we read; start over.
+                continue
+            checkpoint_lsn = snapshot.get("checkpoint_lsn", 0)
+            self._write(self.target / source.name, base)
+            for name, content in deltas:
+                self._write(self.target / name, content)
+                checkpoint_lsn = json.loads(content).get("checkpoint_lsn", checkpoint_lsn)
+            return checkpoint_lsn
+        raise RuntimeError(f"Could not read a consistent snapshot from {source}")
+
+    def _copy_log(
+        self,
+        wal: WriteAheadLog,
+        checkpoint_lsn: int,
+        lsn: int | None,
+        previous: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        for _ in range(RETRIES):
+            try:
+                with open(wal.log_filepath) as f:
+                    log = json.load(f)
+                break
+            except json.JSONDecodeError:
+                # The log is rewritten in place on every commit.
+                continue
+        else:
+            raise RuntimeError(f"Could not read {wal.log_filepath}")
+
+        head = checkpoint_lsn if previous is None else previous["lsn"]
+        records = {}
+        for tid, operations in log.items():
+            if not operations:
+                continue
+            last = max(int(key) for key in operations)
+            if lsn is not None and last >= lsn:
+                continue
+            if previous is None or last >= previous["lsn"]:
+                records[tid] = operations
+            head = max(head, last + 1)
+
+        target = self.target / wal.log_filepath.name
+        if previous is not None and target.exists():
+            with open(target) as f:
+                records = {**json.load(f), **records}
+        self._write(target, json.dumps(records).encode())
+        return {"lsn": head, "wal": wal.log_filepath.name}
+
+    def _copy_segments(
+        self,
+        wal: SegmentedWriteAheadLog,
+        checkpoint_lsn: int,
+        lsn: int | None,
+        previous: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        directory = self.target / wal.directory.name
+        directory.mkdir(exist_ok=True)
+        copied = {tuple(bounds) for bounds in previous["segments"]} if previous else set()
+        segments, active = self._read_segments(wal)
+
+        head = checkpoint_lsn if previous is None else previous["lsn"]
+        tail: list[bytes] = []
+        bounds: tuple[int, int] | None = None
+        for segment, raw in segments:
+            key = (segment.first_lsn, segment.last_lsn)
+            if key in copied or segment.last_lsn < checkpoint_lsn:
+                continue
+            if lsn is not None and segment.last_lsn >= lsn:
+                if segment.compressed:
+                    raw = CODECS_BY_SUFFIX[segment.path.suffix].decompress(raw)
+                tail, bounds = self._lines_below(raw, lsn)
+                break
+            self._write(directory / segment.path.name, raw)
+            copied.add(key)
+            head = max(head, segment.last_lsn + 1)
+        else:
+            tail, bounds = self._lines_below(active, lsn)
+
+        if bounds is not None:
+            self._write(directory / Segment.name(*bounds), b"".join(tail))
+            head = max(head, bounds[1] + 1)
+        # The previous tail is a prefix of a segment or of the active segment copied now.
+        if previous is not None and previous.get("tail"):
+            stale = directory / Segment.name(*previous["tail"])
+            if stale not in self.written:
+                stale.unlink(missing_ok=True)
+        return {
+            "lsn": head,
+            "wal": wal.directory.name,
+            "segments": sorted(copied),
+            "tail": bounds,
+        }
+
+    def _read_segments(
+        self, wal: SegmentedWriteAheadLog
+    ) -> tuple[list[tuple[Segment, bytes]], bytes]:
+        wal.wait()
+        for _ in range(RETRIES):
+            segments = list_segments(wal.directory)
+            try:
+                with open(wal.directory / ACTIVE_SEGMENT, "rb") as f:
+                    active = f.read()
+            except FileNotFoundError:
+                active = b""
+            try:
+                contents = [(segment, segment.path.read_bytes()) for segment in segments]
+            except FileNotFoundError:
+                # Compressed in the background between listing and reading.
+                continue
+            # A rotation after the listing would move records out of the active segment unseen.
+            if list_segments(wal.directory) == segments:
+                return contents, active[: active.rfind(b"\n") + 1]
+        raise RuntimeError(f"Could not read a stable segment list from {wal.directory}")
+
+    @staticmethod
+    def _lines_below(raw: bytes, lsn: int | None) -> tuple[list[bytes], tuple[int, int] | None]:
+        lines = []
+        first = last = None
+        for line in raw.splitlines(keepends=True):
+            records = list(iter_records(line))
+            if not records or not records[0][1]:
+                continue
+            operations = records[0][1]
+            if lsn is not None and max(operations) >= lsn:
+                break
+            lines.append(line)
+            first = min(operations) if first is None else min(first, min(operations))
+            last = max(operations) if last is None else max(last, max(operations))
+        if first is None or last is None:
+            return [], None
+        return lines, (first, last)
+
+
+def backup(
+    database: JsonDatabase,
+    target: str | Path,
+    incremental: bool = False,
+    lsn: int | None = None,
+) -> dict[str, Any]:
+    return Backup(database, target).run(incremental, lsn)
@@ -0,0 +1,159 @@
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from src.core.ports.database import DatabaseInterface, TransactionInterface
+from src.infrastructure.database.recovery import read_log
+from src.infrastructure.metrics import METRICS
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    lsn: int
+    tid: int
+    operation: dict[str, Any]
+
+
+type ChangeHandler = Callable[[list[ChangeEvent]], None]
+
+_CLOSE = object()
+
+
+class Subscription:
+    """Delivers change events to `handler` on its own thread, in commit order and in batches
+    of up to `batch_size`; a transaction's events are in LSN order. At most `max_pending`
+    undelivered events are queued; past that the committing thread waits for the handler to
+    catch up.
+
+    With `from_lsn`, the WAL from that LSN is delivered first, so a consumer that stores
+    `delivered_lsn` after each batch can resume from `delivered_lsn + 1` after a restart.
+    LSNs are taken when operations are built, so this resumes exactly only when transactions
+    commit in the order they were started.
+    """
+
+    def __init__(
+        self,
+        feed: "ChangeFeed",
+        handler: ChangeHandler,
+        from_lsn: int | None,
+        batch_size: int,
+        max_pending: int,
+    ):
+        self._feed = feed
+        self.handler = handler
+        self.batch_size = batch_size
+        self.delivered_lsn = -1 if from_lsn is None else from_lsn - 1
+        self.error: Exception | None = None
+        self._queue: queue.Queue[Any] = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="cdc-subscription", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def offer(self, events: list[ChangeEvent]) -> None:
+        for event in events:
+            if METRICS.enabled and self._queue.full():
+                METRICS.inc("cdc_backpressure_waits_total")
+            self._queue.put(event)
+
+    def _deliver(self, batch: list[ChangeEvent]) -> None:
+        if not batch:
+            return
+        self.handler(batch)
+        self.delivered_lsn = batch[-1].lsn
+        if METRICS.enabled:
+            METRICS.inc("cdc_events_delivered_total", len(batch))
+
+    def catch_up(self, from_lsn: int) -> None:
+        """Queue the WAL's events from `from_lsn` ahead of the live ones."""
+        for tid, operations in read_log(self._feed.database.wal, from_lsn):
+            self.offer(
+                [
+                    ChangeEvent(lsn, tid, operations[lsn])
+                    for lsn in sorted(operations)
+                    if lsn >= from_lsn
+                ]
+            )
+
+    def _run(self) -> None:
+        try:
+            closing = False
+            while not closing:
+                item = self._queue.get()
+                batch: list[ChangeEvent] = []
+                while item is not _CLOSE:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                closing = item is _CLOSE
+                self._deliver(batch)
+        except Exception as e:
+            self.error = e
+            self._feed._remove(self)
+            # Keep draining so a commit blocked on the full queue is released.
+            while self._queue.get() is not _CLOSE:
+                pass
+
+    def close(self) -> None:
+        """Stop receiving events once the ones already queued are delivered."""
+        self._feed._remove(self)
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+
+class ChangeFeed:
+    def __init__(self, database: DatabaseInterface):
+        self.database = database
+        self._subscriptions: list[Subscription] = []
+        self._lock = threading.Lock()
+        # Held from a commit's WAL write to its publish, so subscribers get commits in log
+        # order and a catch-up from the WAL meets the live events without gap or overlap.
+        self._commit_lock = threading.Lock()
+
+    def subscribe(
+        self,
+        handler: ChangeHandler,
+        from_lsn: int | None = None,
+        batch_size: int = 100,
+        max_pending: int = 10_000,
+    ) -> Subscription:
+        subscription = Subscription(self, handler, from_lsn, batch_size, max_pending)
+        subscription.start()
+        with self._commit_lock:
+            # Commits wait while the WAL backlog is queued.
+            if from_lsn is not None:
+                subscription.catch_up(from_lsn)
+            with self._lock:
+                if subscription.error is None:
+                    self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    @contextmanager
+    def committing(self) -> Iterator[None]:
+        """Held by a commit around its WAL write and `publish`."""
+        with self._commit_lock:
+            yield
+
+    def publish(self, transaction: TransactionInterface) -> None:
+        if not self._subscriptions:
+            return
+        events = [
+            ChangeEvent(lsn, tid, operation)
+            for tid, operations in transaction.to_dict().items()
+            for lsn, operation in sorted(operations.items())
+        ]
+        if not events:
+            return
+        for subscription in self._subscriptions:
+            subscription.offer(events)
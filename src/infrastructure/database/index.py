@@ -0,0 +1,36 @@
+from collections.abc import Hashable, Iterable, Mapping
+from typing import Any
+
+_MISSING = object()
+
+
+class FieldIndex:
+    """Equality index of one record field, kept current through the commit listeners."""
+
+    def __init__(self, field: str, data: Mapping[int, Any]):
+        self.field = field
+        self._keys_by_value: dict[Hashable, set[int]] = {}
+        self._value_by_key: dict[int, Hashable] = {}
+        self.update(data.keys(), data)
+
+    def update(self, keys: Iterable[int], data: Mapping[int, Any]) -> None:
+        for key in keys:
+            old = self._value_by_key.pop(key, _MISSING)
+            if old is not _MISSING:
+                bucket = self._keys_by_value[old]
+                bucket.discard(key)
+                if not bucket:
+                    del self._keys_by_value[old]
+            record = data.get(key)
+            if not isinstance(record, dict) or self.field not in record:
+                continue
+            value = record[self.field]
+            if not isinstance(value, Hashable):
+                continue
+            self._value_by_key[key] = value
+            self._keys_by_value.setdefault(value, set()).add(key)
+
+    def lookup(self, value: Any) -> set[int]:
+        if not isinstance(value, Hashable):
+            return set()
+        return self._keys_by_value.get(value, set())
@@ -1,21 +1,23 @@
+import hashlib
 import json
-from collections.abc import Generator
-from dataclasses import is_dataclass
+import os
+import pickle
+import threading
+from collections.abc import Callable, Generator, Iterable
 from pathlib import Path
 from typing import Any
 
 from src.core.ports.database import DatabaseInterface, WriteAheadLogInterface
+from src.infrastructure.database.aggregate import AggregateView
+from src.infrastructure.database.cdc import ChangeFeed
+from src.infrastructure.database.durability import Durability, SnapshotWriter
+from src.infrastructure.database.index import FieldIndex
+from src.infrastructure.database.mapped_snapshot import write_snapshot
+from src.infrastructure.database.recovery import read_log, recover
 from src.infrastructure.database.transaction import Transaction, TransactionFactory
-from src.infrastructure.util import convert_keys_to_int
-
-
-def object_to_dict(obj: object) -> dict[str, Any] | object:
-    if is_dataclass(obj):
-        return obj.to_dict()  # type: ignore
-    elif hasattr(obj, "__dict__"):
-        return obj.__dict__
-    else:
-        return obj
+from src.infrastructure.metrics import METRICS, timed
+from src.infrastructure.profiler import PROFILER
+from src.infrastructure.util import convert_keys_to_int, object_to_dict
 
 
 class SimpleDatabase(DatabaseInterface):
@@ -24,23 +26,51 @@ class SimpleDatabase(DatabaseInterface):
         self._next_id = 0
         self._next_tid = 0
         self._next_lsn = 0
+        self.checkpoint_lsn = 0
         self._transaction_factory = self._transaction_generator()
+        self._commit_listeners: list[Callable[[Iterable[int]], None]] = []
+        self.indexes: dict[str, FieldIndex] = {}
+        self.spill_threshold: int | None = None
+        self.spill_dir: str | None = None
+        self.change_feed = ChangeFeed(self)
+        self.aggregates: AggregateView | None = None
         self.wal = wal
 
     def sync(self):
         self.wal.apply_log(self)
 
+    def create_index(self, field: str) -> FieldIndex:
+        index = self.indexes[field] = FieldIndex(field, self.data)
+        self.add_commit_listener(lambda keys: index.update(keys, self.data))
+        return index
+
+    def create_aggregates(self) -> AggregateView:
+        if self.aggregates is None:
+            aggregates = self.aggregates = AggregateView(self.data)
+            self.add_commit_listener(lambda keys: aggregates.update(keys, self.data))
+        return self.aggregates
+
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        self._commit_listeners.append(listener)
+
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        for listener in self._commit_listeners:
+            listener(keys)
+
     def set(self, key: int, value: object):
         self.data[key] = object_to_dict(value)
+        self.notify_commit((key,))
 
     def create(self, value: object) -> int:
         key = self.next_id
         self.data[key] = object_to_dict(value)
+        self.notify_commit((key,))
         return key
 
     def delete(self, key: int):
         if key in self.data:
             del self.data[key]
+            self.notify_commit((key,))
 
     def get(self, key: int) -> object:
         return self.data.get(key)
@@ -78,11 +108,48 @@ class SimpleDatabase(DatabaseInterface):
         return id
 
 
+DELTA_INFIX = ".delta."
+STATE_CACHE_VERSION = 3
+# A cache hit replays the WAL written since the cache; past this many operations it is rewritten.
+STATE_CACHE_REFRESH = 10_000
+
+
 class JsonDatabase(DatabaseInterface):
-    def __init__(self, json_filepath: str, wal: WriteAheadLogInterface):
+    def __init__(
+        self,
+        json_filepath: str,
+        wal: WriteAheadLogInterface,
+        mapped_snapshot_filepath: str | None = None,
+        durability: Durability | None = None,
+        delta_merge_ratio: float | None = None,
+        state_cache_filepath: str | None = None,
+    ):
         self.json_filepath = Path(json_filepath)
+        self.state_cache_filepath = Path(state_cache_filepath) if state_cache_filepath else None
         self.wal = wal
+        self.mapped_snapshot_filepath = mapped_snapshot_filepath
+        self.durability = durability
+        self.delta_merge_ratio = delta_merge_ratio
+        self._snapshot_writer: SnapshotWriter | None = None
+        if delta_merge_ratio is not None or (
+            durability is not None and durability.background_snapshots
+        ):
+            self._snapshot_writer = SnapshotWriter(self._write_snapshot)
+        self._dirty: set[int] = set()
+        self._delta_seq = 0
+        self._delta_sizes: dict[int, int] = {}
+        self._delta_lock = threading.Lock()
+        self._base_size = 0
+        self._merge_pending = False
         self._transaction_factory = self._transaction_generator()
+        self._commit_listeners: list[Callable[[Iterable[int]], None]] = []
+        if delta_merge_ratio is not None:
+            self._commit_listeners.append(self._dirty.update)
+        self.indexes: dict[str, FieldIndex] = {}
+        self.spill_threshold: int | None = None
+        self.spill_dir: str | None = None
+        self.change_feed = ChangeFeed(self)
+        self.aggregates: AggregateView | None = None
         self._load_data()
 
     @property
@@ -103,6 +170,7 @@ class JsonDatabase(DatabaseInterface):
         self._next_lsn += 1
         return id
 
+    @timed("database_load_seconds")
     def _load_data(self) -> None:
         if not self.json_filepath.exists():
             self.json_filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -111,34 +179,275 @@ class JsonDatabase(DatabaseInterface):
             self._next_id = 0
             self._next_tid = 0
             self._next_lsn = 0
+            self.checkpoint_lsn = 0
             self._save_data()
             return
-        with open(self.json_filepath) as f:
-            json_to_load = json.load(f)
+        if self._load_state_cache():
+            return
+        with PROFILER.phase("load"):
+            with open(self.json_filepath) as f:
+                json_to_load = json.load(f)
+                self._base_size = f.tell()
             self.data = convert_keys_to_int(json_to_load["data"])
-            self._next_id = json_to_load["next_id"]
-            self._next_tid = json_to_load["next_tid"]
-            self._next_lsn = json_to_load["next_lsn"]
-        self.sync()
+            self._set_counters(json_to_load)
+            self._load_deltas(json_to_load.get("merged_delta", 0))
+        with PROFILER.phase("replay"):
+            self.sync()
+        if self.state_cache_filepath is not None:
+            self._save_state_cache()
 
-    def _save_data(self) -> None:
+    def _snapshot_sources(self) -> list[tuple[str, int, int, str]]:
+        sources = []
+        for path in [self.json_filepath, *(path for _, path in self._delta_files())]:
+            stat = path.stat()
+            with open(path, "rb") as f:
+                digest = hashlib.file_digest(f, "blake2b").hexdigest()
+            sources.append((path.name, stat.st_size, stat.st_mtime_ns, digest))
+        return sources
+
+    def _load_state_cache(self) -> bool:
+        """Restore the post-recovery state saved by `_save_state_cache` if the snapshot it was
+        built from is unchanged and the WAL still holds the last transaction it applied, then
+        replay only the WAL written after its last applied LSN."""
+        if self.state_cache_filepath is None or not self.state_cache_filepath.exists():
+            return False
+        try:
+            with PROFILER.phase("load"), open(self.state_cache_filepath, "rb") as f:
+                header = pickle.load(f)
+                if (
+                    header.get("version") != STATE_CACHE_VERSION
+                    or header["sources"] != self._snapshot_sources()
+                    or not self._wal_reaches(header["wal_tail"])
+                ):
+                    state = None
+                else:
+                    state = pickle.load(f)
+        except Exception:
+            # Unreadable or from an older layout; rebuilt below from the snapshot.
+            state = None
+        if state is None:
+            if METRICS.enabled:
+                METRICS.inc("database_state_cache_misses_total")
+            return False
+        self.data = state["data"]
+        self._set_counters(state["counters"])
+        self._base_size = state["base_size"]
+        self._delta_seq = state["delta_seq"]
+        self._delta_sizes = state["delta_sizes"]
+        # Records replayed into the cached state that no delta checkpoint has written yet.
+        self._dirty.update(state["dirty"])
+        if state.get("aggregates") is not None:
+            self._watch_aggregates(state["aggregates"])
+        with PROFILER.phase("replay"):
+            replayed = self._replay_from(header["applied_lsn"])
+        if METRICS.enabled:
+            METRICS.inc("database_state_cache_hits_total")
+        if replayed >= STATE_CACHE_REFRESH:
+            self._save_state_cache()
+        return True
+
+    def _wal_tail(self) -> tuple[int, int] | None:
+        """The tid and last LSN of the newest logged transaction applied past the snapshot."""
+        tail = None
+        for tid, operations in read_log(self.wal, self.checkpoint_lsn):
+            last = max(operations)
+            if last < self._next_lsn and (tail is None or last > tail[1]):
+                tail = (tid, last)
+        return tail
+
+    def _wal_reaches(self, tail: tuple[int, int] | None) -> bool:
+        # A truncated or swapped WAL no longer holds what the cached state was replayed from.
+        if tail is None:
+            return True
+        tid, lsn = tail
+        return any(
+            record_tid == tid and max(operations) == lsn
+            for record_tid, operations in read_log(self.wal, lsn)
+        )
+
+    def _replay_from(self, lsn: int) -> int:
+        return recover(self, read_log(self.wal, lsn)).operations
+
+    def _save_state_cache(self) -> None:
+        assert self.state_cache_filepath is not None
         try:
-            json_to_save = {
+            header = {
+                "version": STATE_CACHE_VERSION,
+                "sources": self._snapshot_sources(),
+                "applied_lsn": self._next_lsn,
+                "wal_tail": self._wal_tail(),
+            }
+            state = {
                 "data": self.data,
-                "next_id": self._next_id,
-                "next_tid": self._next_tid,
-                "next_lsn": self._next_lsn,
+                "counters": {**self._counters(), "checkpoint_lsn": self.checkpoint_lsn},
+                "base_size": self._base_size,
+                "delta_seq": self._delta_seq,
+                "delta_sizes": self._delta_sizes,
+                "dirty": self._dirty,
+                "aggregates": self.aggregates,
             }
-            with open(self.json_filepath, "w") as f:
-                json.dump(json_to_save, f)
+            temporary = self.state_cache_filepath.with_name(self.state_cache_filepath.name + ".tmp")
+            with PROFILER.phase("persist"), open(temporary, "wb") as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.state_cache_filepath)
+        except OSError as e:
+            print("Error saving state cache\nTraceback:\n\t", e)
+
+    def _counters(self) -> dict[str, int]:
+        return {
+            "next_id": self._next_id,
+            "next_tid": self._next_tid,
+            "next_lsn": self._next_lsn,
+            "checkpoint_lsn": self._next_lsn,
+        }
+
+    def _set_counters(self, counters: dict[str, Any]) -> None:
+        self._next_id = counters["next_id"]
+        self._next_tid = counters["next_tid"]
+        self._next_lsn = counters["next_lsn"]
+        self.checkpoint_lsn = counters.get("checkpoint_lsn", 0)
+
+    @timed("database_save_seconds")
+    def _save_data(self) -> None:
+        if self.delta_merge_ratio is not None and self._base_size:
+            self._save_delta()
+            return
+        json_to_save = {"data": self.data, **self._counters(), "merged_delta": self._delta_seq}
+        if self._snapshot_writer is None or not self._base_size:
+            self._write_snapshot(json_to_save)
+        else:
+            # Records are replaced, never mutated in place, so a shallow copy is a stable view.
+            self._snapshot_writer.submit({**json_to_save, "data": dict(self.data)})
+
+    def _delta_files(self) -> list[tuple[int, Path]]:
+        prefix = self.json_filepath.name + DELTA_INFIX
+        found = []
+        for path in self.json_filepath.parent.glob(prefix + "*"):
+            suffix = path.name[len(prefix) :]
+            if suffix.isdigit():
+                found.append((int(suffix), path))
+        return sorted(found)
+
+    def _load_deltas(self, merged: int) -> None:
+        self._delta_seq = merged
+        for seq, path in self._delta_files():
+            if seq <= merged:
+                # Left behind by a merge that stopped before cleaning up.
+                path.unlink(missing_ok=True)
+                continue
+            with open(path) as f:
+                delta = json.load(f)
+                size = f.tell()
+            for key, value in convert_keys_to_int(delta["records"]).items():
+                if value is None:
+                    self.data.pop(key, None)
+                else:
+                    self.data[key] = value
+            self._set_counters(delta)
+            self._delta_seq = seq
+            self._delta_sizes[seq] = size
+
+    def _save_delta(self) -> None:
+        """Write only the records changed since the previous checkpoint."""
+        self._delta_seq += 1
+        delta = {
+            "records": {key: self.data.get(key) for key in self._dirty},
+            **self._counters(),
+        }
+        path = self.json_filepath.with_name(
+            f"{self.json_filepath.name}{DELTA_INFIX}{self._delta_seq:08d}"
+        )
+        size = self._write_json(path, delta)
+        self._dirty.clear()
+        self.checkpoint_lsn = delta["checkpoint_lsn"]
+        with self._delta_lock:
+            self._delta_sizes[self._delta_seq] = size
+            total = sum(self._delta_sizes.values())
+        if METRICS.enabled:
+            METRICS.inc("database_delta_checkpoints_total")
+        ratio = self.delta_merge_ratio or 0.0
+        writer = self._snapshot_writer
+        if writer is not None and not self._merge_pending and total > ratio * self._base_size:
+            self._merge_pending = True
+            writer.submit(
+                {"data": dict(self.data), **self._counters(), "merged_delta": self._delta_seq}
+            )
+
+    def _write_json(self, path: Path, content: dict[str, Any]) -> int:
+        temporary = path.with_name(path.name + ".tmp")
+        with PROFILER.phase("persist"), open(temporary, "w") as f:
+            json.dump(content, f)
+            size = f.tell()
+            if METRICS.enabled:
+                METRICS.inc("database_bytes_written_total", size)
+            if self.durability is not None:
+                self.durability.written(f, temporary)
+        os.replace(temporary, path)
+        if self.durability is not None:
+            self.durability.sync_directory(path)
+        return size
+
+    def _write_snapshot(self, json_to_save: dict[str, Any]) -> None:
+        try:
+            self._base_size = self._write_json(self.json_filepath, json_to_save)
+            merged = json_to_save.get("merged_delta", 0)
+            with self._delta_lock:
+                for seq in [seq for seq in self._delta_sizes if seq <= merged]:
+                    del self._delta_sizes[seq]
+            for seq, path in self._delta_files():
+                if seq <= merged:
+                    path.unlink(missing_ok=True)
+            self._merge_pending = False
+            if self.mapped_snapshot_filepath:
+                with PROFILER.phase("persist"):
+                    write_snapshot(
+                        self.mapped_snapshot_filepath,
+                        json_to_save["data"],
+                        next_id=json_to_save["next_id"],
+                        next_tid=json_to_save["next_tid"],
+                        next_lsn=json_to_save["next_lsn"],
+                        checkpoint_lsn=json_to_save["checkpoint_lsn"],
+                    )
+            self.checkpoint_lsn = max(self.checkpoint_lsn, json_to_save["checkpoint_lsn"])
         except Exception as e:
             print("Error saving data\nTraceback:\n\t", e)
 
+    def checkpoint(self) -> None:
+        self._save_data()
+        if self.delta_merge_ratio is None:
+            self.wait_for_snapshot()
+        if self.state_cache_filepath is not None:
+            # Persists the aggregates with the state, so a restart does not rescan the records.
+            self._save_state_cache()
+
+    def wait_for_snapshot(self) -> None:
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.wait()
+
+    def close(self) -> None:
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.close()
+
+    def create_index(self, field: str) -> FieldIndex:
+        index = self.indexes[field] = FieldIndex(field, self.data)
+        self.add_commit_listener(lambda keys: index.update(keys, self.data))
+        return index
+
+    def create_aggregates(self) -> AggregateView:
+        if self.aggregates is None:
+            self._watch_aggregates(AggregateView(self.data))
+        return self.aggregates
+
+    def _watch_aggregates(self, aggregates: AggregateView) -> None:
+        self.aggregates = aggregates
+        self.add_commit_listener(lambda keys: aggregates.update(keys, self.data))
+
     def _transaction_generator(self) -> Generator[Transaction, None, None]:
         transaction = None
         while True:
-            if transaction is not None:
-                transaction.commit(transaction)
+            if transaction is not None and not transaction._committed:
+                transaction.commit()
             transaction = Transaction(self.next_tid, self)
             yield transaction
 
@@ -148,9 +457,17 @@ class JsonDatabase(DatabaseInterface):
     def sync(self):
         self.wal.apply_log(self)
 
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        self._commit_listeners.append(listener)
+
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        for listener in self._commit_listeners:
+            listener(keys)
+
     def set(self, key: int, value: object):
         if key in self.data:
             self.data[key] = object_to_dict(value)
+            self.notify_commit((key,))
             self._save_data()
         else:
             raise KeyError(f"Key {key} not found in database")
@@ -158,12 +475,14 @@ class JsonDatabase(DatabaseInterface):
     def create(self, value: object) -> int:
         key = self.next_id
         self.data[key] = object_to_dict(value)
+        self.notify_commit((key,))
         self._save_data()
         return key
 
     def delete(self, key: int):
         try:
             del self.data[key]
+            self.notify_commit((key,))
             self._save_data()
         except KeyError as exc:
             raise KeyError(f"Key {key} not found in database: {exc}") from exc
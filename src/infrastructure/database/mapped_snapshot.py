@@ -0,0 +1,269 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.core.ports.database import DatabaseInterface
+from src.infrastructure.database.replica import ReadOnlyTransaction
+
+MAGIC = b"BKSNAP\x00\x01"
+HEADER = struct.Struct("<8sQQQQQI")
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+# Column kinds: fixed-width int64/float64 values, or (offset, length) pairs into the string heap
+# holding either UTF-8 text or JSON for values of mixed type.
+INT, FLOAT, TEXT, JSON = b"q", b"d", b"s", b"j"
+# Records that are not dicts are stored whole in this column.
+RAW_COLUMN = ""
+
+
+def _column_kind(values: Iterable[Any]) -> bytes:
+    kinds = set()
+    for value in values:
+        if isinstance(value, bool) or value is None:
+            return JSON
+        if isinstance(value, int):
+            if not INT64_MIN <= value <= INT64_MAX:
+                return JSON
+            kinds.add(INT)
+        elif isinstance(value, float):
+            kinds.add(FLOAT)
+        elif isinstance(value, str):
+            kinds.add(TEXT)
+        else:
+            return JSON
+    return kinds.pop() if len(kinds) == 1 else JSON
+
+
+def _pad(buffer: bytearray) -> None:
+    buffer.extend(b"\x00" * (-len(buffer) % 8))
+
+
+def encode_snapshot(
+    data: Mapping[int, object],
+    next_id: int = 0,
+    next_tid: int = 0,
+    next_lsn: int = 0,
+    checkpoint_lsn: int = 0,
+) -> bytes:
+    ids = sorted(data)
+    records = [data[key] for key in ids]
+    fields: dict[str, list[Any]] = {}
+    for record in records:
+        if isinstance(record, dict):
+            for name, value in record.items():
+                fields.setdefault(name, []).append(value)
+        else:
+            fields.setdefault(RAW_COLUMN, []).append(record)
+    columns = [(name, _column_kind(values)) for name, values in fields.items()]
+
+    buffer = bytearray(
+        HEADER.pack(MAGIC, len(ids), next_id, next_tid, next_lsn, checkpoint_lsn, len(columns))
+    )
+    for name, kind in columns:
+        encoded = name.encode()
+        buffer.extend(struct.pack("<H", len(encoded)) + encoded + kind)
+    _pad(buffer)
+    buffer.extend(array("q", ids).tobytes())
+
+    heap = bytearray()
+    interned: dict[bytes, int] = {}
+
+    def intern(encoded: bytes) -> int:
+        offset = interned.get(encoded)
+        if offset is None:
+            offset = interned[encoded] = len(heap)
+            heap.extend(encoded)
+        return offset
+
+    for name, kind in columns:
+        present = bytearray(len(ids))
+        values = array("d" if kind == FLOAT else "q" if kind == INT else "I", [])
+        for index, record in enumerate(records):
+            if name == RAW_COLUMN:
+                found = not isinstance(record, dict)
+                value = record
+            else:
+                found = isinstance(record, dict) and name in record
+                value = record.get(name) if found else None  # type: ignore[union-attr]
+            present[index] = found
+            if kind in (INT, FLOAT):
+                values.append(value if found else 0)
+                continue
+            if not found:
+                values.extend((0, 0))
+                continue
+            encoded = value.encode() if kind == TEXT else json.dumps(value).encode()
+            values.extend((intern(encoded), len(encoded)))
+        buffer.extend(present)
+        _pad(buffer)
+        buffer.extend(values.tobytes())
+        _pad(buffer)
+    buffer.extend(heap)
+    return bytes(buffer)
+
+
+def write_snapshot(path: str | Path, data: Mapping[int, object], **counters: int) -> None:
+    """Atomically replace `path`; readers that mapped the old file keep their view."""
+    target = Path(path)
+    temporary = target.with_name(target.name + ".tmp")
+    temporary.write_bytes(encode_snapshot(data, **counters))
+    os.replace(temporary, target)
+
+
+@dataclass(frozen=True)
+class _Column:
+    name: str
+    kind: bytes
+    present: memoryview
+    values: memoryview
+
+
+class MappedSnapshot(Mapping[int, object]):
+    """Read-only view over a snapshot file; records are decoded on access."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = self._view = memoryview(self._mmap)
+        magic, count, *counters, column_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"Not a mapped snapshot: {self.path}")
+        self.next_id, self.next_tid, self.next_lsn, self.checkpoint_lsn = counters
+        position = HEADER.size
+        descriptors = []
+        for _ in range(column_count):
+            (length,) = struct.unpack_from("<H", view, position)
+            name = bytes(view[position + 2 : position + 2 + length]).decode()
+            kind = bytes(view[position + 2 + length : position + 3 + length])
+            descriptors.append((name, kind))
+            position += 3 + length
+        position += -position % 8
+        self._ids = view[position : position + 8 * count].cast("q")
+        position += 8 * count
+        self._columns = []
+        for name, kind in descriptors:
+            present = view[position : position + count]
+            position += count + (-count % 8)
+            width = 8 * count
+            raw = view[position : position + width]
+            values = raw.cast("d" if kind == FLOAT else "q" if kind == INT else "I")
+            position += width
+            self._columns.append(_Column(name, kind, present, values))
+        self._heap = view[position:]
+
+    def _index(self, key: int) -> int | None:
+        index = bisect_left(self._ids, key)
+        if index < len(self._ids) and self._ids[index] == key:
+            return index
+        return None
+
+    def _decode(self, index: int) -> object:
+        record: dict[str, Any] = {}
+        for column in self._columns:
+            if not column.present[index]:
+                continue
+            if column.kind in (INT, FLOAT):
+                value = column.values[index]
+            else:
+                offset, length = column.values[2 * index], column.values[2 * index + 1]
+                raw = bytes(self._heap[offset : offset + length])
+                value = raw.decode() if column.kind == TEXT else json.loads(raw)
+            if column.name == RAW_COLUMN:
+                return value
+            record[column.name] = value
+        return record
+
+    def __getitem__(self, key: int) -> object:
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+        return self._decode(index)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, int) and self._index(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def copy(self) -> dict[int, object]:
+        return {key: self._decode(index) for index, key in enumerate(self._ids.tolist())}
+
+    def close(self) -> None:
+        for column in self._columns:
+            column.present.release()
+            column.values.release()
+        self._ids.release()
+        self._heap.release()
+        self._view.release()
+        self._mmap.close()
+
+
+class MappedSnapshotDatabase(DatabaseInterface):
+    def __init__(self, snapshot_filepath: str):
+        self.snapshot_filepath = Path(snapshot_filepath)
+        self._commit_listeners: list[Callable[[Iterable[int]], None]] = []
+        self.data = MappedSnapshot(self.snapshot_filepath)  # type: ignore[assignment]
+        self._read_counters()
+
+    def _read_counters(self) -> None:
+        self._next_id = self.data.next_id
+        self._next_tid = self.data.next_tid
+        self._next_lsn = self.data.next_lsn
+        self.checkpoint_lsn = self.data.checkpoint_lsn
+
+    def sync(self) -> None:
+        if self.snapshot_filepath.stat().st_ino == self.data.inode:
+            return
+        stale = self.data
+        self.data = MappedSnapshot(self.snapshot_filepath)  # type: ignore[assignment]
+        self._read_counters()
+        self.notify_commit(set(stale) | set(self.data))
+
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        self._commit_listeners.append(listener)
+
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        for listener in self._commit_listeners:
+            listener(keys)
+
+    def set(self, key: int, value: object):
+        raise PermissionError("Mapped snapshot is read-only")
+
+    def create(self, value: object) -> int:
+        raise PermissionError("Mapped snapshot is read-only")
+
+    def delete(self, key: int):
+        raise PermissionError("Mapped snapshot is read-only")
+
+    def get(self, key: int) -> object:
+        return self.data.get(key)
+
+    def get_all(self) -> list[object]:
+        return list(self.data.copy().values())  # type: ignore[attr-defined]
+
+    def begin_transaction(self) -> ReadOnlyTransaction:
+        return ReadOnlyTransaction(self._next_tid, self)
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @property
+    def next_tid(self) -> int:
+        return self._next_tid
+
+    @property
+    def next_lsn(self) -> int:
+        return self._next_lsn
@@ -1,4 +1,8 @@
-from typing import Any, cast
+import json
+from array import array
+from collections.abc import Callable, Iterator, Sequence
+from itertools import islice
+from typing import Any, cast, overload
 
 from src.core.ports.database import Operation, TransactionInterface
 
@@ -10,21 +14,43 @@ class SetOperation(Operation):
         self.key = key
         self.value = value
         self.previous_value: object | None = None
+        self.changes: dict[str, Any] | None = None
+        self.removed: list[str] = []
         self._transaction = transaction
-        self._lsn: int = lsn or self._transaction._storage.next_lsn
+        self._lsn: int = lsn if lsn is not None else self._transaction._storage.next_lsn
 
     def execute(
         self,
     ):
+        if self.changes is not None:
+            return self._execute_delta()
         self.previous_value = self.previous_value or self._transaction.get(self.key)
         if self.previous_value is None:
             raise ValueError("No previous value. Did you mean to create?")
         self._transaction._temp_data[self.key] = self.value
 
+    def _execute_delta(self):
+        base = self._transaction.get(self.key)
+        if not isinstance(base, dict):
+            # The record was deleted by a later logged transaction already in the snapshot.
+            return
+        self.previous_value = self.previous_value or base
+        value = {**base, **(self.changes or {})}
+        for field in self.removed:
+            value.pop(field, None)
+        self.value = value
+        self._transaction._temp_data[self.key] = value
+
     def undo(self):
-        self._transaction._temp_data[self.key] = self.previous_value
+        if self.previous_value is not None:
+            self._transaction._temp_data[self.key] = self.previous_value
 
     def to_dict(self) -> dict[int, dict[str, Any]]:
+        if self.changes is not None:
+            return {self._lsn: self._delta_dict(self.changes, self.removed)}
+        if isinstance(self.value, dict) and isinstance(self.previous_value, dict):
+            changes, removed = diff_records(self.previous_value, self.value)
+            return {self._lsn: self._delta_dict(changes, removed)}
         return {
             self._lsn: {
                 "operation": "set",
@@ -34,13 +60,20 @@ class SetOperation(Operation):
             }
         }
 
+    def _delta_dict(self, changes: dict[str, Any], removed: list[str]) -> dict[str, Any]:
+        delta = {"operation": "set", "key": self.key, "changes": changes}
+        if removed:
+            delta["removed"] = removed
+        return delta
+
     @classmethod
     def from_dict(cls, lsn: int, transaction: TransactionInterface, **kwargs) -> "SetOperation":
         key = kwargs["key"]
-        value = kwargs["value"]
-        previous_value = kwargs.get("previous_value")
-        op = cls(key, value, transaction, lsn)
-        op.previous_value = previous_value
+        op = cls(key, kwargs.get("value"), transaction, lsn)
+        op.previous_value = kwargs.get("previous_value")
+        if "changes" in kwargs:
+            op.changes = kwargs["changes"]
+            op.removed = kwargs.get("removed", [])
         return op
 
 
@@ -49,7 +82,7 @@ class CreateOperation(Operation):
         self.key: int | None = None
         self.value = value
         self._transaction = transaction
-        self._lsn = lsn or self._transaction._storage.next_lsn
+        self._lsn = lsn if lsn is not None else self._transaction._storage.next_lsn
 
     def execute(self) -> int:
         if self.key is None:
@@ -77,29 +110,28 @@ class DeleteOperation(Operation):
     def __init__(self, key: int, transaction: TransactionInterface, lsn: int | None = None):
         self.key = key
         self._transaction = transaction
-        self._lsn: int = lsn or self._transaction._storage.next_lsn
+        self._lsn: int = lsn if lsn is not None else self._transaction._storage.next_lsn
         self.previous_value: object | None = None
+        self.redo = False
 
     def execute(self) -> None:
         self.previous_value = self.previous_value or self._transaction.get(self.key)
         if self.previous_value is None:
+            if self.redo:
+                return
             raise ValueError("No previous value. Maybe you want to create?")
         self._transaction._temp_data[self.key] = None
 
     def undo(self):
         if self.previous_value is None:
+            if self.redo:
+                return
             raise ValueError("No previous value to undo")
         else:
             self._transaction._temp_data[self.key] = self.previous_value
 
     def to_dict(self) -> dict[int, dict[str, Any]]:
-        return {
-            self._lsn: {
-                "operation": "delete",
-                "key": self.key,
-                "previous_value": self.previous_value,
-            }
-        }
+        return {self._lsn: {"operation": "delete", "key": self.key}}
 
     @classmethod
     def from_dict(cls, lsn: int, transaction: TransactionInterface, **kwargs) -> "DeleteOperation":
@@ -107,9 +139,77 @@ class DeleteOperation(Operation):
         previous_value = kwargs.get("previous_value")
         op = cls(key, transaction, lsn)
         op.previous_value = previous_value
+        op.redo = previous_value is None
         return op
 
 
+class DeleteWhereOperation(Operation):
+    def __init__(self, keys: list[int], transaction: TransactionInterface, lsn: int | None = None):
+        self.keys = keys
+        self._transaction = transaction
+        self._lsn: int = lsn if lsn is not None else self._transaction._storage.next_lsn
+        self.previous_values: dict[int, object] = {}
+
+    def execute(self) -> None:
+        for key in self.keys:
+            previous = self.previous_values.get(key) or self._transaction.get(key)
+            if previous is None:
+                continue
+            self.previous_values[key] = previous
+            self._transaction._temp_data[key] = None
+
+    def undo(self):
+        for key, previous in self.previous_values.items():
+            self._transaction._temp_data[key] = previous
+
+    def to_dict(self) -> dict[int, dict[str, Any]]:
+        return {self._lsn: {"operation": "delete_where", "keys": self.keys}}
+
+    @classmethod
+    def from_dict(
+        cls, lsn: int, transaction: TransactionInterface, **kwargs
+    ) -> "DeleteWhereOperation":
+        return cls(kwargs["keys"], transaction, lsn)
+
+
+class UpdateWhereOperation(Operation):
+    def __init__(
+        self,
+        keys: list[int],
+        changes: dict[str, Any],
+        transaction: TransactionInterface,
+        lsn: int | None = None,
+    ):
+        self.keys = keys
+        self.changes = changes
+        self._transaction = transaction
+        self._lsn: int = lsn if lsn is not None else self._transaction._storage.next_lsn
+        self.previous_values: dict[int, object] = {}
+
+    def execute(self) -> None:
+        for key in self.keys:
+            base = self._transaction.get(key)
+            if not isinstance(base, dict):
+                continue
+            self.previous_values.setdefault(key, base)
+            self._transaction._temp_data[key] = {**base, **self.changes}
+
+    def undo(self):
+        for key, previous in self.previous_values.items():
+            self._transaction._temp_data[key] = previous
+
+    def to_dict(self) -> dict[int, dict[str, Any]]:
+        return {
+            self._lsn: {"operation": "update_where", "keys": self.keys, "changes": self.changes}
+        }
+
+    @classmethod
+    def from_dict(
+        cls, lsn: int, transaction: TransactionInterface, **kwargs
+    ) -> "UpdateWhereOperation":
+        return cls(kwargs["keys"], kwargs["changes"], transaction, lsn)
+
+
 class SimpleOperation(Operation):
     def __init__(self, key: int, lsn: int, value: object):
         self.key = key
@@ -139,6 +239,193 @@ class SimpleOperation(Operation):
         return op
 
 
+def diff_records(
+    previous: dict[str, Any], current: dict[str, Any]
+) -> tuple[dict[str, Any], list[str]]:
+    changes = {
+        field: value
+        for field, value in current.items()
+        if field not in previous or previous[field] != value
+    }
+    removed = [field for field in previous if field not in current]
+    return changes, removed
+
+
+CREATE = 0
+OBJECT = 1
+
+
+class OperationBuffer(Sequence[Operation]):
+    """Operations of one transaction. Creates are kept as parallel arrays rather than
+    `CreateOperation` objects."""
+
+    def __init__(self, transaction: TransactionInterface):
+        self._transaction = transaction
+        self._codes = bytearray()
+        self._keys = array("q")
+        self._lsns = array("q")
+        self._refs: list[Any] = []
+        self._executed = 0
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @overload
+    def __getitem__(self, index: int) -> Operation: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Operation]: ...
+
+    def __getitem__(self, index: int | slice) -> Operation | list[Operation]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        if self._codes[index] == CREATE:
+            # Handing out the entry as an object: later edits to it must be honoured.
+            operation = CreateOperation(self._refs[index], self._transaction, self._lsns[index])
+            operation.key = self._keys[index]
+            self._codes[index] = OBJECT
+            self._refs[index] = operation
+        return self._refs[index]
+
+    def append(self, operation: Operation) -> None:
+        self._push(OBJECT, 0, operation._lsn, operation)
+
+    def append_create(self, key: int, value: object) -> None:
+        # The LSN is taken now, like any other operation's, so the log keeps build order.
+        storage = self._transaction._storage
+        lsn = storage._next_lsn
+        storage._next_lsn = lsn + 1
+        self._codes.append(CREATE)
+        self._keys.append(key)
+        self._lsns.append(lsn)
+        self._refs.append(value)
+
+    def execute(self, start: int = 0) -> None:
+        temp_data = self._transaction._temp_data
+        entries = zip(self._codes, self._keys, self._refs, strict=True)
+        for code, key, ref in islice(entries, start, None):
+            if code == CREATE:
+                temp_data[key] = ref
+            else:
+                ref.execute()
+        self._executed = len(self._codes)
+
+    def execute_pending(self) -> None:
+        """Execute the entries appended since the last `execute`."""
+        self.execute(self._executed)
+
+    def undo(self) -> None:
+        temp_data = self._transaction._temp_data
+        for code, key, ref in zip(self._codes, self._keys, self._refs, strict=True):
+            if code == CREATE:
+                temp_data.pop(key, None)
+            else:
+                ref.undo()
+
+    def coalesce(self, baseline: Callable[[int], object]) -> int:
+        """Collapse each key's create/set/delete chain to its net effect. Runs after `execute`:
+        the outcome is read from the transaction's records and `baseline(key)`, the value the
+        key had before the transaction. Returns how many entries were dropped."""
+        chains: dict[int, int] = {}
+        pinned: set[int] = set()
+        for code, ref in zip(self._codes, self._refs, strict=True):
+            if code == CREATE:
+                continue
+            single = _single_key(code, 0, ref)
+            if single is not None:
+                chains[single] = chains.get(single, 0) + 1
+            elif isinstance(ref, DeleteWhereOperation | UpdateWhereOperation):
+                pinned.update(ref.keys)
+            else:
+                return 0
+        if not chains:
+            return 0
+        # Compact creates have unique keys, so only those named by another entry can repeat.
+        for code, key in zip(self._codes, self._keys, strict=True):
+            if code == CREATE and key in chains:
+                chains[key] += 1
+        repeated = {key for key, length in chains.items() if length > 1} - pinned
+        if not repeated:
+            return 0
+        entries = list(zip(self._codes, self._keys, self._lsns, self._refs, strict=True))
+        self._codes, self._keys, self._lsns, self._refs = bytearray(), array("q"), array("q"), []
+        temp_data = self._transaction._temp_data
+        emitted: set[int] = set()
+        for code, key, lsn, ref in entries:
+            single = _single_key(code, key, ref)
+            if single not in repeated:
+                self._push(code, key, lsn, ref)
+                continue
+            if single not in emitted:
+                # The net record takes the place of the chain's first operation.
+                emitted.add(single)
+                self._push_net(single, lsn, baseline(single), temp_data.get(single))
+        return len(entries) - len(self._codes)
+
+    def _push(self, code: int, key: int, lsn: int, ref: Any) -> None:
+        self._codes.append(code)
+        self._keys.append(key)
+        self._lsns.append(lsn)
+        self._refs.append(ref)
+
+    def _push_net(self, key: int, lsn: int, previous: object, current: object) -> None:
+        if previous is None and current is None:
+            return
+        if previous is None:
+            self._push(CREATE, key, lsn, current)
+            return
+        operation: Operation
+        if current is None:
+            operation = DeleteOperation(key, self._transaction, lsn)
+        else:
+            operation = SetOperation(key, current, self._transaction, lsn)
+        operation.previous_value = previous
+        self._push(OBJECT, 0, lsn, operation)
+
+    def lsn_bounds(self) -> tuple[int, int] | None:
+        if not self._lsns:
+            return None
+        return min(self._lsns), max(self._lsns)
+
+    def to_dict(self) -> dict[int, dict[str, Any]]:
+        operations: dict[int, dict[str, Any]] = {}
+        for code, key, lsn, ref in zip(
+            self._codes, self._keys, self._lsns, self._refs, strict=True
+        ):
+            if code == CREATE:
+                operations[lsn] = {"operation": "create", "value": ref, "key": key}
+            else:
+                operations.update(ref.to_dict())
+        return operations
+
+    def fragments(self) -> Iterator[str]:
+        """`"lsn": {...}` members of the operations object, one per operation."""
+        encode = _ENCODER.encode
+        for code, key, lsn, ref in zip(
+            self._codes, self._keys, self._lsns, self._refs, strict=True
+        ):
+            if code == CREATE:
+                yield f'"{lsn}": {{"operation": "create", "value": {encode(ref)}, "key": {key}}}'
+            else:
+                for entry_lsn, entry in ref.to_dict().items():
+                    yield f'"{entry_lsn}": {encode(entry)}'
+
+    def to_json(self) -> str:
+        return "{" + ", ".join(self.fragments()) + "}"
+
+
+_ENCODER = json.JSONEncoder()
+
+
+def _single_key(code: int, key: int, ref: Any) -> int | None:
+    if code == CREATE:
+        return key
+    if isinstance(ref, CreateOperation | SetOperation | DeleteOperation):
+        return ref.key
+    return None
+
+
 class OperationFactory[OperationType: Operation]:
     @staticmethod
     def create(
@@ -156,5 +443,15 @@ class OperationFactory[OperationType: Operation]:
             return cast(
                 OperationType, CreateOperation.from_dict(lsn=lsn, transaction=transaction, **kwargs)
             )
+        elif operation_type == "delete_where":
+            return cast(
+                OperationType,
+                DeleteWhereOperation.from_dict(lsn=lsn, transaction=transaction, **kwargs),
+            )
+        elif operation_type == "update_where":
+            return cast(
+                OperationType,
+                UpdateWhereOperation.from_dict(lsn=lsn, transaction=transaction, **kwargs),
+            )
         else:
             raise ValueError(f"Invalid operation type: {operation_type}")
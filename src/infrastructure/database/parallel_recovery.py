@@ -0,0 +1,47 @@
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
+
+from src.infrastructure.database.recovery import LogFold, LogRecord
+
+
+def fold_partitioned(records: Iterable[LogRecord], partitions: int) -> list[LogFold]:
+    folds = [LogFold() for _ in range(partitions)]
+    for tid, operations in records:
+        folds[0].note_transaction(tid)
+        buckets: dict[int, dict[int, dict[str, Any]]] = {}
+        for lsn, operation in operations.items():
+            if "keys" in operation:
+                split: dict[int, list[int]] = {}
+                for key in operation["keys"]:
+                    split.setdefault(hash(key) % partitions, []).append(key)
+                for partition, keys in split.items():
+                    buckets.setdefault(partition, {})[lsn] = {**operation, "keys": keys}
+                continue
+            buckets.setdefault(hash(operation["key"]) % partitions, {})[lsn] = operation
+        for partition, partition_operations in buckets.items():
+            folds[partition].add_operations(partition_operations)
+    return folds
+
+
+def _fold_chunk[ChunkType](
+    load: Callable[[ChunkType], Iterable[LogRecord]], partitions: int, chunk: ChunkType
+) -> list[LogFold]:
+    return fold_partitioned(load(chunk), partitions)
+
+
+def parallel_fold[ChunkType](
+    chunks: Sequence[ChunkType],
+    load: Callable[[ChunkType], Iterable[LogRecord]],
+    workers: int,
+) -> LogFold:
+    partitions = [LogFold() for _ in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_folds in executor.map(partial(_fold_chunk, load, workers), chunks):
+            for merged, chunk_fold in zip(partitions, chunk_folds, strict=True):
+                merged.then(chunk_fold)
+    result = LogFold()
+    for merged in partitions:
+        result.then(merged)
+    return result
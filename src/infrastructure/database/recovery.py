@@ -0,0 +1,175 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.core.ports.database import DatabaseInterface, WriteAheadLogInterface
+from src.infrastructure.metrics import METRICS
+
+type LogRecord = tuple[int, dict[int, dict[str, Any]]]
+
+
+@dataclass
+class Value:
+    value: Any
+
+
+@dataclass
+class Tombstone:
+    pass
+
+
+@dataclass
+class Delta:
+    changes: dict[str, Any]
+    removed: set[str] = field(default_factory=set)
+
+    def apply_to(self, base: dict[str, Any]) -> dict[str, Any]:
+        value = {**base, **self.changes}
+        for name in self.removed:
+            value.pop(name, None)
+        return value
+
+    def then(self, other: "Delta") -> "Delta":
+        changes = {k: v for k, v in self.changes.items() if k not in other.removed}
+        changes.update(other.changes)
+        return Delta(changes, (self.removed - other.changes.keys()) | other.removed)
+
+
+type KeyState = Value | Tombstone | Delta
+
+
+def fold_state(state: KeyState | None, operation: dict[str, Any]) -> KeyState:
+    kind = operation["operation"]
+    if kind == "set":
+        changes = operation.get("changes")
+        if changes is None:
+            return Value(operation["value"])
+        removed = operation.get("removed")
+        if isinstance(state, Value):
+            if isinstance(state.value, dict):
+                value = {**state.value, **changes}
+                for name in removed or ():
+                    value.pop(name, None)
+                state.value = value
+            return state
+        if isinstance(state, Tombstone):
+            return state
+        delta = Delta(changes, set(removed or ()))
+        return delta if state is None else state.then(delta)
+    if kind == "create":
+        return Value(operation["value"])
+    if kind == "delete":
+        return Tombstone()
+    raise ValueError(f"Invalid operation type: {kind}")
+
+
+def per_key_operation(operation: dict[str, Any]) -> dict[str, Any]:
+    kind = operation["operation"]
+    if kind == "delete_where":
+        return {"operation": "delete"}
+    if kind == "update_where":
+        return {"operation": "set", "changes": operation["changes"]}
+    raise ValueError(f"Invalid bulk operation type: {kind}")
+
+
+def compose_states(earlier: KeyState | None, later: KeyState) -> KeyState:
+    if isinstance(later, Delta):
+        if isinstance(earlier, Value):
+            if not isinstance(earlier.value, dict):
+                return earlier
+            return Value(later.apply_to(earlier.value))
+        if isinstance(earlier, Tombstone):
+            return earlier
+        if isinstance(earlier, Delta):
+            return earlier.then(later)
+    return later
+
+
+class LogFold:
+    def __init__(self):
+        self.states: dict[int, KeyState] = {}
+        self.max_tid = -1
+        self.max_lsn = -1
+        self.max_created_key = -1
+        self.transactions = 0
+        self.operations = 0
+
+    def add(self, tid: int, operations: dict[int, dict[str, Any]]) -> None:
+        self.note_transaction(tid)
+        self.add_operations(operations)
+
+    def note_transaction(self, tid: int) -> None:
+        self.transactions += 1
+        self.max_tid = max(self.max_tid, tid)
+
+    def add_operations(self, operations: dict[int, dict[str, Any]]) -> None:
+        states = self.states
+        for lsn, operation in operations.items():
+            self.operations += 1
+            self.max_lsn = max(self.max_lsn, lsn)
+            if "keys" in operation:
+                per_key = per_key_operation(operation)
+                for key in operation["keys"]:
+                    states[key] = fold_state(states.get(key), per_key)
+                continue
+            key = operation["key"]
+            if operation["operation"] == "create":
+                self.max_created_key = max(self.max_created_key, key)
+            states[key] = fold_state(states.get(key), operation)
+
+    def add_all(self, records: Iterable[LogRecord]) -> "LogFold":
+        for tid, operations in records:
+            self.add(tid, operations)
+        return self
+
+    def then(self, later: "LogFold") -> "LogFold":
+        for key, state in later.states.items():
+            self.states[key] = compose_states(self.states.get(key), state)
+        self.max_tid = max(self.max_tid, later.max_tid)
+        self.max_lsn = max(self.max_lsn, later.max_lsn)
+        self.max_created_key = max(self.max_created_key, later.max_created_key)
+        self.transactions += later.transactions
+        self.operations += later.operations
+        return self
+
+    def apply(self, database: DatabaseInterface) -> None:
+        data = database.data
+        for key, state in self.states.items():
+            if isinstance(state, Value):
+                data[key] = state.value
+            elif isinstance(state, Tombstone):
+                data.pop(key, None)
+            else:
+                base = data.get(key)
+                if isinstance(base, dict):
+                    data[key] = state.apply_to(base)
+        self.advance_counters(database)
+        if self.states:
+            database.notify_commit(self.states.keys())
+        if METRICS.enabled:
+            METRICS.inc("wal_replayed_transactions_total", self.transactions)
+            METRICS.inc("wal_replayed_records_total", self.operations)
+
+    def advance_counters(self, database: DatabaseInterface) -> None:
+        database._next_tid = max(database._next_tid, self.max_tid + 1)
+        database._next_lsn = max(database._next_lsn, self.max_lsn + 1)
+        database._next_id = max(database._next_id, self.max_created_key + 1)
+
+
+def recover(database: DatabaseInterface, records: Iterable[LogRecord]) -> LogFold:
+    fold = LogFold().add_all(records)
+    fold.apply(database)
+    return fold
+
+
+def read_log(wal: WriteAheadLogInterface, from_lsn: int = 0) -> Iterator[LogRecord]:
+    """Transactions in `wal` with an operation at or after `from_lsn`, in log order."""
+    iter_log = getattr(wal, "iter_log", None)
+    if iter_log is not None:
+        records = iter_log(from_lsn=from_lsn)
+    else:
+        log = dict(wal.get_log())
+        records = ((tid, log[tid]) for tid in sorted(log))
+    for tid, operations in records:
+        if operations and max(operations) >= from_lsn:
+            yield tid, operations
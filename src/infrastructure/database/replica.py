@@ -0,0 +1,286 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from src.core.ports.database import (
+    DatabaseInterface,
+    TransactionInterface,
+    WriteAheadLogInterface,
+)
+from src.infrastructure.database.recovery import LogRecord, recover
+from src.infrastructure.database.segmented_wal import (
+    ACTIVE_SEGMENT,
+    iter_records,
+    list_segments,
+)
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import LogDict
+from src.infrastructure.metrics import METRICS
+from src.infrastructure.util import convert_keys_to_int
+
+
+class LogTail(WriteAheadLogInterface, ABC):
+    """Read-only follower of a primary's WAL: `poll` buffers records, `apply_log` applies them."""
+
+    def __init__(self):
+        self._pending: deque[LogRecord] = deque()
+        self.head_lsn = -1
+
+    @abstractmethod
+    def _read_new(self) -> Iterable[LogRecord]:
+        pass
+
+    def poll(self) -> int:
+        count = 0
+        for tid, operations in self._read_new():
+            if not operations:
+                continue
+            last = max(operations)
+            if last <= self.head_lsn:
+                continue
+            self.head_lsn = last
+            self._pending.append((tid, operations))
+            count += 1
+        return count
+
+    def write_log[TransactionType: TransactionInterface](self, transaction: TransactionType):
+        raise PermissionError("Replica log is read-only")
+
+    def clear_log(self):
+        raise PermissionError("Replica log is read-only")
+
+    def apply_log(self, database: DatabaseInterface, limit: int | None = None):
+        self.poll()
+        records = []
+        while self._pending and (limit is None or len(records) < limit):
+            tid, operations = self._pending.popleft()
+            if max(operations) >= database._next_lsn:
+                records.append((tid, operations))
+        if records:
+            recover(database, records)
+            if METRICS.enabled:
+                METRICS.inc("replica_applied_transactions_total", len(records))
+
+
+class JsonLogTail(LogTail):
+    def __init__(self, log_filepath: str):
+        super().__init__()
+        self.log_filepath = Path(log_filepath)
+        self._signature: tuple[int, int] | None = None
+
+    def _load(self) -> LogDict | None:
+        try:
+            with open(self.log_filepath) as f:
+                return convert_keys_to_int(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            # The primary rewrites the file on every commit; a torn read is retried next poll.
+            return None
+
+    def _read_new(self) -> Iterable[LogRecord]:
+        try:
+            stat = self.log_filepath.stat()
+        except FileNotFoundError:
+            return []
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return []
+        log = self._load()
+        if log is None:
+            return []
+        self._signature = signature
+        return [(tid, log[tid]) for tid in sorted(log)]
+
+    def get_log(self) -> LogDict:
+        return self._load() or {}
+
+
+class SegmentLogTail(LogTail):
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory)
+        self._active_path = self.directory / ACTIVE_SEGMENT
+        self._active_inode: int | None = None
+        self._offset = 0
+
+    def _read_active(self) -> bytes:
+        try:
+            with open(self._active_path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self._active_inode:
+                    self._active_inode = inode
+                    self._offset = 0
+                f.seek(self._offset)
+                raw = f.read()
+        except FileNotFoundError:
+            return b""
+        complete = raw[: raw.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        return complete
+
+    def _read_new(self) -> Iterable[LogRecord]:
+        # The active segment is read before the closed ones: a rotation in between shows up as a
+        # new closed segment, whose already-seen records are skipped by LSN.
+        yield from iter_records(self._read_active())
+        if not self.directory.exists():
+            return
+        for segment in list_segments(self.directory):
+            if segment.last_lsn <= self.head_lsn:
+                continue
+            try:
+                raw = segment.read_bytes()
+            except FileNotFoundError:
+                continue
+            yield from iter_records(raw)
+
+    def get_log(self) -> LogDict:
+        log: dict[int, dict[int, dict[str, Any]]] = {}
+        for segment in list_segments(self.directory):
+            log.update(iter_records(segment.read_bytes()))
+        if self._active_path.exists():
+            log.update(iter_records(self._active_path.read_bytes()))
+        return log
+
+
+class ReadOnlyTransaction(Transaction):
+    def set(self, key: int, value: object) -> None:
+        raise PermissionError("Replica is read-only")
+
+    def delete(self, key: int) -> None:
+        raise PermissionError("Replica is read-only")
+
+    def create(self, value: object) -> int:
+        raise PermissionError("Replica is read-only")
+
+    def set_if(self, key: int, expected, changes) -> dict:
+        raise PermissionError("Replica is read-only")
+
+    def delete_where(self, predicate) -> list[int]:
+        raise PermissionError("Replica is read-only")
+
+    def update_where(self, predicate, changes) -> list[int]:
+        raise PermissionError("Replica is read-only")
+
+    def commit(self, with_wal: bool = True):
+        pass
+
+
+class ReplicaDatabase(DatabaseInterface):
+    def __init__(self, json_filepath: str, wal: LogTail):
+        self.json_filepath = Path(json_filepath)
+        self.wal = wal
+        self._commit_listeners: list[Callable[[Iterable[int]], None]] = []
+        self._snapshot_signature: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._follower: threading.Thread | None = None
+        self.data = {}
+        self._next_id = 0
+        self._next_tid = 0
+        self._next_lsn = 0
+        self.checkpoint_lsn = 0
+        self._load_snapshot()
+        self.sync()
+
+    def _snapshot_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = self.json_filepath.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_snapshot(self) -> None:
+        signature = self._snapshot_stat()
+        if signature is None or signature == self._snapshot_signature:
+            return
+        try:
+            with open(self.json_filepath) as f:
+                snapshot = json.load(f)
+        except json.JSONDecodeError:
+            return
+        self._snapshot_signature = signature
+        checkpoint_lsn = snapshot.get("checkpoint_lsn", 0)
+        if checkpoint_lsn < self._next_lsn:
+            return
+        stale = self.data.keys()
+        self.data = convert_keys_to_int(snapshot["data"])
+        self._next_id = max(self._next_id, snapshot["next_id"])
+        self._next_tid = max(self._next_tid, snapshot["next_tid"])
+        self._next_lsn = snapshot["next_lsn"]
+        self.checkpoint_lsn = checkpoint_lsn
+        if stale:
+            self.notify_commit(stale | self.data.keys())
+
+    def sync(self, limit: int | None = None) -> None:
+        with self._lock:
+            self._load_snapshot()
+            self.wal.apply_log(self, limit)
+
+    @property
+    def applied_lsn(self) -> int:
+        return self._next_lsn - 1
+
+    @property
+    def replay_lag(self) -> int:
+        self.wal.poll()
+        return max(self.wal.head_lsn - self.applied_lsn, 0)
+
+    def follow(self, interval: float = 0.5) -> None:
+        if self._follower is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.sync()
+
+        self._follower = threading.Thread(target=run, name="replica-follower", daemon=True)
+        self._follower.start()
+
+    def stop(self) -> None:
+        if self._follower is None:
+            return
+        self._stop.set()
+        self._follower.join()
+        self._follower = None
+
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        self._commit_listeners.append(listener)
+
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        for listener in self._commit_listeners:
+            listener(keys)
+
+    def set(self, key: int, value: object):
+        raise PermissionError("Replica is read-only")
+
+    def create(self, value: object) -> int:
+        raise PermissionError("Replica is read-only")
+
+    def delete(self, key: int):
+        raise PermissionError("Replica is read-only")
+
+    def get(self, key: int) -> object:
+        return self.data.get(key)
+
+    def get_all(self) -> list[object]:
+        return list(self.data.values())
+
+    def begin_transaction(self) -> ReadOnlyTransaction:
+        return ReadOnlyTransaction(self._next_tid, self)
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @property
+    def next_tid(self) -> int:
+        return self._next_tid
+
+    @property
+    def next_lsn(self) -> int:
+        return self._next_lsn
@@ -0,0 +1,73 @@
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+from src.infrastructure.database.sharded_database import (
+    COORDINATOR_LOG,
+    ShardedDatabase,
+    read_manifest,
+    shard_paths,
+    write_manifest,
+)
+
+
+def reshard(directory: str, shards: int) -> int:
+    """Rewrite an offline sharded database into `shards` shards; returns the record count."""
+    source = Path(directory)
+    manifest = read_manifest(source)
+    if manifest is None:
+        raise FileNotFoundError(f"No sharded database in {source}")
+    if shards < 1:
+        raise ValueError(f"Shard count must be positive, got {shards}")
+
+    database = ShardedDatabase(str(source), manifest["shards"])
+    data = database.data
+    next_id = database._next_id
+
+    staging = source.with_name(source.name + ".reshard")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    partitions: list[dict[int, object]] = [{} for _ in range(shards)]
+    for key, value in data.items():
+        partitions[key % shards][key] = value
+    for index, partition in enumerate(partitions):
+        data_path, wal_path = shard_paths(staging, index)
+        with open(data_path, "w") as f:
+            json.dump(
+                {
+                    "data": partition,
+                    "next_id": next_id,
+                    "next_tid": 0,
+                    "next_lsn": 0,
+                    "checkpoint_lsn": 0,
+                },
+                f,
+            )
+        with open(wal_path, "w") as f:
+            json.dump({}, f)
+    with open(staging / COORDINATOR_LOG, "w") as f:
+        json.dump({}, f)
+    write_manifest(staging, shards)
+
+    retired = source.with_name(source.name + ".old")
+    shutil.rmtree(retired, ignore_errors=True)
+    source.rename(retired)
+    staging.rename(source)
+    shutil.rmtree(retired)
+    return len(data)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline resharding of a sharded BookStorage")
+    parser.add_argument("directory", help="Shard directory (DATABASE_SHARD_DIR)")
+    parser.add_argument("shards", type=int, help="New shard count")
+    args = parser.parse_args(argv)
+    count = reshard(args.directory, args.shards)
+    print(f"Resharded {count} records into {args.shards} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
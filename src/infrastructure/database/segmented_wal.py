@@ -0,0 +1,289 @@
+import json
+import lzma
+import os
+import re
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Any
+
+from src.core.ports.database import (
+    DatabaseInterface,
+    TransactionInterface,
+    WriteAheadLogInterface,
+)
+from src.infrastructure.database.durability import Durability
+from src.infrastructure.database.parallel_recovery import parallel_fold
+from src.infrastructure.database.recovery import LogRecord, recover
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import LogDict
+from src.infrastructure.metrics import METRICS, timed
+
+ACTIVE_SEGMENT = "wal_active.jsonl"
+SEGMENT_PATTERN = re.compile(r"^wal_(\d{20})_(\d{20})\.jsonl(\.zz|\.xz)?$")
+
+
+@dataclass(frozen=True)
+class Codec:
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: dict[str, Codec] = {
+    "zlib": Codec(".zz", zlib.compress, zlib.decompress),
+    "lzma": Codec(".xz", lzma.compress, lzma.decompress),
+}
+CODECS_BY_SUFFIX = {codec.suffix: codec for codec in CODECS.values()}
+
+
+@dataclass(frozen=True)
+class Segment:
+    path: Path
+    first_lsn: int
+    last_lsn: int
+
+    @classmethod
+    def parse(cls, path: Path) -> "Segment | None":
+        match = SEGMENT_PATTERN.match(path.name)
+        if match is None:
+            return None
+        return cls(path, int(match.group(1)), int(match.group(2)))
+
+    @staticmethod
+    def name(first_lsn: int, last_lsn: int) -> str:
+        return f"wal_{first_lsn:020d}_{last_lsn:020d}.jsonl"
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.suffix in CODECS_BY_SUFFIX
+
+    def read_bytes(self) -> bytes:
+        raw = self.path.read_bytes()
+        if self.compressed:
+            return CODECS_BY_SUFFIX[self.path.suffix].decompress(raw)
+        return raw
+
+
+def iter_records(raw: bytes) -> Iterator[tuple[int, dict[int, dict[str, Any]]]]:
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A torn append at the tail of the active segment: the transaction never committed.
+            break
+        yield record["tid"], {int(lsn): op for lsn, op in record["operations"].items()}
+
+
+def load_chunk(chunk: Path | bytes) -> Iterator[LogRecord]:
+    if isinstance(chunk, bytes):
+        return iter_records(chunk)
+    segment = Segment.parse(chunk)
+    if segment is None:
+        raise ValueError(f"Not a WAL segment: {chunk}")
+    return iter_records(segment.read_bytes())
+
+
+def list_segments(directory: Path) -> list[Segment]:
+    by_range: dict[tuple[int, int], Segment] = {}
+    for path in directory.iterdir():
+        segment = Segment.parse(path)
+        if segment is None:
+            continue
+        key = (segment.first_lsn, segment.last_lsn)
+        # While a segment is being compressed both files exist; the plain one is complete.
+        if key not in by_range or not segment.compressed:
+            by_range[key] = segment
+    return [by_range[key] for key in sorted(by_range)]
+
+
+def split_lines(raw: bytes, parts: int) -> list[bytes]:
+    chunks = []
+    start = 0
+    step = max(len(raw) // parts, 1)
+    while start < len(raw):
+        end = raw.find(b"\n", start + step)
+        end = len(raw) if end == -1 else end + 1
+        chunks.append(raw[start:end])
+        start = end
+    return chunks
+
+
+class SegmentedWriteAheadLog(WriteAheadLogInterface):
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 16 * 1024 * 1024,
+        compression: str | None = "zlib",
+        background: bool = True,
+        replay_workers: int = 1,
+        parallel_threshold: int = 4 * 1024 * 1024,
+        durability: Durability | None = None,
+    ):
+        if compression is not None and compression not in CODECS:
+            raise ValueError(f"Unknown WAL compression: {compression}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.codec = CODECS[compression] if compression else None
+        self.replay_workers = replay_workers
+        self.parallel_threshold = parallel_threshold
+        self.durability = durability
+        self._executor = ThreadPoolExecutor(max_workers=1) if background else None
+        self._pending: list[Future] = []
+        self._active_path = self.directory / ACTIVE_SEGMENT
+        self._first_lsn: int | None = None
+        self._last_lsn: int | None = None
+        self._active_size = 0
+        self._recover_active_segment()
+
+    def _recover_active_segment(self) -> None:
+        if not self._active_path.exists():
+            return
+        raw = self._active_path.read_bytes()
+        end = raw.rfind(b"\n") + 1
+        if end < len(raw):
+            # Drop a torn append so the next record starts on its own line.
+            raw = raw[:end]
+            os.truncate(self._active_path, end)
+        self._active_size = len(raw)
+        for _, operations in iter_records(raw):
+            self._track_lsns(operations)
+
+    def _track_lsns(self, operations: dict[int, dict[str, Any]]) -> None:
+        if operations:
+            self._track_range(min(operations), max(operations))
+
+    def _track_range(self, first: int, last: int) -> None:
+        self._first_lsn = first if self._first_lsn is None else min(self._first_lsn, first)
+        self._last_lsn = last if self._last_lsn is None else max(self._last_lsn, last)
+
+    def segments(self) -> list[Segment]:
+        return list_segments(self.directory)
+
+    @timed("wal_write_log_seconds")
+    def write_log[TransactionType: TransactionInterface](self, transaction: TransactionType):
+        if isinstance(transaction, Transaction):
+            # Serialized straight from the operation buffer, without per-operation dicts.
+            self._append(transaction.json_chunks(), transaction.lsn_bounds())
+        else:
+            for tid, operations in transaction.to_dict().items():
+                bounds = (min(operations), max(operations)) if operations else None
+                self._append([json.dumps({"tid": tid, "operations": operations})], bounds)
+        if self._active_size >= self.segment_size:
+            self.rotate()
+
+    def _append(self, chunks: Iterable[str], bounds: tuple[int, int] | None) -> None:
+        written = 0
+        created = not self._active_path.exists()
+        with open(self._active_path, "ab") as f:
+            try:
+                for chunk in chain(chunks, ["\n"]):
+                    encoded = chunk.encode()
+                    f.write(encoded)
+                    written += len(encoded)
+                if self.durability is not None:
+                    self.durability.written(f, self._active_path)
+            except Exception:
+                # The commit fails; a partial record must not be followed by the next one.
+                f.truncate(self._active_size)
+                raise
+        if created and self.durability is not None:
+            self.durability.sync_directory(self._active_path)
+        self._active_size += written
+        if bounds is not None:
+            self._track_range(*bounds)
+        if METRICS.enabled:
+            METRICS.inc("wal_bytes_written_total", written)
+
+    def rotate(self) -> Segment | None:
+        if self._first_lsn is None or self._last_lsn is None:
+            return None
+        segment = Segment(
+            self.directory / Segment.name(self._first_lsn, self._last_lsn),
+            self._first_lsn,
+            self._last_lsn,
+        )
+        os.replace(self._active_path, segment.path)
+        if self.durability is not None:
+            self.durability.sync_directory(segment.path)
+        self._first_lsn = self._last_lsn = None
+        self._active_size = 0
+        if self.codec is not None:
+            if self._executor is not None:
+                self._pending.append(self._executor.submit(self._compress, segment))
+            else:
+                self._compress(segment)
+        if METRICS.enabled:
+            METRICS.inc("wal_segments_rotated_total")
+        return segment
+
+    def _compress(self, segment: Segment) -> None:
+        assert self.codec is not None
+        target = segment.path.with_name(segment.path.name + self.codec.suffix)
+        temporary = target.with_name(target.name + ".tmp")
+        temporary.write_bytes(self.codec.compress(segment.path.read_bytes()))
+        os.replace(temporary, target)
+        if self.durability is not None:
+            self.durability.sync_directory(target)
+        segment.path.unlink()
+
+    def wait(self) -> None:
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def close(self) -> None:
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def iter_log(self, from_lsn: int = 0) -> Iterator[tuple[int, dict[int, dict[str, Any]]]]:
+        self.wait()
+        for segment in self.segments():
+            if segment.last_lsn < from_lsn:
+                if METRICS.enabled:
+                    METRICS.inc("wal_segments_skipped_total")
+                continue
+            yield from iter_records(segment.read_bytes())
+        if self._active_path.exists():
+            yield from iter_records(self._active_path.read_bytes())
+
+    def get_log(self) -> LogDict:
+        return dict(self.iter_log())
+
+    def clear_log(self):
+        self.wait()
+        for segment in self.segments():
+            segment.path.unlink()
+        self._active_path.unlink(missing_ok=True)
+        self._first_lsn = self._last_lsn = None
+        self._active_size = 0
+
+    def _replay_chunks(self, from_lsn: int) -> tuple[list[Path | bytes], int]:
+        self.wait()
+        chunks: list[Path | bytes] = []
+        size = 0
+        for segment in self.segments():
+            if segment.last_lsn >= from_lsn:
+                chunks.append(segment.path)
+                size += segment.path.stat().st_size
+        if self._active_path.exists():
+            raw = self._active_path.read_bytes()
+            chunks.extend(split_lines(raw, self.replay_workers))
+            size += len(raw)
+        return chunks, size
+
+    @timed("wal_apply_log_seconds")
+    def apply_log(self, database: DatabaseInterface):
+        if self.replay_workers > 1:
+            chunks, size = self._replay_chunks(database.checkpoint_lsn)
+            if size >= self.parallel_threshold and len(chunks) > 1:
+                parallel_fold(chunks, load_chunk, self.replay_workers).apply(database)
+                return
+        recover(database, self.iter_log(from_lsn=database.checkpoint_lsn))
@@ -0,0 +1,348 @@
+import json
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+from src.core.ports.database import (
+    DatabaseInterface,
+    TransactionInterface,
+    WriteAheadLogInterface,
+)
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.recovery import LogFold
+from src.infrastructure.database.transaction import Transaction, TransactionFactory
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+from src.infrastructure.util import convert_keys_to_int, object_to_dict
+
+MANIFEST = "manifest.json"
+COORDINATOR_LOG = "coordinator.json"
+
+
+def shard_paths(directory: Path, index: int) -> tuple[Path, Path]:
+    return directory / f"shard_{index}.json", directory / f"shard_{index}.wal.json"
+
+
+def read_manifest(directory: Path) -> dict[str, Any] | None:
+    path = directory / MANIFEST
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(directory: Path, shards: int) -> None:
+    with open(directory / MANIFEST, "w") as f:
+        json.dump({"shards": shards}, f)
+
+
+class CoordinatorLog(WriteAheadLogInterface):
+    """Intent log of cross-shard commits that have not reached every shard yet."""
+
+    def __init__(self, log_filepath: Path):
+        self.log_filepath = log_filepath
+        self._log: dict[int, dict[int, dict[str, Any]]] = {}
+        if log_filepath.exists():
+            with open(log_filepath) as f:
+                self._log = convert_keys_to_int(json.load(f))
+
+    def _save_log(self):
+        with open(self.log_filepath, "w") as f:
+            json.dump(self._log, f)
+
+    def write_log[TransactionType: TransactionInterface](self, transaction: TransactionType):
+        self._log.update(transaction.to_dict())
+        self._save_log()
+
+    def resolve(self, tid: int) -> None:
+        if self._log.pop(tid, None) is not None:
+            self._save_log()
+
+    def get_log(self) -> dict[int, dict[int, dict[str, Any]]]:
+        return self._log
+
+    def clear_log(self):
+        self._log = {}
+        self._save_log()
+
+    def apply_log(self, database: DatabaseInterface):
+        if not isinstance(database, ShardedDatabase):
+            raise TypeError("Coordinator log can only be applied to a sharded database")
+        for tid in sorted(self._log):
+            database._next_tid = max(database._next_tid, tid + 1)
+            completed = True
+            transaction = ShardedTransaction.from_dict(tid, database, self._log[tid])
+            for index, sub in transaction._subs.items():
+                shard = database.shards[index]
+                if sub.tid in shard.wal.get_log():
+                    continue
+                records = sub.to_dict().items()
+                if not sub.commit():
+                    completed = False
+                    continue
+                # The replayed commit does not draw from the shard's counters.
+                LogFold().add_all(records).advance_counters(shard)
+            if completed:
+                self.resolve(tid)
+
+
+class _TempDataView(Mapping[int, object]):
+    def __init__(self, transaction: "ShardedTransaction"):
+        self._transaction = transaction
+
+    def __getitem__(self, key: int) -> object:
+        sub = self._transaction._subs.get(self._transaction._storage.shard_index(key))
+        if sub is None:
+            raise KeyError(key)
+        return sub._temp_data[key]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, int):
+            return False
+        sub = self._transaction._subs.get(self._transaction._storage.shard_index(key))
+        return sub is not None and key in sub._temp_data
+
+    def __iter__(self) -> Iterator[int]:
+        for sub in self._transaction._subs.values():
+            yield from sub._temp_data
+
+    def __len__(self) -> int:
+        return sum(len(sub._temp_data) for sub in self._transaction._subs.values())
+
+
+class ShardedTransaction(TransactionInterface):
+    def __init__(self, tid: int, storage: "ShardedDatabase"):
+        self.tid = tid
+        self._storage = storage
+        self._subs: dict[int, Transaction] = {}
+
+    @property
+    def _temp_data(self) -> Mapping[int, object]:  # type: ignore[override]
+        return _TempDataView(self)
+
+    @property
+    def block_id(self) -> int:
+        return self._storage.next_id
+
+    def _sub(self, key: int) -> Transaction:
+        return self._sub_at(self._storage.shard_index(key))
+
+    def _sub_at(self, index: int) -> Transaction:
+        sub = self._subs.get(index)
+        if sub is None:
+            shard = self._storage.shards[index]
+            sub = self._subs[index] = Transaction(shard.next_tid, shard)
+        return sub
+
+    def aggregates(self) -> None:
+        # Author counts are split across shards; a merged view would need every shard's counts.
+        return None
+
+    def set(self, key: int, value: object) -> None:
+        self._sub(key).set(key, value)
+
+    def delete(self, key: int) -> None:
+        self._sub(key).delete(key)
+
+    def set_if(self, key: int, expected: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+        return self._sub(key).set_if(key, expected, changes)
+
+    def create(self, value: object) -> int:
+        key = self.block_id
+        sub = self._sub(key)
+        sub._append_create(key, object_to_dict(value))
+        sub._storage._next_id = max(sub._storage._next_id, key + 1)
+        return key
+
+    def delete_where(self, predicate: Callable[[dict[str, Any]], bool]) -> list[int]:
+        keys = []
+        for index in range(len(self._storage.shards)):
+            keys.extend(self._sub_at(index).delete_where(predicate))
+        return sorted(keys)
+
+    def update_where(
+        self, predicate: Callable[[dict[str, Any]], bool], changes: dict[str, Any]
+    ) -> list[int]:
+        keys = []
+        for index in range(len(self._storage.shards)):
+            keys.extend(self._sub_at(index).update_where(predicate, changes))
+        return sorted(keys)
+
+    def get(self, key: int) -> object:
+        return self._sub(key).get(key)
+
+    def has_pending(self, key: int) -> bool:
+        sub = self._subs.get(self._storage.shard_index(key))
+        return sub is not None and sub.has_pending(key)
+
+    def get_all(self) -> list[object]:
+        values = []
+        for index, shard in enumerate(self._storage.shards):
+            sub = self._subs.get(index)
+            values.extend(sub.get_all() if sub is not None else shard.get_all())
+        return values
+
+    def flush(self):
+        for sub in self._subs.values():
+            sub.flush()
+
+    def _participants(self) -> dict[int, Transaction]:
+        return {
+            index: sub
+            for index, sub in self._subs.items()
+            if sub._operations or sub._spill is not None
+        }
+
+    def commit(self, with_wal: bool = True) -> bool:
+        participants = self._participants()
+        if len(participants) <= 1:
+            return all([sub.commit(with_wal) for sub in participants.values()])
+        try:
+            for sub in participants.values():
+                sub.flush()
+                sub.coalesce()
+        except Exception:
+            self.rollback()
+            return False
+        if with_wal:
+            self._storage.wal.write_log(self)
+        committed = all([sub.commit(with_wal) for sub in participants.values()])
+        if with_wal and committed:
+            self._storage.wal.resolve(self.tid)
+        # Otherwise the intent stays logged and the next sync() completes the failed shards.
+        return committed
+
+    def rollback(self):
+        for sub in self._subs.values():
+            sub.rollback()
+
+    def to_dict(self) -> dict[int, dict[int, dict[str, Any]]]:
+        return {
+            self.tid: {
+                index: {"tid": sub.tid, "operations": sub.to_dict()[sub.tid]}
+                for index, sub in self._participants().items()
+            }
+        }
+
+    @classmethod
+    def from_dict(
+        cls, tid: int, db: DatabaseInterface, operations: dict[int, dict[str, Any]]
+    ) -> "ShardedTransaction":
+        """Rebuild a cross-shard transaction from its coordinator intent."""
+        if not isinstance(db, ShardedDatabase):
+            raise TypeError("Sharded transactions can only be rebuilt on a sharded database")
+        transaction = cls(tid, db)
+        for index, intent in operations.items():
+            transaction._subs[int(index)] = TransactionFactory.create(
+                intent["tid"], db.shards[int(index)], convert_keys_to_int(intent["operations"])
+            )
+        return transaction
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            print("Error during commit transaction", exc_type, exc_val, exc_tb)
+            self.rollback()
+
+
+class ShardedDatabase(DatabaseInterface):
+    def __init__(
+        self,
+        directory: str,
+        shards: int,
+        wal_factory: Callable[[Path], WriteAheadLogInterface] = lambda path: WriteAheadLog(
+            str(path)
+        ),
+    ):
+        if shards < 1:
+            raise ValueError(f"Shard count must be positive, got {shards}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            write_manifest(self.directory, shards)
+        elif manifest["shards"] != shards:
+            raise ValueError(
+                f"{self.directory} holds {manifest['shards']} shards, configured {shards}. "
+                "Run the resharding tool first."
+            )
+        self.shards: list[JsonDatabase] = []
+        for index in range(shards):
+            data_path, wal_path = shard_paths(self.directory, index)
+            self.shards.append(JsonDatabase(str(data_path), wal_factory(wal_path)))
+        self.wal = CoordinatorLog(self.directory / COORDINATOR_LOG)
+        self._next_tid = 0
+        self._next_lsn = 0
+        self.checkpoint_lsn = 0
+        self.sync()
+        # Taken after sync() so ids created by replayed intents are not handed out again.
+        self._next_id = max(shard._next_id for shard in self.shards)
+
+    def shard_index(self, key: int) -> int:
+        return key % len(self.shards)
+
+    def shard(self, key: int) -> JsonDatabase:
+        return self.shards[self.shard_index(key)]
+
+    @property
+    def data(self) -> dict[int, object]:  # type: ignore[override]
+        merged: dict[int, object] = {}
+        for shard in self.shards:
+            merged.update(shard.data)
+        return merged
+
+    def sync(self) -> None:
+        self.wal.apply_log(self)
+
+    def add_commit_listener(self, listener: Callable[[Iterable[int]], None]) -> None:
+        for shard in self.shards:
+            shard.add_commit_listener(listener)
+
+    def notify_commit(self, keys: Iterable[int]) -> None:
+        for key in keys:
+            self.shard(key).notify_commit((key,))
+
+    def set(self, key: int, value: object):
+        self.shard(key).set(key, value)
+
+    def create(self, value: object) -> int:
+        key = self.next_id
+        shard = self.shard(key)
+        shard.data[key] = object_to_dict(value)
+        shard._next_id = max(shard._next_id, key + 1)
+        shard.notify_commit((key,))
+        shard._save_data()
+        return key
+
+    def delete(self, key: int):
+        self.shard(key).delete(key)
+
+    def get(self, key: int) -> object:
+        return self.shard(key).get(key)
+
+    def get_all(self) -> list[object]:
+        return [value for shard in self.shards for value in shard.get_all()]
+
+    def begin_transaction(self) -> ShardedTransaction:
+        return ShardedTransaction(self.next_tid, self)
+
+    @property
+    def next_id(self) -> int:
+        id = self._next_id
+        self._next_id += 1
+        return id
+
+    @property
+    def next_tid(self) -> int:
+        id = self._next_tid
+        self._next_tid += 1
+        return id
+
+    @property
+    def next_lsn(self) -> int:
+        id = self._next_lsn
+        self._next_lsn += 1
+        return id
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+class SpillFile:
+    """On-disk run of a transaction's executed operations and the records they left behind."""
+
+    def __init__(self, directory: str | None = None):
+        self._operations = tempfile.TemporaryFile(dir=directory)  # noqa: SIM115
+        self._records = tempfile.TemporaryFile(dir=directory)  # noqa: SIM115
+        self._offsets: dict[int, int] = {}
+        self._bounds: tuple[int, int] | None = None
+        self.spills = 0
+
+    def write(
+        self,
+        fragments: Iterable[str],
+        records: dict[int, Any],
+        bounds: tuple[int, int] | None,
+    ) -> None:
+        self._operations.seek(0, os.SEEK_END)
+        self._operations.writelines(fragment.encode() + b"\n" for fragment in fragments)
+        self._records.seek(0, os.SEEK_END)
+        offset = self._records.tell()
+        for key, value in records.items():
+            line = json.dumps(value).encode() + b"\n"
+            self._records.write(line)
+            self._offsets[key] = offset
+            offset += len(line)
+        if bounds is not None:
+            if self._bounds is not None:
+                bounds = min(bounds[0], self._bounds[0]), max(bounds[1], self._bounds[1])
+            self._bounds = bounds
+        self.spills += 1
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def keys(self) -> Iterable[int]:
+        return self._offsets.keys()
+
+    def get(self, key: int) -> Any:
+        self._records.seek(self._offsets[key])
+        return json.loads(self._records.readline())
+
+    def items(self) -> Iterator[tuple[int, Any]]:
+        for key in list(self._offsets):
+            yield key, self.get(key)
+
+    def fragments(self) -> Iterator[str]:
+        self._operations.seek(0)
+        for line in self._operations:
+            yield line.decode().rstrip("\n")
+
+    def to_dict(self) -> dict[int, dict[str, Any]]:
+        operations = {}
+        for fragment in self.fragments():
+            for lsn, operation in json.loads("{" + fragment + "}").items():
+                operations[int(lsn)] = operation
+        return operations
+
+    def lsn_bounds(self) -> tuple[int, int] | None:
+        return self._bounds
+
+    def close(self) -> None:
+        self._operations.close()
+        self._records.close()
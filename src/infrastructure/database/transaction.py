@@ -1,3 +1,7 @@
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from collections.abc import Set as AbstractSet
+from contextlib import nullcontext
+from itertools import chain
 from typing import Any, cast
 
 from src.core.ports.database import (
@@ -6,11 +10,17 @@ from src.core.ports.database import (
     TransactionInterface,
 )
 from src.infrastructure.database.operation import (
-    CreateOperation,
     DeleteOperation,
+    DeleteWhereOperation,
+    OperationBuffer,
     OperationFactory,
     SetOperation,
+    UpdateWhereOperation,
 )
+from src.infrastructure.database.spill import SpillFile
+from src.infrastructure.metrics import METRICS, timed
+from src.infrastructure.profiler import PROFILER
+from src.infrastructure.util import object_to_dict
 
 
 def _remove_none(dictionary: dict) -> dict:
@@ -21,10 +31,12 @@ class Transaction(TransactionInterface):
     def __init__(self, tid: int, storage: DatabaseInterface):
         self._storage = storage
         self.tid = tid
-        self._operations: list[Operation] = []
+        self._operations = OperationBuffer(self)
         self._temp_data: dict[int, dict[str, Any] | object] = {}
+        self._spill: SpillFile | None = None
         self._block_id: int | None = None
         self._last_processed_operation: Operation | None = None
+        self._committed = False
 
     @property
     def block_id(self) -> int:
@@ -35,12 +47,30 @@ class Transaction(TransactionInterface):
         return id
 
     def to_dict(self) -> dict[int, dict[int, dict[str, Any]]]:
-        dict_transaction = {}
-        dict_operations = {}
-        for operation in self._operations:
-            dict_operations.update(operation.to_dict())
-        dict_transaction[self.tid] = dict_operations
-        return dict_transaction
+        operations = self._spill.to_dict() if self._spill is not None else {}
+        operations.update(self._operations.to_dict())
+        return {self.tid: operations}
+
+    def json_chunks(self) -> Iterator[str]:
+        yield f'{{"tid": {self.tid}, "operations": {{'
+        fragments = self._operations.fragments()
+        if self._spill is not None:
+            fragments = chain(self._spill.fragments(), fragments)
+        for index, fragment in enumerate(fragments):
+            yield f", {fragment}" if index else fragment
+        yield "}}"
+
+    def to_json(self) -> str:
+        return "".join(self.json_chunks())
+
+    def lsn_bounds(self) -> tuple[int, int] | None:
+        bounds = [self._operations.lsn_bounds()]
+        if self._spill is not None:
+            bounds.append(self._spill.lsn_bounds())
+        present = [bound for bound in bounds if bound is not None]
+        if not present:
+            return None
+        return min(first for first, _ in present), max(last for _, last in present)
 
     @classmethod
     def from_dict(
@@ -49,50 +79,187 @@ class Transaction(TransactionInterface):
         return TransactionFactory.create(tid, db, operations)
 
     def set(self, key: int, value: object) -> None:
-        operation = SetOperation(key, value, self)
-        self._operations.append(operation)
+        operation = SetOperation(key, object_to_dict(value), self)
+        self._append(operation)
 
     def delete(self, key: int) -> None:
         operation = DeleteOperation(key, self)
-        self._operations.append(operation)
+        self._append(operation)
+
+    def set_if(self, key: int, expected: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+        # The expectations are checked against this transaction's own earlier writes too.
+        self._operations.execute_pending()
+        current = self.get(key)
+        if not isinstance(current, dict):
+            raise LookupError(f"Key {key} not found")
+        for field, value in expected.items():
+            if current.get(field) != value:
+                raise ValueError(f"Key {key} has {field}={current.get(field)}, expected {value}")
+        value = {**current, **changes}
+        operation = SetOperation(key, value, self)
+        operation.previous_value = current
+        operation.changes = changes
+        self._temp_data[key] = value
+        self._append(operation)
+        return value
 
     def create(self, value: object) -> int:
-        operation = CreateOperation(value, self)
         key = self.block_id
-        operation.key = key
-        self._operations.append(operation)
+        self._append_create(key, object_to_dict(value))
         return key
 
+    def _append(self, operation: Operation) -> None:
+        self._operations.append(operation)
+        self._maybe_spill()
+
+    def _append_create(self, key: int, value: object) -> None:
+        self._operations.append_create(key, value)
+        self._maybe_spill()
+
+    def _maybe_spill(self) -> None:
+        threshold = getattr(self._storage, "spill_threshold", None)
+        if threshold and len(self._operations) + len(self._temp_data) >= threshold:
+            self.spill()
+
+    def spill(self) -> None:
+        """Execute the buffered operations and move them and their records to the spill file."""
+        self._operations.execute()
+        if self._spill is None:
+            self._spill = SpillFile(getattr(self._storage, "spill_dir", None))
+        bounds = self._operations.lsn_bounds()
+        self._spill.write(self._operations.fragments(), self._temp_data, bounds)
+        self._operations = OperationBuffer(self)
+        self._temp_data = {}
+        if METRICS.enabled:
+            METRICS.inc("transaction_spills_total")
+
+    def delete_where(self, predicate: Callable[[dict[str, Any]], bool]) -> list[int]:
+        keys = self._matching_keys(predicate)
+        if keys:
+            self._append(DeleteWhereOperation(keys, self))
+        return keys
+
+    def update_where(
+        self, predicate: Callable[[dict[str, Any]], bool], changes: dict[str, Any]
+    ) -> list[int]:
+        keys = self._matching_keys(predicate)
+        if keys:
+            self._append(UpdateWhereOperation(keys, changes, self))
+        return keys
+
+    def _candidate_keys(self, predicate: Callable[[dict[str, Any]], bool]) -> Iterable[int]:
+        indexes = getattr(self._storage, "indexes", {})
+        equalities = getattr(predicate, "equalities", dict)()
+        for field, value in equalities.items():
+            index = indexes.get(field)
+            if index is not None and isinstance(value, Hashable):
+                return index.lookup(value) | self._pending_keys()
+        return self._storage.data.keys() | self._pending_keys()
+
+    def has_pending(self, key: int) -> bool:
+        """Whether this transaction holds its own record for `key`, in memory or spilled."""
+        return key in self._temp_data or (self._spill is not None and key in self._spill)
+
+    def _pending_keys(self) -> AbstractSet[int]:
+        if self._spill is None:
+            return set(self._temp_data)
+        return self._spill.keys() | self._temp_data.keys()
+
+    def _matching_keys(self, predicate: Callable[[dict[str, Any]], bool]) -> list[int]:
+        keys = []
+        for key in self._candidate_keys(predicate):
+            record = self.get(key)
+            if isinstance(record, dict) and predicate(record):
+                keys.append(key)
+        return sorted(keys)
+
     def get(self, key: int) -> object:
         if key in self._temp_data:
             return self._temp_data[key]
+        if self._spill is not None and key in self._spill:
+            return self._spill.get(key)
         return self._storage.get(key)
 
     def get_all(self) -> list[object]:
         data = self._storage.data.copy()
+        if self._spill is not None:
+            data.update(self._spill.items())
         data.update(self._temp_data)
         return list(_remove_none(data).values())
 
+    def aggregates(self) -> Any:
+        """The committed-state aggregate view of the storage, built on first use."""
+        aggregates = getattr(self._storage, "aggregates", None)
+        create_aggregates = getattr(self._storage, "create_aggregates", None)
+        if aggregates is None and create_aggregates is not None:
+            aggregates = create_aggregates()
+        return aggregates
+
+    @timed("transaction_flush_seconds")
     def flush(self):
-        for operation in self._operations:
-            operation.execute()
+        self._operations.execute()
+
+    def coalesce(self) -> int:
+        """Reduce the flushed operations to one net operation per key before they are logged."""
+        dropped = self._operations.coalesce(self._baseline)
+        if dropped and METRICS.enabled:
+            METRICS.inc("transaction_coalesced_operations_total", dropped)
+        return dropped
+
+    def _baseline(self, key: int) -> object:
+        if self._spill is not None and key in self._spill:
+            return self._spill.get(key)
+        return self._storage.get(key)
 
-    def commit(self, with_wal: bool = True):
+    @timed("transaction_commit_seconds")
+    def commit(self, with_wal: bool = True) -> bool:
+        """Log and apply the transaction. On failure it is rolled back and False returned."""
+        if self._committed:
+            return True
         try:
             self.flush()
-            old_data = self._storage.data.copy()
-            old_data.update(self._temp_data)
-            self._storage._next_id = self._block_id or self._storage._next_id
-            self._storage.data = _remove_none(old_data)
-            if with_wal:
-                self._storage.wal.write_log(self)
+            self.coalesce()
+            change_feed = getattr(self._storage, "change_feed", None) if with_wal else None
+            with change_feed.committing() if change_feed is not None else nullcontext():
+                # Logged first: a failed write leaves the store as it was.
+                if with_wal:
+                    with PROFILER.phase("persist"):
+                        self._storage.wal.write_log(self)
+                self._apply()
+                if change_feed is not None:
+                    change_feed.publish(self)
         except Exception:
+            if METRICS.enabled:
+                METRICS.inc("transaction_commit_failures_total")
             self.rollback()
+            return False
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._committed = True
+        return True
+
+    def _apply(self) -> None:
+        data = self._storage.data
+        records: Iterable[tuple[int, object]] = self._temp_data.items()
+        if self._spill is not None:
+            spilled = (item for item in self._spill.items() if item[0] not in self._temp_data)
+            records = chain(spilled, records)
+        for key, value in records:
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self._storage._next_id = self._block_id or self._storage._next_id
+        self._storage.notify_commit(self._pending_keys())
 
+    @timed("transaction_rollback_seconds")
     def rollback(self):
         try:
-            for operation in self._operations:
-                operation.undo()
+            self._operations.undo()
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
         except Exception as e:
             raise RuntimeError(f"Error during rollback transaction: \n\t{e}") from e
 
@@ -150,14 +317,11 @@ class TransactionProxy:
 class TransactionFactory:
     @classmethod
     def create(cls, tid: int, db, operations_dict: dict[int, dict[str, Any]]) -> Transaction:
-        operations = []
         transaction = Transaction(tid, db)
         proxy_transaction = TransactionProxy(transaction)
         for lsn, operation_dict in operations_dict.items():
             op: Operation = OperationFactory.create(
                 lsn, operation_dict["operation"], transaction, **operation_dict
             )
-            operations.append(op)
-
-        proxy_transaction._operations = operations
+            transaction._operations.append(op)
         return cast(Transaction, proxy_transaction)
@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 from typing import Any
 
@@ -7,7 +8,9 @@ from src.core.ports.database import (
     TransactionInterface,
     WriteAheadLogInterface,
 )
-from src.infrastructure.database.transaction import TransactionFactory
+from src.infrastructure.database.durability import RELAXED, Durability
+from src.infrastructure.database.recovery import recover
+from src.infrastructure.metrics import METRICS, timed
 from src.infrastructure.util import convert_keys_to_int
 
 type LogDict = dict[int, dict[int, dict[str, Any]]]
@@ -32,13 +35,29 @@ class SimpleWAL(WriteAheadLogInterface):
 
 
 class WriteAheadLog(WriteAheadLogInterface):
-    def __init__(self, log_filepath: str):
+    def __init__(self, log_filepath: str, durability: Durability | None = None):
         self.log_filepath = Path(log_filepath)
+        self.durability = durability
         self._log = self._from_file()
 
     def _save_log(self):
-        with open(self.log_filepath, "w") as f:
+        if self.durability is None or self.durability.mode == RELAXED:
+            self._dump(self.log_filepath)
+            return
+        # Rewriting in place would leave a truncated log after a crash; the rename is atomic.
+        temporary = self.log_filepath.with_name(self.log_filepath.name + ".tmp")
+        self._dump(temporary)
+        os.replace(temporary, self.log_filepath)
+        self.durability.sync_directory(self.log_filepath)
+
+    def _dump(self, path: Path):
+        with open(path, "w") as f:
             json.dump(self._log, f)
+            if METRICS.enabled:
+                METRICS.inc("wal_bytes_written_total", f.tell())
+            if self.durability is not None:
+                # Registered under the final name: a grouped sync runs after the rename.
+                self.durability.written(f, self.log_filepath)
 
     def _from_file(self) -> LogDict:
         if not Path(self.log_filepath).exists():
@@ -55,9 +74,18 @@ class WriteAheadLog(WriteAheadLogInterface):
         except Exception as e:
             raise FileNotFoundError("Error reading log file\nTraceback:\n\t", e) from e
 
+    @timed("wal_write_log_seconds")
     def write_log[TransactionType: TransactionInterface](self, transaction: TransactionType):
-        self._log.update(transaction.to_dict())
-        self._save_log()
+        records = transaction.to_dict()
+        previous = {tid: self._log[tid] for tid in records if tid in self._log}
+        self._log.update(records)
+        try:
+            self._save_log()
+        except Exception:
+            for tid in records:
+                self._log.pop(tid, None)
+            self._log.update(previous)
+            raise
 
     def get_log(self) -> LogDict:
         return self._log
@@ -66,9 +94,6 @@ class WriteAheadLog(WriteAheadLogInterface):
         self._log = {}
         self._save_log()
 
+    @timed("wal_apply_log_seconds")
     def apply_log(self, database: DatabaseInterface):
-        from_index = sorted(self._log.keys())
-        for tid in from_index:
-            transaction_dict = self._log[tid]
-            transaction = TransactionFactory.create(tid, database, transaction_dict)
-            transaction.commit(with_wal=False)
+        recover(database, ((tid, self._log[tid]) for tid in sorted(self._log)))
@@ -0,0 +1,136 @@
+import json
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from src.config import MetricsConfig
+
+PREFIX = "bookstorage"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": self.counts,
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+    def merge(self, data: dict[str, Any]) -> None:
+        if tuple(data["buckets"]) != self.buckets:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"], strict=True)]
+        self.sum += data["sum"]
+        self.count += data["count"]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.filepath: Path | None = None
+        self.counters: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value)
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "histograms": {
+                name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())
+            },
+        }
+
+    def merge(self, data: dict[str, Any]) -> None:
+        for name, value in data.get("counters", {}).items():
+            self.inc(name, value)
+        for name, histogram_data in data.get("histograms", {}).items():
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(tuple(histogram_data["buckets"]))
+            histogram.merge(histogram_data)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            lines.append(f"{PREFIX}_{name} {value}")
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts, strict=False):
+                cumulative += count
+                lines.append(f'{PREFIX}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{PREFIX}_{name}_sum {histogram.sum}")
+            lines.append(f"{PREFIX}_{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def attach(self, filepath: str) -> None:
+        self.filepath = Path(filepath)
+        if self.filepath.exists():
+            with open(self.filepath) as f:
+                self.merge(json.load(f))
+
+    def flush(self) -> None:
+        if not self.enabled or self.filepath is None:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.filepath, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+METRICS = MetricsRegistry(enabled=MetricsConfig().enabled)
+
+
+def timed[**P, R](name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        if not METRICS.enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.observe(name, perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(obj: object, method: str, name: str) -> None:
+    if METRICS.enabled:
+        setattr(obj, method, timed(name)(getattr(obj, method)))
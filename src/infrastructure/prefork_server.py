@@ -0,0 +1,240 @@
+import contextlib
+import gc
+import json
+import os
+import queue
+import signal
+import socket
+import threading
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+from src.core.domain.book import BookStatus
+from src.core.dto.book_dto import BookDTO
+from src.core.ports.database import DatabaseInterface
+from src.core.usecase import (
+    addBookUsecase,
+    deleteBookUsecase,
+    getBooksUsecase,
+    getBookUsecase,
+    setBookStatusUsecase,
+)
+from src.infrastructure.database.json_database import JsonDatabase, SimpleDatabase
+from src.infrastructure.database.recovery import recover
+from src.infrastructure.database.replica import ReadOnlyTransaction
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.util import object_to_dict
+
+READ_COMMANDS = {"get", "get_many"}
+WRITE_COMMANDS = {"add", "set_status", "delete"}
+
+
+class PreforkServer:
+    """Forked workers answer reads from the parent's state; the parent is the only writer."""
+
+    def __init__(
+        self,
+        database: DatabaseInterface,
+        add_book_usecase: addBookUsecase,
+        delete_book_usecase: deleteBookUsecase,
+        get_book_usecase: getBookUsecase,
+        set_book_status_usecase: setBookStatusUsecase,
+        get_books_usecase: getBooksUsecase,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = 1,
+    ):
+        if not isinstance(database, (JsonDatabase, SimpleDatabase)):
+            # Workers replay the writer's records into their copy, which needs a single store.
+            raise TypeError(f"Cannot serve a {type(database).__name__} from prefork workers")
+        self.database = database
+        self.add_book_usecase = add_book_usecase
+        self.delete_book_usecase = delete_book_usecase
+        self.get_book_usecase = get_book_usecase
+        self.set_book_status_usecase = set_book_status_usecase
+        self.get_books_usecase = get_books_usecase
+        self.host = host
+        self.port = port
+        self.workers = max(workers, 1)
+        self._socket: socket.socket | None = None
+        self._channels: dict[int, Connection] = {}
+        self._stopping = False
+        # Worker side: the follower thread applies broadcasts under the lock and queues responses.
+        self._lock = threading.Lock()
+        self._responses: queue.Queue[dict[str, Any]] = queue.Queue()
+
+    def bind(self) -> tuple[str, int]:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(128)
+        self._socket = sock
+        return sock.getsockname()
+
+    def serve_forever(self) -> None:
+        if self._socket is None:
+            self.bind()
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        signal.signal(signal.SIGINT, lambda *_: self.stop())
+        # Keep the loaded state out of the collector so workers do not touch (and copy) its pages.
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn()
+        try:
+            while not self._stopping:
+                for channel in wait(list(self._channels.values()), timeout=0.5):
+                    self._serve_writer(channel)  # type: ignore[arg-type]
+                self._reap()
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def _spawn(self) -> None:
+        parent_end, worker_end = Pipe()
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            for channel in self._channels.values():
+                channel.close()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                self._work(worker_end)
+            finally:
+                os._exit(0)
+        worker_end.close()
+        self._channels[pid] = parent_end
+
+    def _reap(self) -> None:
+        while self._channels:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            channel = self._channels.pop(pid, None)
+            if channel is not None:
+                channel.close()
+                if not self._stopping:
+                    self._spawn()
+
+    def _shutdown(self) -> None:
+        for pid, channel in self._channels.items():
+            channel.close()
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._channels = {}
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        gc.unfreeze()
+
+    def _serve_writer(self, channel: Connection) -> None:
+        try:
+            request = channel.recv()
+        except EOFError:
+            return
+        session = Transaction(self.database.next_tid, self.database)
+        try:
+            result = self._execute_write(request, session)
+            # Taken before commit, which releases a spilled transaction's run file.
+            records = session.to_dict()
+            if not session.commit():
+                raise RuntimeError("Commit failed, the write was rolled back")
+        except Exception as e:
+            channel.send(("response", {"ok": False, "error": str(e)}))
+            return
+        for worker in self._channels.values():
+            # A worker that died is respawned from the up-to-date parent by _reap.
+            with contextlib.suppress(OSError):
+                worker.send(("records", records))
+        channel.send(("response", {"ok": True, "result": object_to_dict(result)}))
+
+    def _execute_write(self, request: dict[str, Any], session: Transaction) -> object:
+        command = request["command"]
+        if command == "add":
+            book = BookDTO(request["title"], request["author"], request["year"], request["status"])
+            return self.add_book_usecase.execute(book, session)
+        if command == "set_status":
+            status = BookStatus(request["status"])
+            return self.set_book_status_usecase.execute(request["id"], status, session)
+        if command == "delete":
+            return self.delete_book_usecase.execute(request["id"], session)
+        raise ValueError(f"Unknown command: {command}")
+
+    def _work(self, channel: Connection) -> None:
+        assert self._socket is not None
+        # Idle workers sit in accept(); the follower keeps their pipe drained so the writer
+        # never blocks on a full buffer.
+        threading.Thread(target=self._follow, args=(channel,), daemon=True).start()
+        while True:
+            client, _ = self._socket.accept()
+            with client, client.makefile("rwb") as stream:
+                for line in stream:
+                    response = self.handle(json.loads(line), channel)
+                    stream.write(json.dumps(response).encode() + b"\n")
+                    stream.flush()
+
+    def _apply(self, records: dict[int, dict[int, dict[str, Any]]]) -> None:
+        recover(self.database, sorted(records.items()))
+
+    def _follow(self, channel: Connection) -> None:
+        while True:
+            try:
+                kind, message = channel.recv()
+            except (EOFError, OSError):
+                return
+            if kind == "response":
+                self._responses.put(message)
+            else:
+                with self._lock:
+                    self._apply(message)
+
+    def handle(self, request: dict[str, Any], channel: Connection) -> dict[str, Any]:
+        command = request.get("command")
+        try:
+            if command in WRITE_COMMANDS:
+                channel.send(request)
+                # The writer broadcasts the records before responding, so they are applied by now.
+                return self._responses.get()
+            if command not in READ_COMMANDS:
+                raise ValueError(f"Unknown command: {command}")
+            with self._lock:
+                result = self._read(command, request)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "result": result}
+
+    def _read(self, command: str, request: dict[str, Any]) -> object:
+        session = ReadOnlyTransaction(0, self.database)
+        if command == "get":
+            return self.get_book_usecase.execute(request["id"], session).to_dict()
+        return [
+            {"id": item.id, "result": object_to_dict(item.result), "error": item.error}
+            for item in self.get_books_usecase.execute(request["ids"], session)
+        ]
+
+
+class PreforkClient:
+    def __init__(self, address: tuple[str, int]):
+        self._socket = socket.create_connection(address)
+        self._stream = self._socket.makefile("rwb")
+
+    def call(self, command: str, **arguments: Any) -> dict[str, Any]:
+        self._stream.write(json.dumps({"command": command, **arguments}).encode() + b"\n")
+        self._stream.flush()
+        return json.loads(self._stream.readline())
+
+    def close(self) -> None:
+        self._stream.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,120 @@
+import argparse
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+PHASES = ("container", "load", "replay", "execute", "persist")
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    allocated_bytes: int = 0
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+
+
+class Profiler:
+    def __init__(self):
+        self.active = False
+        self.output_dir: Path | None = None
+        self.top = 20
+        self.phases: dict[str, PhaseStats] = {}
+        self._stack: list[PhaseStats] = []
+        self._null = nullcontext()
+
+    def start(self, output_dir: str | None = None, top: int = 20) -> None:
+        self.active = True
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.top = top
+        self.phases = {}
+        tracemalloc.start()
+
+    def stop(self) -> None:
+        self.active = False
+        tracemalloc.stop()
+
+    def phase(self, name: str) -> AbstractContextManager[None]:
+        if not self.active:
+            return self._null
+        return self._profile_phase(name)
+
+    @contextmanager
+    def _profile_phase(self, name: str) -> Iterator[None]:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        if self._stack:
+            self._stack[-1].profile.disable()
+        self._stack.append(stats)
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        stats.profile.enable()
+        try:
+            yield
+        finally:
+            stats.profile.disable()
+            stats.seconds += time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            stats.calls += 1
+            stats.peak_bytes = max(stats.peak_bytes, peak)
+            stats.allocated_bytes += current - memory_before
+            self._stack.pop()
+            if self._stack:
+                outer = self._stack[-1]
+                outer.peak_bytes = max(outer.peak_bytes, peak)
+                outer.profile.enable()
+
+    def report(self, stream: TextIO, label: str = "command") -> None:
+        ordered = sorted(
+            self.phases.values(),
+            key=lambda stats: PHASES.index(stats.name) if stats.name in PHASES else len(PHASES),
+        )
+        stream.write(f"\nProfile of {label}\n")
+        stream.write(f"{'phase':<12}{'calls':>8}{'seconds':>12}{'peak KiB':>12}{'net KiB':>12}\n")
+        for stats in ordered:
+            stream.write(
+                f"{stats.name:<12}{stats.calls:>8}{stats.seconds:>12.6f}"
+                f"{stats.peak_bytes / 1024:>12.1f}{stats.allocated_bytes / 1024:>12.1f}\n"
+            )
+        for stats in ordered:
+            buffer = io.StringIO()
+            try:
+                profile_stats = pstats.Stats(stats.profile, stream=buffer)
+            except TypeError:
+                continue
+            profile_stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            stream.write(f"\n--- {stats.name} ---\n{buffer.getvalue()}")
+            if self.output_dir is not None:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                profile_stats.dump_stats(self.output_dir / f"{label}-{stats.name}.pstats")
+
+
+PROFILER = Profiler()
+
+
+def add_profiling_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile the command with cProfile and tracemalloc"
+    )
+    parser.add_argument("--profile-dir", help="Directory to save per-phase pstats files")
+    parser.add_argument(
+        "--profile-top", type=int, default=20, help="Number of hot functions to report per phase"
+    )
+
+
+def parse_profiling_arguments(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(add_help=False)
+    add_profiling_arguments(parser)
+    parser.add_argument("command", nargs="?")
+    return parser.parse_known_args(argv)[0]
@@ -1,3 +1,34 @@
+from collections.abc import Callable
+from dataclasses import is_dataclass
+from typing import Any
+
+# One encoder per type, resolved on first use, so writes skip the dataclass/__dict__ checks.
+_ENCODERS: dict[type, Callable[[Any], Any]] = {}
+
+
+def _identity(obj: object) -> object:
+    return obj
+
+
+def _encoder_for(obj: object) -> Callable[[Any], Any]:
+    if is_dataclass(obj):
+        return type(obj).to_dict  # type: ignore
+    elif hasattr(obj, "__dict__"):
+        return vars
+    else:
+        return _identity
+
+
+def object_to_dict(obj: object) -> dict[str, Any] | object:
+    cls = type(obj)
+    if cls is dict:
+        return obj
+    encoder = _ENCODERS.get(cls)
+    if encoder is None:
+        encoder = _ENCODERS[cls] = _encoder_for(obj)
+    return encoder(obj)
+
+
 def convert_keys_to_int(dict_to_convert: dict) -> dict:
     new_log = {}
     for key, value in dict_to_convert.items():
@@ -1,6 +1,9 @@
+import sys
+
 from dishka import make_container
 
 from src.config import Config
+from src.infrastructure.profiler import PROFILER, parse_profiling_arguments
 from src.providers import CLIAdapter, CLIAdapterProvider
 
 config = Config()
@@ -8,8 +11,15 @@ config = Config()
 container = make_container(CLIAdapterProvider(), context={Config: config})
 
 def main(*args, **kwargs):
-    app = container.get(CLIAdapter)
+    options = parse_profiling_arguments(sys.argv[1:])
+    if options.profile:
+        PROFILER.start(options.profile_dir, options.profile_top)
+    with PROFILER.phase("container"):
+        app = container.get(CLIAdapter)
     app.run()
+    if options.profile:
+        PROFILER.stop()
+        PROFILER.report(sys.stderr, options.command or "command")
 
 if __name__ == "__main__":
     main()
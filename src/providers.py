@@ -4,11 +4,37 @@ from src.config import Config
 from src.core.ports.database import DatabaseInterface, WriteAheadLogInterface
 from src.core.ports.repository import BookRepositoryInterface
 from src.core.service.book_service import BookService
-from src.core.usecase import addBookUsecase, deleteBookUsecase, getBookUsecase, setBookStatusUsecase
+from src.core.usecase import (
+    addBookUsecase,
+    checkoutBookUsecase,
+    deleteBooksUsecase,
+    deleteBooksWhereUsecase,
+    deleteBookUsecase,
+    getBookStatsUsecase,
+    getBooksUsecase,
+    getBookUsecase,
+    returnBookUsecase,
+    setBooksStatusUsecase,
+    setBooksStatusWhereUsecase,
+    setBookStatusUsecase,
+)
 from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.cache import LRUCache
 from src.infrastructure.cli_adapter import CLIAdapter
+from src.infrastructure.database.durability import Durability
 from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.mapped_snapshot import MappedSnapshotDatabase
+from src.infrastructure.database.replica import (
+    JsonLogTail,
+    LogTail,
+    ReplicaDatabase,
+    SegmentLogTail,
+)
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.sharded_database import ShardedDatabase
 from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+from src.infrastructure.metrics import METRICS, MetricsRegistry, instrument
+from src.infrastructure.prefork_server import PreforkServer
 
 
 class CLIAdapterProvider(Provider):
@@ -16,16 +42,67 @@ class CLIAdapterProvider(Provider):
     config = from_context(provides=Config, scope=Scope.APP)
 
     @provide
-    def provide_wal(self, config: Config) -> WriteAheadLogInterface:
-        return WriteAheadLog(config.wal.filepath)
+    def provide_durability(self, config: Config) -> Durability:
+        return Durability(config.durability.mode, config.durability.group_interval_ms)
 
     @provide
-    def provide_database(self, wal: WriteAheadLogInterface, config: Config) -> DatabaseInterface:
-        return JsonDatabase(config.database.filepath, wal)
+    def provide_wal(self, config: Config, durability: Durability) -> WriteAheadLogInterface:
+        if config.database.replica:
+            if config.wal.segment_dir:
+                return SegmentLogTail(config.wal.segment_dir)
+            return JsonLogTail(config.wal.filepath)
+        if config.wal.segment_dir:
+            return SegmentedWriteAheadLog(
+                config.wal.segment_dir,
+                segment_size=config.wal.segment_size,
+                compression=None if config.wal.compression == "none" else config.wal.compression,
+                replay_workers=config.wal.replay_workers,
+                durability=durability,
+            )
+        return WriteAheadLog(config.wal.filepath, durability)
 
     @provide
-    def provide_repository(self) -> BookRepositoryInterface:
-        return BookRepository()
+    def provide_database(
+        self, wal: WriteAheadLogInterface, config: Config, durability: Durability
+    ) -> DatabaseInterface:
+        if config.database.mapped_reader:
+            return MappedSnapshotDatabase(config.database.mapped_snapshot)
+        if isinstance(wal, LogTail):
+            return ReplicaDatabase(config.database.filepath, wal)
+        if config.database.shards > 1:
+            sharded = ShardedDatabase(config.database.shard_dir, config.database.shards)
+            for shard in sharded.shards:
+                self._configure(shard, config)
+            return sharded
+        database = JsonDatabase(
+            config.database.filepath,
+            wal,
+            config.database.mapped_snapshot or None,
+            durability,
+            config.database.delta_merge_ratio or None,
+            config.database.state_cache or None,
+        )
+        self._configure(database, config)
+        if config.database.aggregates:
+            database.create_aggregates()
+        return database
+
+    def _configure(self, database: JsonDatabase, config: Config) -> None:
+        for field in config.database.indexes.split(","):
+            if field.strip():
+                database.create_index(field.strip())
+        database.spill_threshold = config.database.spill_threshold or None
+        database.spill_dir = config.database.spill_dir or None
+
+    @provide
+    def provide_repository(
+        self, database: DatabaseInterface, config: Config
+    ) -> BookRepositoryInterface:
+        if config.cache.max_size <= 0:
+            return BookRepository()
+        cache: LRUCache = LRUCache(config.cache.max_size, config.cache.collect_stats)
+        database.add_commit_listener(cache.invalidate)
+        return BookRepository(cache=cache)
 
     @provide
     def provide_service(self, repository: BookRepositoryInterface) -> BookService:
@@ -33,19 +110,106 @@ class CLIAdapterProvider(Provider):
 
     @provide
     def provide_add_book_usecase(self, service: BookService) -> addBookUsecase:
-        return addBookUsecase(service=service)
+        usecase = addBookUsecase(service=service)
+        instrument(usecase, "execute", "usecase_add_book_seconds")
+        return usecase
 
     @provide
     def provide_get_book_usecase(self, service: BookService) -> getBookUsecase:
-        return getBookUsecase(service=service)
+        usecase = getBookUsecase(service=service)
+        instrument(usecase, "execute", "usecase_get_book_seconds")
+        return usecase
 
     @provide
     def provide_delete_book_usecase(self, service: BookService) -> deleteBookUsecase:
-        return deleteBookUsecase(service=service)
+        usecase = deleteBookUsecase(service=service)
+        instrument(usecase, "execute", "usecase_delete_book_seconds")
+        return usecase
 
     @provide
     def provide_set_book_status_usecase(self, service: BookService) -> setBookStatusUsecase:
-        return setBookStatusUsecase(service=service)
+        usecase = setBookStatusUsecase(service=service)
+        instrument(usecase, "execute", "usecase_set_book_status_seconds")
+        return usecase
+
+    @provide
+    def provide_get_books_usecase(self, service: BookService) -> getBooksUsecase:
+        usecase = getBooksUsecase(service=service)
+        instrument(usecase, "execute", "usecase_get_books_seconds")
+        return usecase
+
+    @provide
+    def provide_delete_books_usecase(self, service: BookService) -> deleteBooksUsecase:
+        usecase = deleteBooksUsecase(service=service)
+        instrument(usecase, "execute", "usecase_delete_books_seconds")
+        return usecase
+
+    @provide
+    def provide_set_books_status_usecase(self, service: BookService) -> setBooksStatusUsecase:
+        usecase = setBooksStatusUsecase(service=service)
+        instrument(usecase, "execute", "usecase_set_books_status_seconds")
+        return usecase
+
+    @provide
+    def provide_delete_books_where_usecase(self, service: BookService) -> deleteBooksWhereUsecase:
+        usecase = deleteBooksWhereUsecase(service=service)
+        instrument(usecase, "execute", "usecase_delete_books_where_seconds")
+        return usecase
+
+    @provide
+    def provide_set_books_status_where_usecase(
+        self, service: BookService
+    ) -> setBooksStatusWhereUsecase:
+        usecase = setBooksStatusWhereUsecase(service=service)
+        instrument(usecase, "execute", "usecase_set_books_status_where_seconds")
+        return usecase
+
+    @provide
+    def provide_checkout_book_usecase(self, service: BookService) -> checkoutBookUsecase:
+        usecase = checkoutBookUsecase(service=service)
+        instrument(usecase, "execute", "usecase_checkout_book_seconds")
+        return usecase
+
+    @provide
+    def provide_return_book_usecase(self, service: BookService) -> returnBookUsecase:
+        usecase = returnBookUsecase(service=service)
+        instrument(usecase, "execute", "usecase_return_book_seconds")
+        return usecase
+
+    @provide
+    def provide_get_book_stats_usecase(self, service: BookService) -> getBookStatsUsecase:
+        usecase = getBookStatsUsecase(service=service)
+        instrument(usecase, "execute", "usecase_get_book_stats_seconds")
+        return usecase
+
+    @provide
+    def provide_metrics(self, config: Config) -> MetricsRegistry:
+        if METRICS.enabled:
+            METRICS.attach(config.metrics.filepath)
+        return METRICS
+
+    @provide
+    def provide_server(
+        self,
+        database: DatabaseInterface,
+        add_book_usecase: addBookUsecase,
+        delete_book_usecase: deleteBookUsecase,
+        get_book_usecase: getBookUsecase,
+        set_book_usecase: setBookStatusUsecase,
+        get_books_usecase: getBooksUsecase,
+        config: Config,
+    ) -> PreforkServer:
+        return PreforkServer(
+            database,
+            add_book_usecase,
+            delete_book_usecase,
+            get_book_usecase,
+            set_book_usecase,
+            get_books_usecase,
+            host=config.server.host,
+            port=config.server.port,
+            workers=config.server.workers,
+        )
 
     @provide
     def provide_cli_adapter(
@@ -55,7 +219,31 @@ class CLIAdapterProvider(Provider):
         delete_book_usecase: deleteBookUsecase,
         get_book_usecase: getBookUsecase,
         set_book_usecase: setBookStatusUsecase,
+        get_books_usecase: getBooksUsecase,
+        delete_books_usecase: deleteBooksUsecase,
+        set_books_usecase: setBooksStatusUsecase,
+        delete_where_usecase: deleteBooksWhereUsecase,
+        set_status_where_usecase: setBooksStatusWhereUsecase,
+        checkout_usecase: checkoutBookUsecase,
+        return_usecase: returnBookUsecase,
+        stats_usecase: getBookStatsUsecase,
+        metrics: MetricsRegistry,
+        server: PreforkServer,
     ) -> CLIAdapter:
         return CLIAdapter(
-            database, add_book_usecase, delete_book_usecase, get_book_usecase, set_book_usecase
+            database,
+            add_book_usecase,
+            delete_book_usecase,
+            get_book_usecase,
+            set_book_usecase,
+            get_books_usecase,
+            delete_books_usecase,
+            set_books_usecase,
+            delete_where_usecase,
+            set_status_where_usecase,
+            checkout_usecase,
+            return_usecase,
+            stats_usecase,
+            metrics,
+            server,
         )
@@ -0,0 +1,138 @@
+import pytest
+
+from src.core.domain.book import BookStatus
+from src.core.domain.predicate import Where
+from src.core.dto.book_dto import BookDTO, ReadBookDTO
+from src.core.service.book_service import BookService
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.write_ahead_logger import SimpleWAL
+
+
+@pytest.fixture
+def database():
+    return SimpleDatabase(SimpleWAL())
+
+
+@pytest.fixture
+def service():
+    return BookService(BookRepository())
+
+
+@pytest.fixture
+def book_ids(database, service):
+    session = database.begin_transaction()
+    ids = [
+        service.create(BookDTO(f"title{i}", "author", 1900 + i, BookStatus.IN_STOCK), session)
+        for i in range(3)
+    ]
+    session.commit()
+    return ids
+
+
+def test_get_many(database, service, book_ids):
+    results = service.get_many([*book_ids, 99], database.begin_transaction())
+    assert [item.ok for item in results] == [True, True, True, False]
+    assert [item.result.title for item in results[:3]] == ["title0", "title1", "title2"]
+
+
+def test_get_converts_straight_to_read_dto(database, service, book_ids):
+    book = service.get(book_ids[1], database.begin_transaction())
+
+    assert book == ReadBookDTO("title1", "author", 1901, BookStatus.IN_STOCK, book_ids[1])
+    assert book.to_dict() == {
+        "title": "title1",
+        "author": "author",
+        "year": 1901,
+        "status": BookStatus.IN_STOCK,
+        "id": book_ids[1],
+    }
+
+
+def test_stats_come_from_the_aggregate_view(database, service, book_ids):
+    database.create_aggregates()
+    session = database.begin_transaction()
+    service.checkout(book_ids[0], session)
+    session.commit()
+
+    stats = service.stats(1, database.begin_transaction())
+
+    assert stats.total == 3
+    assert stats.by_status == {"issued": 1, "in_stock": 2}
+    assert stats.top_authors == [("author", 3)]
+    assert stats.by_decade == {1900: 3}
+
+
+def test_set_status_many_single_transaction(database, service, book_ids):
+    session = database.begin_transaction()
+    results = service.set_status_many([book_ids[0], book_ids[2], 99], BookStatus.ISSUED, session)
+    session.commit()
+    assert [item.ok for item in results] == [True, True, False]
+    assert len(database.wal.get_log()) == 2
+    statuses = [database.get(id)["status"] for id in book_ids]
+    assert statuses == [BookStatus.ISSUED, BookStatus.IN_STOCK, BookStatus.ISSUED]
+
+
+def test_delete_many_reports_missing_and_duplicates(database, service, book_ids):
+    session = database.begin_transaction()
+    results = service.delete_many([book_ids[0], book_ids[0], 99], session)
+    session.commit()
+    assert [item.ok for item in results] == [True, False, False]
+    assert database.get(book_ids[0]) is None
+    assert database.get(book_ids[1]) is not None
+
+
+def test_set_status_where_and_delete_where(database, service, book_ids):
+    session = database.begin_transaction()
+    updated = service.set_status_where(Where.of(year__lt=1902), BookStatus.ISSUED, session)
+    session.commit()
+    session = database.begin_transaction()
+    deleted = service.delete_where(Where.of(status=BookStatus.ISSUED, year__gt=1900), session)
+    session.commit()
+
+    assert updated == book_ids[:2]
+    assert deleted == [book_ids[1]]
+    assert [database.get(id) is None for id in book_ids] == [False, True, False]
+    assert database.get(book_ids[0])["status"] == BookStatus.ISSUED
+
+
+def test_checkout_and_return(database, service, book_ids):
+    session = database.begin_transaction()
+    issued = service.checkout(book_ids[0], session)
+    session.commit()
+    assert issued.status == BookStatus.ISSUED
+    assert database.get(book_ids[0])["status"] == BookStatus.ISSUED
+
+    session = database.begin_transaction()
+    with pytest.raises(ValueError, match="expected"):
+        service.checkout(book_ids[0], session)
+    returned = service.return_book(book_ids[0], session)
+    session.commit()
+    assert returned.status == BookStatus.IN_STOCK
+    (operations,) = database.wal.get_log()[-1].to_dict().values()
+    assert list(operations.values()) == [
+        {"operation": "set", "key": book_ids[0], "changes": {"status": BookStatus.IN_STOCK}}
+    ]
+
+
+def test_set_status_if_reads_record_once(database, book_ids):
+    service = BookService(BookRepository(cache=LRUCache(8)))
+    session = database.begin_transaction()
+    service.get(book_ids[1], session)
+    reads = []
+    original_get = session.get
+    session.get = lambda key: reads.append(key) or original_get(key)
+
+    book = service.set_status_if(book_ids[1], BookStatus.IN_STOCK, BookStatus.ISSUED, session)
+
+    assert reads == [book_ids[1]]
+    assert book.title == "title1"
+    assert service.get(book_ids[1], session).status == BookStatus.ISSUED
+
+
+def test_set_status_if_missing_book(database, service):
+    with pytest.raises(Exception, match="Book with id 99 not found"):
+        service.set_status_if(
+            99, BookStatus.IN_STOCK, BookStatus.ISSUED, database.begin_transaction()
+        )
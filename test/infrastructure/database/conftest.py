@@ -0,0 +1,15 @@
+import pytest
+
+from src.infrastructure.database.transaction import Transaction
+
+
+def commit_create(database, value: object) -> int:
+    transaction = Transaction(database.next_tid, database)
+    key = transaction.create(value)
+    transaction.commit()
+    return key
+
+
+@pytest.fixture
+def commit():
+    return commit_create
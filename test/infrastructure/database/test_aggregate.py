@@ -0,0 +1,79 @@
+from src.infrastructure.database.aggregate import AggregateView, CountView
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+def book(author: str, year: int, status: str = "in_stock") -> dict:
+    return {"title": "t", "author": author, "year": year, "status": status}
+
+
+def open_database(tmp_path, **kwargs) -> JsonDatabase:
+    return JsonDatabase(
+        str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")), **kwargs
+    )
+
+
+def counts(view: AggregateView) -> tuple:
+    return (
+        view.total,
+        view.by_status.counts,
+        view.by_author.counts,
+        view.by_decade.counts,
+    )
+
+
+def test_top_follows_count_changes():
+    view = CountView()
+    for value in "abcab":
+        view.add(value, 1)
+    view.add("c", 2)
+    view.add("a", -1)
+
+    assert view.top(2) == [("c", 3), ("b", 2)]
+    assert view.top(10) == [("c", 3), ("b", 2), ("a", 1)]
+
+
+def test_commits_and_replay_keep_the_view_current(tmp_path):
+    database = open_database(tmp_path)
+    view = database.create_aggregates()
+    transaction = Transaction(database.next_tid, database)
+    first = transaction.create(book("a", 1951))
+    second = transaction.create(book("b", 1962))
+    transaction.create(book("a", 1969))
+    transaction.commit()
+    transaction = Transaction(database.next_tid, database)
+    transaction.set(first, book("b", 1951, "issued"))
+    transaction.delete(second)
+    transaction.commit()
+
+    expected = ({"in_stock": 1, "issued": 1}, {"a": 1, "b": 1}, {1950: 1, 1960: 1})
+    assert counts(view) == (2, *expected)
+    assert counts(open_database(tmp_path).create_aggregates()) == counts(view)
+
+
+def test_view_is_built_on_first_use(tmp_path):
+    database = open_database(tmp_path)
+    database.create(book("a", 1984))
+
+    assert database.aggregates is None
+    view = Transaction(database.next_tid, database).aggregates()
+
+    assert view is database.aggregates
+    assert counts(view) == (1, {"in_stock": 1}, {"a": 1}, {1980: 1})
+
+
+def test_checkpoint_persists_the_view_with_the_state_cache(tmp_path):
+    cache = str(tmp_path / "db.cache")
+    database = open_database(tmp_path, state_cache_filepath=cache)
+    database.create_aggregates()
+    database.create(book("a", 1990))
+    database.checkpoint()
+    transaction = Transaction(database.next_tid, database)
+    transaction.create(book("b", 2001))
+    transaction.commit()
+
+    reopened = open_database(tmp_path, state_cache_filepath=cache)
+
+    assert reopened.aggregates is not None
+    assert counts(reopened.aggregates) == counts(database.aggregates)
@@ -0,0 +1,87 @@
+import pytest
+
+from src.infrastructure.database.backup import Backup, backup
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+def open_segmented(directory) -> JsonDatabase:
+    wal = SegmentedWriteAheadLog(
+        str(directory / "wal"), segment_size=1, compression="zlib", background=False
+    )
+    return JsonDatabase(str(directory / "db.json"), wal)
+
+
+def test_backup_restores_the_state_at_its_lsn(tmp_path, commit):
+    source = tmp_path / "source"
+    source.mkdir()
+    database = JsonDatabase(str(source / "db.json"), WriteAheadLog(str(source / "wal.json")))
+    commit(database, {"n": 0})
+    commit(database, {"n": 1})
+
+    manifest = backup(database, tmp_path / "backup")
+    commit(database, {"n": 2})
+    restored = JsonDatabase(
+        str(tmp_path / "backup" / "db.json"), WriteAheadLog(str(tmp_path / "backup" / "wal.json"))
+    )
+
+    assert manifest["lsn"] == 2
+    assert restored.data == {0: {"n": 0}, 1: {"n": 1}}
+
+
+def test_backup_leaves_out_transactions_past_the_lsn(tmp_path, commit):
+    database = open_segmented(tmp_path / "source")
+    for n in range(4):
+        commit(database, {"n": n})
+
+    manifest = backup(database, tmp_path / "backup", lsn=2)
+
+    assert manifest["lsn"] == 2
+    assert open_segmented(tmp_path / "backup").data == {0: {"n": 0}, 1: {"n": 1}}
+    with pytest.raises(ValueError):
+        backup(database, tmp_path / "backup", incremental=True, lsn=1)
+
+
+def test_incremental_backup_copies_only_new_segments(tmp_path, commit):
+    database = open_segmented(tmp_path / "source")
+    for n in range(3):
+        commit(database, {"n": n})
+    backup(database, tmp_path / "backup")
+    for n in range(3, 5):
+        commit(database, {"n": n})
+    database.wal.segment_size = 1 << 20
+    commit(database, {"n": 5})
+
+    run = Backup(database, tmp_path / "backup")
+    manifest = run.run(incremental=True)
+    restored = open_segmented(tmp_path / "backup")
+
+    assert [path.name for path in run.written] == [
+        "wal_00000000000000000003_00000000000000000003.jsonl.zz",
+        "wal_00000000000000000004_00000000000000000004.jsonl.zz",
+        "wal_00000000000000000005_00000000000000000005.jsonl",
+        "backup.json",
+    ]
+    assert manifest["backups"] == 2
+    assert manifest["lsn"] == 6
+    assert restored.data == database.data
+
+
+def test_backup_refuses_unsafe_targets(tmp_path, commit):
+    source = tmp_path / "source"
+    source.mkdir()
+    database = JsonDatabase(str(source / "db.json"), WriteAheadLog(str(source / "wal.json")))
+    commit(database, {"n": 0})
+    foreign = tmp_path / "photos"
+    foreign.mkdir()
+    (foreign / "cat.jpg").write_bytes(b"meow")
+
+    for target in (foreign, source, tmp_path):
+        with pytest.raises(ValueError):
+            backup(database, target)
+
+    assert (foreign / "cat.jpg").read_bytes() == b"meow"
+    assert JsonDatabase(str(source / "db.json"), WriteAheadLog(str(source / "wal.json"))).data
+    backup(database, tmp_path / "backup")
+    assert backup(database, tmp_path / "backup")["backups"] == 1
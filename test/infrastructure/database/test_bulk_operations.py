@@ -0,0 +1,130 @@
+import pytest
+
+from src.core.domain.predicate import Where
+from src.infrastructure.database.json_database import JsonDatabase, SimpleDatabase
+from src.infrastructure.database.parallel_recovery import fold_partitioned
+from src.infrastructure.database.recovery import LogFold
+from src.infrastructure.database.sharded_database import ShardedDatabase
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
+
+
+def book(year: int, status: str = "in_stock") -> dict:
+    return {"title": f"t{year}", "author": "A", "year": year, "status": status}
+
+
+def seed(database) -> None:
+    transaction = database.begin_transaction()
+    for year, status in [(1900, "issued"), (1940, "issued"), (1960, "issued"), (1930, "in_stock")]:
+        transaction.create(book(year, status))
+    transaction.commit()
+
+
+@pytest.fixture
+def database():
+    database = SimpleDatabase(SimpleWAL())
+    seed(database)
+    return database
+
+
+def test_where_lookups():
+    predicate = Where.of(status="issued", year__lt=1950)
+
+    assert predicate(book(1900, "issued"))
+    assert not predicate(book(1960, "issued"))
+    assert not predicate({"status": "issued"})
+    assert not Where.of(year__gt=1900)({"year": "unknown"})
+    with pytest.raises(ValueError):
+        Where.of(year__between=1)
+
+
+def test_delete_where_logs_one_compact_record(tmp_path):
+    database = JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+    seed(database)
+    transaction = database.begin_transaction()
+
+    keys = transaction.delete_where(Where.of(status="issued", year__lt=1950))
+    transaction.commit()
+
+    assert keys == [0, 1]
+    assert sorted(database.data) == [2, 3]
+    assert list(database.wal.get_log()[transaction.tid].values()) == [
+        {"operation": "delete_where", "keys": [0, 1]}
+    ]
+
+
+def test_update_where_is_replayed(tmp_path):
+    database = JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+    seed(database)
+    transaction = database.begin_transaction()
+    keys = transaction.update_where(Where.of(year__gt=1935), {"status": "lost"})
+    transaction.commit()
+
+    reopened = JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+
+    assert keys == [1, 2]
+    assert reopened.data == database.data
+    assert [reopened.data[key]["status"] for key in range(4)] == [
+        "issued",
+        "lost",
+        "lost",
+        "in_stock",
+    ]
+
+
+def test_index_narrows_candidates_and_follows_commits(database):
+    index = database.create_index("status")
+    assert index.lookup("issued") == {0, 1, 2}
+
+    transaction = database.begin_transaction()
+    transaction.update_where(Where.of(status="issued", year__lt=1950), {"status": "in_stock"})
+    transaction.commit()
+
+    assert index.lookup("issued") == {2}
+    assert index.lookup("in_stock") == {0, 1, 3}
+    assert database.begin_transaction()._candidate_keys(Where.of(status="issued")) == {2}
+
+
+def test_predicate_sees_flushed_changes_in_same_transaction(database):
+    database.create_index("status")
+    transaction = database.begin_transaction()
+    transaction.set(3, book(1930, "issued"))
+    transaction.flush()
+
+    assert transaction.delete_where(Where.of(status="issued")) == [0, 1, 2, 3]
+
+
+def test_rollback_restores_matched_records(database):
+    transaction = database.begin_transaction()
+    transaction.delete_where(Where.of(status="issued"))
+    transaction.update_where(Where.of(status="in_stock"), {"status": "issued"})
+    transaction.flush()
+    transaction.rollback()
+
+    assert transaction._temp_data == {key: database.data[key] for key in range(4)}
+
+
+def test_bulk_records_fold_per_key_and_partition():
+    records = [
+        (0, {0: {"operation": "create", "key": 0, "value": book(1900)}}),
+        (1, {1: {"operation": "create", "key": 1, "value": book(1901)}}),
+        (2, {2: {"operation": "update_where", "keys": [0, 1], "changes": {"status": "x"}}}),
+        (3, {3: {"operation": "delete_where", "keys": [1]}}),
+    ]
+    sequential = LogFold().add_all(records)
+    partitioned = LogFold()
+    for fold in fold_partitioned(records, 2):
+        partitioned.then(fold)
+
+    assert sequential.states == partitioned.states
+    assert sequential.states[0].value["status"] == "x"
+
+
+def test_sharded_delete_where_spans_shards(tmp_path):
+    database = ShardedDatabase(str(tmp_path / "shards"), 2)
+    seed(database)
+    transaction = database.begin_transaction()
+
+    assert transaction.delete_where(Where.of(status="issued")) == [0, 1, 2]
+    transaction.commit()
+
+    assert sorted(database.data) == [3]
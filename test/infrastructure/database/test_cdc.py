@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from src.infrastructure.database.json_database import JsonDatabase, SimpleDatabase
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
+
+
+@pytest.fixture
+def database(tmp_path):
+    return JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+
+
+def test_committed_changes_are_pushed_in_lsn_order(commit):
+    database = SimpleDatabase(SimpleWAL())
+    batches = []
+    subscription = database.change_feed.subscribe(batches.append, batch_size=2)
+    key = commit(database, {"n": 0})
+    transaction = Transaction(database.next_tid, database)
+    transaction.set(key, {"n": 1})
+    transaction.create({"n": 2})
+    transaction.commit()
+    subscription.close()
+
+    events = [event for batch in batches for event in batch]
+    assert all(len(batch) <= 2 for batch in batches)
+    assert [event.lsn for event in events] == [0, 1, 2]
+    assert [event.operation["operation"] for event in events] == ["create", "set", "create"]
+    assert subscription.delivered_lsn == 2
+
+
+def test_interleaved_transactions_are_delivered_in_commit_order(database):
+    events = []
+    subscription = database.change_feed.subscribe(events.extend)
+    first = Transaction(database.next_tid, database)
+    first.create({"n": 0})
+    second = Transaction(database.next_tid, database)
+    second.create({"n": 1})
+    second.commit()
+    first.commit()
+    subscription.close()
+
+    assert [(event.tid, event.lsn) for event in events] == [(second.tid, 1), (first.tid, 0)]
+    assert subscription.delivered_lsn == 0
+
+
+def test_beginning_the_next_transaction_does_not_republish(database):
+    events = []
+    subscription = database.change_feed.subscribe(events.extend)
+    transaction = database.begin_transaction()
+    transaction.create({"n": 0})
+    assert transaction.commit()
+    database.begin_transaction()
+    subscription.close()
+
+    assert [(event.tid, event.lsn) for event in events] == [(transaction.tid, 0)]
+
+
+def test_resume_reads_the_wal_then_follows_live_commits(database, commit):
+    for n in range(3):
+        commit(database, {"n": n})
+    events = []
+    subscription = database.change_feed.subscribe(events.extend, from_lsn=1)
+    commit(database, {"n": 3})
+    subscription.close()
+
+    assert [event.lsn for event in events] == [1, 2, 3]
+    assert [event.operation["value"] for event in events] == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_full_queue_holds_back_commits(database, commit):
+    release = threading.Event()
+    subscription = database.change_feed.subscribe(lambda batch: release.wait(), max_pending=1)
+    committer = threading.Thread(target=lambda: [commit(database, {"n": n}) for n in range(3)])
+    committer.start()
+
+    committer.join(timeout=0.2)
+    assert committer.is_alive()
+
+    release.set()
+    committer.join()
+    subscription.close()
+    assert subscription.delivered_lsn == 2
+
+
+def test_failing_handler_stops_its_subscription(database, commit):
+    def handler(batch):
+        raise RuntimeError("downstream is down")
+
+    subscription = database.change_feed.subscribe(handler, max_pending=1)
+    for n in range(3):
+        commit(database, {"n": n})
+    subscription.close()
+
+    assert isinstance(subscription.error, RuntimeError)
+    assert len(database.data) == 3
@@ -0,0 +1,68 @@
+import json
+
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+def open_database(tmp_path, ratio: float | None = 1000.0) -> JsonDatabase:
+    return JsonDatabase(
+        str(tmp_path / "db.json"),
+        WriteAheadLog(str(tmp_path / "wal.json")),
+        delta_merge_ratio=ratio,
+    )
+
+
+def deltas(tmp_path) -> list[dict]:
+    return [json.loads(path.read_text()) for path in sorted(tmp_path.glob("db.json.delta.*"))]
+
+
+def test_checkpoint_writes_only_changed_records(tmp_path):
+    database = open_database(tmp_path)
+    database.create({"title": "a"})
+    database.create({"title": "b"})
+    transaction = Transaction(database.next_tid, database)
+    transaction.set(0, {"title": "c"})
+    transaction.delete(1)
+    transaction.commit()
+    database.checkpoint()
+
+    assert [delta["records"] for delta in deltas(tmp_path)] == [
+        {"0": {"title": "a"}},
+        {"1": {"title": "b"}},
+        {"0": {"title": "c"}, "1": None},
+    ]
+    assert json.loads((tmp_path / "db.json").read_text())["data"] == {}
+    assert open_database(tmp_path, ratio=None).data == {0: {"title": "c"}}
+
+
+def test_deltas_are_merged_into_the_base(tmp_path):
+    database = open_database(tmp_path, ratio=0.5)
+    for n in range(4):
+        database.create({"n": n})
+    # Deltas written while a merge runs are folded into the next one.
+    database.wait_for_snapshot()
+    database.create({"n": 4})
+    database.close()
+
+    base = json.loads((tmp_path / "db.json").read_text())
+    reopened = open_database(tmp_path)
+
+    assert deltas(tmp_path) == []
+    assert base["merged_delta"] >= 1
+    assert reopened.data == database.data
+    assert reopened._next_id == 5
+
+
+def test_deltas_already_in_the_base_are_skipped(tmp_path):
+    database = open_database(tmp_path)
+    database.create({"n": 0})
+    stale = next(tmp_path.glob("db.json.delta.*"))
+    content = stale.read_text()
+    database.delta_merge_ratio = None
+    database.checkpoint()
+    database.close()
+    stale.write_text(content.replace('"n": 0', '"n": 1'))
+
+    assert open_database(tmp_path).data == {0: {"n": 0}}
+    assert not stale.exists()
@@ -0,0 +1,127 @@
+import os
+import threading
+
+import pytest
+
+from src.infrastructure.database import durability as durability_module
+from src.infrastructure.database.durability import Durability, SnapshotWriter
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(durability_module.os, "fsync", fsync)
+    return calls
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Durability("eventually")
+
+
+def test_strict_fsyncs_every_commit(tmp_path, fsyncs, commit):
+    strict = Durability("strict")
+    wal = SegmentedWriteAheadLog(str(tmp_path / "wal"), background=False, durability=strict)
+    database = JsonDatabase(str(tmp_path / "db.json"), wal, durability=strict)
+    # The first commit creates the active segment, so its directory is synced as well.
+    commit(database, "a")
+    fsyncs.clear()
+
+    commit(database, "b")
+    commit(database, "c")
+
+    assert len(fsyncs) == 2
+
+
+def test_strict_syncs_the_directory_of_a_replaced_file(tmp_path, monkeypatch, commit):
+    synced = []
+    monkeypatch.setattr(durability_module, "fsync_path", synced.append)
+    strict = Durability("strict")
+    wal = SegmentedWriteAheadLog(str(tmp_path / "wal"), compression=None, durability=strict)
+    database = JsonDatabase(str(tmp_path / "db.json"), wal, durability=strict)
+    commit(database, "a")
+    synced.clear()
+
+    database.create("b")
+    wal.rotate()
+
+    assert synced == [tmp_path, tmp_path / "wal"]
+
+
+def test_grouped_fsyncs_in_the_background(tmp_path, fsyncs, commit):
+    grouped = Durability("grouped", interval_ms=60_000)
+    database = JsonDatabase(
+        str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json"), grouped)
+    )
+    fsyncs.clear()
+
+    commit(database, "a")
+    commit(database, "b")
+    assert fsyncs == []
+
+    grouped.close()
+    # The log and the directory it was renamed into.
+    assert len(fsyncs) == 2
+
+
+@pytest.mark.parametrize("mode", ["strict", "grouped"])
+def test_failed_wal_rewrite_keeps_the_previous_log(tmp_path, mode, commit):
+    durability = Durability(mode, interval_ms=60_000)
+    wal = WriteAheadLog(str(tmp_path / "wal.json"), durability)
+    database = JsonDatabase(str(tmp_path / "db.json"), wal)
+    commit(database, "a")
+    log = wal.get_log()
+
+    class Unserializable:
+        tid = 99
+
+        def to_dict(self):
+            # json.dump has written part of the log by the time it reaches the object.
+            return {99: {0: {"operation": "create", "value": object()}}}
+
+    with pytest.raises(TypeError):
+        wal.write_log(Unserializable())
+
+    assert WriteAheadLog(str(tmp_path / "wal.json")).get_log() == log
+    durability.close()
+
+
+def test_snapshot_writer_keeps_only_the_newest_pending_state():
+    release = threading.Event()
+    written = []
+
+    def write(state):
+        release.wait()
+        written.append(state["n"])
+
+    writer = SnapshotWriter(write)
+    for n in range(4):
+        writer.submit({"n": n})
+    release.set()
+    writer.close()
+
+    assert written[-1] == 3
+    assert len(written) <= 2
+
+
+def test_relaxed_snapshots_are_written_in_the_background(tmp_path):
+    relaxed = Durability("relaxed")
+    path = str(tmp_path / "db.json")
+    database = JsonDatabase(path, WriteAheadLog(str(tmp_path / "wal.json"), relaxed), None, relaxed)
+    keys = [database.create({"n": n}) for n in range(5)]
+    database.delete(keys[0])
+    database.close()
+
+    reopened = JsonDatabase(path, WriteAheadLog(str(tmp_path / "wal.json")))
+
+    assert reopened.data == database.data
+    assert sorted(reopened.data) == keys[1:]
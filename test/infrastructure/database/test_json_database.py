@@ -1,7 +1,8 @@
 import pytest
 
 from src.infrastructure.database.json_database import JsonDatabase
-from src.infrastructure.database.write_ahead_logger import SimpleWAL
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
 
 
 @pytest.fixture
@@ -93,3 +94,22 @@ def test_load_data(db, json_filepath):
     assert new_db.next_id == db.next_id
     assert new_db.next_tid == db.next_tid
     assert new_db.next_lsn == db.next_lsn
+
+
+def test_failed_wal_write_leaves_the_store_unchanged(tmp_path, monkeypatch):
+    wal = WriteAheadLog(str(tmp_path / "wal.json"))
+    database = JsonDatabase(str(tmp_path / "db.json"), wal)
+    seen = []
+    database.add_commit_listener(seen.extend)
+
+    def fail():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(wal, "_save_log", fail)
+    transaction = Transaction(database.next_tid, database)
+    transaction.create({"n": 0})
+
+    assert transaction.commit() is False
+    assert database.data == {}
+    assert wal.get_log() == {}
+    assert seen == []
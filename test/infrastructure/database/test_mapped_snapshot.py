@@ -0,0 +1,114 @@
+import pytest
+
+from src.core.service.book_service import BookService
+from src.core.usecase import getBookUsecase
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.mapped_snapshot import (
+    MappedSnapshot,
+    MappedSnapshotDatabase,
+    encode_snapshot,
+    write_snapshot,
+)
+from src.infrastructure.database.write_ahead_logger import SimpleWAL
+
+
+def book(title: str, year: int = 2000, status: str = "in_stock") -> dict:
+    return {"title": title, "author": "Author", "year": year, "status": status}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return tmp_path / "snapshot.bin"
+
+
+def test_round_trip_preserves_records_and_counters(snapshot_path):
+    data = {
+        7: book("Война и мир", 1869),
+        2: book("b", 2001, "issued"),
+        5: {"title": "partial"},
+        9: {"rating": 4.5, "tags": ["x"], "flag": True, "year": 2**70},
+        11: "not a dict",
+    }
+    write_snapshot(snapshot_path, data, next_id=12, next_tid=3, next_lsn=40, checkpoint_lsn=40)
+
+    snapshot = MappedSnapshot(snapshot_path)
+
+    assert list(snapshot) == [2, 5, 7, 9, 11]
+    assert snapshot.copy() == data
+    assert (snapshot.next_id, snapshot.next_tid, snapshot.next_lsn) == (12, 3, 40)
+    assert snapshot.checkpoint_lsn == 40
+    snapshot.close()
+
+
+def test_lookup_decodes_single_records(snapshot_path):
+    write_snapshot(snapshot_path, {key: book(f"t{key}", 1900 + key) for key in range(0, 100, 3)})
+    snapshot = MappedSnapshot(snapshot_path)
+
+    assert snapshot[30] == book("t30", 1930)
+    assert 31 not in snapshot
+    assert snapshot.get(31) is None
+    with pytest.raises(KeyError):
+        snapshot[-1]
+    assert len(snapshot) == 34
+
+
+def test_repeated_strings_are_stored_once():
+    data = {key: book("same title") for key in range(100)}
+
+    encoded = encode_snapshot(data)
+
+    assert encoded.count(b"same title") == 1
+    assert encoded.count(b"Author") == 1
+
+
+def test_empty_snapshot(snapshot_path):
+    write_snapshot(snapshot_path, {})
+
+    database = MappedSnapshotDatabase(str(snapshot_path))
+
+    assert database.get(0) is None
+    assert database.get_all() == []
+
+
+def test_json_database_checkpoint_produces_snapshot(tmp_path, snapshot_path):
+    primary = JsonDatabase(str(tmp_path / "db.json"), SimpleWAL(), str(snapshot_path))
+    first = primary.create(book("a"))
+    primary.create(book("b"))
+    transaction = primary.begin_transaction()
+    transaction.set(first, book("a", status="issued"))
+    transaction.commit()
+    primary.checkpoint()
+
+    reader = MappedSnapshotDatabase(str(snapshot_path))
+
+    assert reader.get_all() == list(primary.data.values())
+    assert reader.checkpoint_lsn == primary.checkpoint_lsn
+    assert reader.next_id == 2
+
+
+def test_reader_is_read_only_and_serves_usecase(snapshot_path):
+    write_snapshot(snapshot_path, {3: book("a")})
+    reader = MappedSnapshotDatabase(str(snapshot_path))
+    usecase = getBookUsecase(service=BookService(repository=BookRepository()))
+
+    assert usecase.execute(3, reader.begin_transaction()).title == "a"
+    with pytest.raises(PermissionError):
+        reader.set(3, book("b"))
+    with pytest.raises(PermissionError):
+        reader.begin_transaction().create(book("b"))
+
+
+def test_reader_sync_remaps_replaced_snapshot(snapshot_path):
+    write_snapshot(snapshot_path, {0: book("old")})
+    reader = MappedSnapshotDatabase(str(snapshot_path))
+    invalidated = []
+    reader.add_commit_listener(lambda keys: invalidated.extend(keys))
+
+    write_snapshot(snapshot_path, {0: book("new"), 1: book("added")}, next_id=2)
+    assert reader.get(0) == book("old")
+    reader.sync()
+
+    assert reader.get(0) == book("new")
+    assert reader.next_id == 2
+    assert sorted(invalidated) == [0, 1]
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from src.infrastructure.database.json_database import SimpleDatabase
@@ -146,3 +148,166 @@ def test_idempotency(transaction):
     assert transaction.get_all() == ["previous_value"]
     delete_op.undo()
     assert transaction.get_all() == ["previous_value"]
+
+
+def test_set_operation_logs_only_changed_fields(transaction):
+    key = transaction.create({"title": "t", "status": "in_stock", "extra": 1})
+    transaction.flush()
+    op = SetOperation(key, {"title": "t", "status": "issued"}, transaction)
+    op.execute()
+    assert op.to_dict()[op._lsn] == {
+        "operation": "set",
+        "key": key,
+        "changes": {"status": "issued"},
+        "removed": ["extra"],
+    }
+
+
+def test_delta_set_operation_replay(transaction):
+    key = transaction._storage.create({"title": "t", "status": "in_stock"})
+    op = OperationFactory.create(
+        1, "set", transaction, key=key, changes={"status": "issued"}, removed=["title"]
+    )
+    op.execute()
+    assert transaction.get(key) == {"status": "issued"}
+    op.undo()
+    assert transaction.get(key) == {"title": "t", "status": "in_stock"}
+
+
+def test_delta_set_operation_replay_on_deleted_record(transaction):
+    op = OperationFactory.create(1, "set", transaction, key=5, changes={"status": "issued"})
+    op.execute()
+    assert transaction.get(5) is None
+    op.undo()
+    assert transaction.get(5) is None
+
+
+def test_delete_operation_logs_only_key(transaction):
+    key = transaction.create("value")
+    transaction.flush()
+    op = DeleteOperation(key, transaction)
+    op.execute()
+    assert op.to_dict()[op._lsn] == {"operation": "delete", "key": key}
+
+
+def test_redo_delete_of_missing_record(transaction):
+    op = OperationFactory.create(1, "delete", transaction, key=5)
+    op.execute()
+    op.undo()
+    assert transaction.get(5) is None
+
+
+def test_buffer_takes_create_lsns_in_build_order(database, transaction):
+    database.data = {0: "a"}
+    database._next_id = 1
+    first = transaction.create("b")
+    transaction.set(0, "c")
+    second = transaction.create("d")
+
+    operations = transaction.to_dict()[transaction.tid]
+
+    assert [operations[lsn].get("key") for lsn in sorted(operations)] == [first, 0, second]
+    assert database._next_lsn == 3
+
+
+def test_buffer_serializes_like_json_dumps(transaction):
+    first = transaction.create({"title": "a", "tags": ["x"]})
+    transaction.flush()
+    transaction.set(first, {"title": "b", "tags": ["x"]})
+    transaction.create("plain")
+
+    assert json.loads(transaction.to_json()) == json.loads(
+        json.dumps({"tid": transaction.tid, "operations": transaction.to_dict()[transaction.tid]})
+    )
+
+
+def test_buffer_hands_out_creates_as_operations(transaction):
+    transaction.create("a")
+    transaction.create("b")
+
+    operation = transaction._operations[-1]
+    operation.value = "c"
+    transaction.flush()
+
+    assert isinstance(operation, CreateOperation)
+    assert transaction._operations[-1] is operation
+    assert transaction.get_all() == ["a", "c"]
+
+
+def logged(transaction) -> list[dict]:
+    [operations] = transaction.to_dict().values()
+    return list(operations.values())
+
+
+def test_create_then_sets_are_logged_as_one_create(database, transaction):
+    key = transaction.create({"title": "a", "status": "in_stock"})
+    transaction.set(key, {"title": "b", "status": "in_stock"})
+    transaction.flush()
+    transaction.set_if(key, {"title": "b"}, {"status": "issued"})
+    transaction.commit()
+
+    assert logged(transaction) == [
+        {"operation": "create", "key": key, "value": {"title": "b", "status": "issued"}}
+    ]
+    assert database.get(key) == {"title": "b", "status": "issued"}
+
+
+def test_set_if_sees_the_transactions_unflushed_writes(database):
+    database.data = {0: {"status": "in_stock"}}
+    transaction = database.begin_transaction()
+    transaction.set(0, {"status": "issued"})
+
+    with pytest.raises(ValueError):
+        transaction.set_if(0, {"status": "in_stock"}, {"status": "lost"})
+    key = transaction.create({"status": "in_stock"})
+    assert transaction.set_if(key, {"status": "in_stock"}, {"status": "issued"}) == {
+        "status": "issued"
+    }
+
+
+def test_create_then_delete_drops_out(database, transaction):
+    kept = transaction.create("kept")
+    dropped = transaction.create("dropped")
+    transaction.delete(dropped)
+    transaction.commit()
+
+    assert logged(transaction) == [{"operation": "create", "key": kept, "value": "kept"}]
+    assert database.get_all() == ["kept"]
+
+
+def test_repeated_sets_of_stored_record_become_one_delta(database):
+    database.data = {0: {"title": "a", "status": "in_stock", "year": 1}}
+    transaction = database.begin_transaction()
+    transaction.set(0, {"title": "b", "status": "in_stock", "year": 1})
+    transaction.flush()
+    transaction.set_if(0, {"status": "in_stock"}, {"status": "issued"})
+    transaction.set(0, {"title": "b", "status": "issued", "year": 2})
+    transaction.commit()
+
+    assert logged(transaction) == [
+        {"operation": "set", "key": 0, "changes": {"title": "b", "status": "issued", "year": 2}}
+    ]
+
+
+def test_set_then_delete_logs_the_delete(database):
+    database.data = {0: "a"}
+    transaction = database.begin_transaction()
+    transaction.set(0, "b")
+    transaction.delete(0)
+    transaction.commit()
+
+    assert logged(transaction) == [{"operation": "delete", "key": 0}]
+    assert database.get(0) is None
+
+
+def test_keys_touched_by_predicates_are_not_coalesced(database):
+    database.data = {0: {"status": "in_stock"}}
+    transaction = database.begin_transaction()
+    transaction.set(0, {"status": "issued"})
+    transaction.update_where(lambda record: True, {"status": "lost"})
+    transaction.flush()
+    transaction.set_if(0, {"status": "lost"}, {"status": "found"})
+    transaction.commit()
+
+    assert len(logged(transaction)) == 3
+    assert database.get(0) == {"status": "found"}
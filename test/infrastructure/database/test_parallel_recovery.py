@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.parallel_recovery import fold_partitioned, parallel_fold
+from src.infrastructure.database.recovery import LogFold
+from src.infrastructure.database.segmented_wal import (
+    SegmentedWriteAheadLog,
+    load_chunk,
+    split_lines,
+)
+
+
+def write_random_history(database, seed: int, transactions: int = 40):
+    rng = random.Random(seed)
+    for _ in range(transactions):
+        transaction = database.begin_transaction()
+        live = [key for key in database.data]
+        for _ in range(rng.randint(1, 4)):
+            choice = rng.random()
+            if choice < 0.4 or not live:
+                live.append(transaction.create({"title": "t", "status": "in_stock"}))
+            elif choice < 0.9:
+                key = rng.choice(live)
+                transaction.set(key, {"title": "t", "status": rng.choice(["issued", "in_stock"])})
+            else:
+                key = live.pop(rng.randrange(len(live)))
+                transaction.delete(key)
+        transaction.commit()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_replay_matches_sequential(tmp_path, seed):
+    wal = SegmentedWriteAheadLog(str(tmp_path), segment_size=400, background=False)
+    write_random_history(SimpleDatabase(wal), seed)
+    assert len(wal.segments()) > 1
+
+    sequential = SimpleDatabase(SegmentedWriteAheadLog(str(tmp_path)))
+    sequential.sync()
+
+    parallel_wal = SegmentedWriteAheadLog(str(tmp_path), replay_workers=3, parallel_threshold=0)
+    parallel = SimpleDatabase(parallel_wal)
+    parallel.sync()
+
+    assert parallel.data == sequential.data
+    assert parallel.next_id == sequential.next_id
+    assert parallel.next_tid == sequential.next_tid
+    assert parallel.next_lsn == sequential.next_lsn
+
+
+def test_fold_partitioned_covers_all_keys():
+    records = [
+        (0, {i: {"operation": "create", "key": i, "value": {"n": i}} for i in range(10)}),
+        (1, {10: {"operation": "delete", "key": 3}}),
+    ]
+    partitions = fold_partitioned(records, 3)
+    assert sum(fold.transactions for fold in partitions) == 2
+    merged = LogFold()
+    for fold in partitions:
+        merged.then(fold)
+    assert merged.states == LogFold().add_all(records).states
+
+
+def test_parallel_fold_over_byte_chunks():
+    raw = b"".join(
+        b'{"tid": %d, "operations": {"%d": {"operation": "create", "key": %d, "value": 1}}}\n'
+        % (i, i, i)
+        for i in range(20)
+    )
+    chunks = split_lines(raw, 4)
+    assert b"".join(chunks) == raw
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+
+    fold = parallel_fold(chunks, load_chunk, 2)
+    assert sorted(fold.states) == list(range(20))
+    assert fold.max_tid == 19
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.recovery import Delta, LogFold, Tombstone, Value, recover
+from src.infrastructure.database.transaction import TransactionFactory
+from src.infrastructure.database.write_ahead_logger import SimpleWAL
+
+
+def random_log(seed: int, transactions: int = 60) -> list[tuple[int, dict]]:
+    rng = random.Random(seed)
+    log = []
+    live: set[int] = set()
+    next_key = 0
+    lsn = 0
+    for tid in range(transactions):
+        operations = {}
+        for _ in range(rng.randint(0, 5)):
+            choice = rng.random()
+            if choice < 0.3 or not live:
+                operations[lsn] = {
+                    "operation": "create",
+                    "key": next_key,
+                    "value": {"title": f"t{next_key}", "status": "in_stock"},
+                }
+                live.add(next_key)
+                next_key += 1
+            elif choice < 0.8:
+                key = rng.choice(sorted(live))
+                operations[lsn] = {
+                    "operation": "set",
+                    "key": key,
+                    "changes": {"status": rng.choice(["issued", "in_stock"]), "n": lsn},
+                }
+            else:
+                key = rng.choice(sorted(live))
+                operations[lsn] = {"operation": "delete", "key": key}
+                live.discard(key)
+            lsn += 1
+        log.append((tid, operations))
+    return log
+
+
+def sequential_replay(database, log):
+    for tid, operations in log:
+        TransactionFactory.create(tid, database, operations).commit(with_wal=False)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fold_matches_sequential_replay(seed):
+    log = random_log(seed)
+    expected = SimpleDatabase(SimpleWAL())
+    sequential_replay(expected, log)
+
+    database = SimpleDatabase(SimpleWAL())
+    recover(database, log)
+    assert database.data == expected.data
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fold_over_existing_snapshot(seed):
+    log = random_log(seed)
+    snapshot = SimpleDatabase(SimpleWAL())
+    sequential_replay(snapshot, log[: len(log) // 2])
+
+    expected = SimpleDatabase(SimpleWAL())
+    expected.data = dict(snapshot.data)
+    sequential_replay(expected, log[len(log) // 2 :])
+
+    database = SimpleDatabase(SimpleWAL())
+    database.data = dict(snapshot.data)
+    recover(database, log[len(log) // 2 :])
+    assert database.data == expected.data
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_split_folds_compose(seed):
+    log = random_log(seed)
+    whole = LogFold().add_all(log)
+    parts = [LogFold().add_all(log[i : i + 7]) for i in range(0, len(log), 7)]
+    combined = LogFold()
+    for part in parts:
+        combined.then(part)
+    assert combined.states == whole.states
+    assert combined.max_lsn == whole.max_lsn
+    assert combined.operations == whole.operations
+
+
+def test_fold_states():
+    fold = LogFold().add_all(
+        [
+            (0, {0: {"operation": "create", "key": 0, "value": {"a": 1}}}),
+            (1, {1: {"operation": "set", "key": 0, "changes": {"a": 2}}}),
+            (2, {2: {"operation": "set", "key": 1, "changes": {"b": 1}, "removed": ["c"]}}),
+            (3, {3: {"operation": "delete", "key": 2}}),
+        ]
+    )
+    assert fold.states == {
+        0: Value({"a": 2}),
+        1: Delta({"b": 1}, {"c"}),
+        2: Tombstone(),
+    }
+
+
+def test_recover_advances_counters_and_notifies():
+    database = SimpleDatabase(SimpleWAL())
+    touched = []
+    database.add_commit_listener(lambda keys: touched.extend(keys))
+    recover(database, [(4, {7: {"operation": "create", "key": 3, "value": "x"}})])
+    assert (database.next_tid, database.next_lsn, database.next_id) == (5, 8, 4)
+    assert touched == [3]
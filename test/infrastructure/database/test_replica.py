@@ -0,0 +1,101 @@
+import pytest
+
+from src.core.service.book_service import BookService
+from src.core.usecase import getBookUsecase
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.replica import JsonLogTail, ReplicaDatabase, SegmentLogTail
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+def book(title: str, status: str = "in_stock") -> dict:
+    return {"title": title, "author": "A", "year": 2000, "status": status}
+
+
+@pytest.fixture
+def json_primary(tmp_path):
+    return JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+
+
+def commit_create(database, *titles: str) -> list[int]:
+    transaction = database.begin_transaction()
+    keys = [transaction.create(book(title)) for title in titles]
+    transaction.commit()
+    return keys
+
+
+def test_replica_follows_json_wal(tmp_path, json_primary):
+    commit_create(json_primary, "a", "b")
+    replica = ReplicaDatabase(str(tmp_path / "db.json"), JsonLogTail(str(tmp_path / "wal.json")))
+    assert replica.data == json_primary.data
+
+    transaction = json_primary.begin_transaction()
+    transaction.set(0, book("a", "issued"))
+    transaction.delete(1)
+    transaction.commit()
+    commit_create(json_primary, "c")
+
+    assert replica.replay_lag > 0
+    replica.sync()
+
+    assert replica.data == json_primary.data
+    assert replica.replay_lag == 0
+
+
+def test_replica_lag_counts_unapplied_lsns(tmp_path, json_primary):
+    replica = ReplicaDatabase(str(tmp_path / "db.json"), JsonLogTail(str(tmp_path / "wal.json")))
+    for title in "abc":
+        commit_create(json_primary, title)
+
+    replica.sync(limit=1)
+
+    assert replica.applied_lsn == 0
+    assert replica.replay_lag == 2
+    replica.sync()
+    assert sorted(replica.data) == [0, 1, 2]
+
+
+def test_replica_follows_segments_across_rotation(tmp_path):
+    segments = str(tmp_path / "segments")
+    wal = SegmentedWriteAheadLog(segments, segment_size=200, background=False)
+    primary = JsonDatabase(str(tmp_path / "db.json"), wal)
+    replica = ReplicaDatabase(str(tmp_path / "db.json"), SegmentLogTail(segments))
+
+    for step in range(5):
+        commit_create(primary, f"t{step}", f"u{step}")
+        if step % 2:
+            replica.sync()
+    replica.sync()
+
+    assert len(wal.segments()) > 1
+    assert replica.data == primary.data
+
+
+def test_replica_rejects_writes(tmp_path, json_primary):
+    commit_create(json_primary, "a")
+    replica = ReplicaDatabase(str(tmp_path / "db.json"), JsonLogTail(str(tmp_path / "wal.json")))
+
+    with pytest.raises(PermissionError):
+        replica.begin_transaction().set(0, book("b"))
+    with pytest.raises(PermissionError):
+        replica.create(book("b"))
+    with pytest.raises(PermissionError):
+        replica.wal.write_log(replica.begin_transaction())
+
+
+def test_get_book_usecase_served_from_replica_invalidates_cache(tmp_path, json_primary):
+    commit_create(json_primary, "a")
+    replica = ReplicaDatabase(str(tmp_path / "db.json"), JsonLogTail(str(tmp_path / "wal.json")))
+    cache: LRUCache = LRUCache(16)
+    replica.add_commit_listener(cache.invalidate)
+    usecase = getBookUsecase(service=BookService(repository=BookRepository(cache=cache)))
+    assert usecase.execute(0, replica.begin_transaction()).status == "in_stock"
+
+    transaction = json_primary.begin_transaction()
+    transaction.set(0, book("a", "issued"))
+    transaction.commit()
+    replica.sync()
+
+    assert usecase.execute(0, replica.begin_transaction()).status == "issued"
@@ -0,0 +1,112 @@
+import pytest
+
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.segmented_wal import (
+    ACTIVE_SEGMENT,
+    Segment,
+    SegmentedWriteAheadLog,
+)
+
+
+@pytest.fixture
+def wal_dir(tmp_path):
+    return tmp_path / "wal"
+
+
+def commit_values(database, *values):
+    transaction = database.begin_transaction()
+    for value in values:
+        transaction.create(value=value)
+    transaction.commit()
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma", None])
+def test_rotation_and_replay(wal_dir, compression):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1, compression=compression)
+    database = SimpleDatabase(wal)
+    commit_values(database, "a", "b")
+    commit_values(database, "c")
+    wal.wait()
+
+    segments = wal.segments()
+    assert [(s.first_lsn, s.last_lsn) for s in segments] == [(0, 1), (2, 2)]
+    assert all(s.compressed == (compression is not None) for s in segments)
+    assert not (wal_dir / ACTIVE_SEGMENT).exists()
+
+    restored = SimpleDatabase(SegmentedWriteAheadLog(str(wal_dir), compression=compression))
+    restored.sync()
+    assert restored.get_all() == ["a", "b", "c"]
+    assert restored.next_id == 3
+
+
+def test_active_segment_survives_reopen(wal_dir):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1024 * 1024)
+    database = SimpleDatabase(wal)
+    commit_values(database, "a")
+    assert wal.segments() == []
+
+    reopened = SegmentedWriteAheadLog(str(wal_dir), segment_size=1024 * 1024)
+    assert reopened._first_lsn == 0 and reopened._last_lsn == 0
+    assert reopened.get_log() == wal.get_log()
+
+
+def test_torn_tail_is_ignored(wal_dir):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1024 * 1024)
+    commit_values(SimpleDatabase(wal), "a")
+    with open(wal_dir / ACTIVE_SEGMENT, "a") as f:
+        f.write('{"tid": 1, "operat')
+
+    database = SimpleDatabase(SegmentedWriteAheadLog(str(wal_dir)))
+    database.sync()
+    assert database.get_all() == ["a"]
+
+
+def test_torn_tail_is_truncated_before_new_appends(wal_dir):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1024 * 1024)
+    commit_values(SimpleDatabase(wal), "a")
+    with open(wal_dir / ACTIVE_SEGMENT, "a") as f:
+        f.write('{"tid": 1, "operat')
+
+    database = SimpleDatabase(SegmentedWriteAheadLog(str(wal_dir), segment_size=1024 * 1024))
+    database.sync()
+    commit_values(database, "b")
+
+    reopened = SimpleDatabase(SegmentedWriteAheadLog(str(wal_dir)))
+    reopened.sync()
+    assert reopened.get_all() == ["a", "b"]
+    assert reopened.wal._last_lsn == 1
+
+
+def test_segments_before_checkpoint_are_skipped(wal_dir):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1, background=False)
+    database = SimpleDatabase(wal)
+    commit_values(database, "a")
+    commit_values(database, "b")
+
+    restored = SimpleDatabase(SegmentedWriteAheadLog(str(wal_dir)))
+    restored.checkpoint_lsn = 1
+    restored.sync()
+    assert restored.get_all() == ["b"]
+
+
+def test_segment_name_round_trip(tmp_path):
+    path = tmp_path / (Segment.name(5, 17) + ".zz")
+    segment = Segment.parse(path)
+    assert segment == Segment(path, 5, 17)
+    assert segment.compressed
+    assert Segment.parse(tmp_path / "wal.json") is None
+
+
+def test_clear_log(wal_dir):
+    wal = SegmentedWriteAheadLog(str(wal_dir), segment_size=1)
+    database = SimpleDatabase(wal)
+    commit_values(database, "a")
+    commit_values(database, "b")
+    wal.clear_log()
+    assert wal.get_log() == {}
+    assert list(wal_dir.iterdir()) == []
+
+
+def test_invalid_compression(wal_dir):
+    with pytest.raises(ValueError):
+        SegmentedWriteAheadLog(str(wal_dir), compression="brotli")
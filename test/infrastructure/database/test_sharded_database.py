@@ -0,0 +1,162 @@
+import json
+
+import pytest
+
+from src.infrastructure.database.reshard import reshard
+from src.infrastructure.database.sharded_database import (
+    COORDINATOR_LOG,
+    ShardedDatabase,
+    ShardedTransaction,
+)
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "shards")
+
+
+def test_transaction_routes_keys_to_shards(directory):
+    database = ShardedDatabase(directory, 3)
+    transaction = database.begin_transaction()
+    keys = [transaction.create({"title": f"t{i}"}) for i in range(6)]
+    transaction.commit()
+
+    assert keys == list(range(6))
+    for key in keys:
+        assert database.shard(key).data[key] == {"title": f"t{key}"}
+        assert key % 3 == database.shard_index(key)
+    assert sorted(database.data) == keys
+
+
+def test_reopen_replays_every_shard(directory):
+    database = ShardedDatabase(directory, 2)
+    with database.begin_transaction() as transaction:
+        first = transaction.create({"title": "a"})
+        second = transaction.create({"title": "b"})
+    with database.begin_transaction() as transaction:
+        transaction.set(first, {"title": "a2"})
+        transaction.delete(second)
+
+    reopened = ShardedDatabase(directory, 2)
+
+    assert reopened.data == {first: {"title": "a2"}}
+    assert reopened.begin_transaction().create({"title": "c"}) == 2
+
+
+def test_single_shard_transaction_skips_coordinator(directory):
+    database = ShardedDatabase(directory, 2)
+    transaction = database.begin_transaction()
+    transaction.create({"title": "a"})
+    transaction.commit()
+
+    assert database.shards[0].wal.get_log()
+    assert not database.shards[1].wal.get_log()
+    assert database.wal.get_log() == {}
+
+
+def test_failed_prepare_rolls_back_every_shard(directory):
+    database = ShardedDatabase(directory, 2)
+    with database.begin_transaction() as transaction:
+        transaction.create({"title": "a"})
+    transaction = database.begin_transaction()
+    transaction.set(0, {"title": "changed"})
+    transaction.set(1, {"title": "missing"})
+    transaction.commit()
+
+    assert database.data == {0: {"title": "a"}}
+    assert database.wal.get_log() == {}
+    assert len(database.shards[0].wal.get_log()) == 1
+
+
+def test_pending_intent_is_completed_on_open(directory, tmp_path):
+    database = ShardedDatabase(directory, 2)
+    transaction = database.begin_transaction()
+    transaction.create({"title": "a"})
+    transaction.create({"title": "b"})
+    transaction.flush()
+    database.wal.write_log(transaction)
+    # Crash after the first participant made its commit durable.
+    transaction._subs[0].commit()
+
+    reopened = ShardedDatabase(directory, 2)
+
+    assert reopened.data == {0: {"title": "a"}, 1: {"title": "b"}}
+    assert reopened.wal.get_log() == {}
+    assert len(reopened.shards[0].wal.get_log()) == 1
+    with open(tmp_path / "shards" / COORDINATOR_LOG) as f:
+        assert json.load(f) == {}
+
+
+def test_replayed_intent_advances_the_counters(directory):
+    database = ShardedDatabase(directory, 2)
+    transaction = database.begin_transaction()
+    transaction.create({"title": "a"})
+    transaction.create({"title": "b"})
+    transaction.flush()
+    database.wal.write_log(transaction)
+    replayed = transaction._subs[1]
+
+    reopened = ShardedDatabase(directory, 2)
+
+    shard = reopened.shards[1]
+    assert shard._next_tid > replayed.tid
+    assert shard._next_lsn > max(replayed.to_dict()[replayed.tid])
+    assert reopened._next_tid > transaction.tid
+    assert reopened.begin_transaction().create({"title": "c"}) == 2
+
+
+def test_failed_participant_keeps_the_intent(directory, monkeypatch):
+    database = ShardedDatabase(directory, 2)
+    transaction = database.begin_transaction()
+    transaction.create({"title": "a"})
+    transaction.create({"title": "b"})
+
+    def fail(transaction):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(database.shards[1].wal, "write_log", fail)
+
+    assert transaction.commit() is False
+    assert transaction.tid in database.wal.get_log()
+    monkeypatch.undo()
+    assert ShardedDatabase(directory, 2).data == {0: {"title": "a"}, 1: {"title": "b"}}
+
+
+def test_transaction_is_rebuilt_from_its_intent(directory):
+    database = ShardedDatabase(directory, 2)
+    transaction = database.begin_transaction()
+    transaction.create({"title": "a"})
+    transaction.create({"title": "b"})
+    transaction.flush()
+    [intent] = transaction.to_dict().values()
+
+    rebuilt = ShardedTransaction.from_dict(transaction.tid, database, intent)
+
+    assert sorted(rebuilt._subs) == [0, 1]
+    assert rebuilt.commit() is True
+    assert database.data == {0: {"title": "a"}, 1: {"title": "b"}}
+
+
+def test_shard_count_mismatch_raises(directory):
+    ShardedDatabase(directory, 2)
+
+    with pytest.raises(ValueError, match="resharding"):
+        ShardedDatabase(directory, 3)
+
+
+def test_reshard_preserves_records_and_ids(directory):
+    database = ShardedDatabase(directory, 2)
+    with database.begin_transaction() as transaction:
+        for i in range(7):
+            transaction.create({"title": f"t{i}"})
+    with database.begin_transaction() as transaction:
+        transaction.delete(3)
+
+    assert reshard(directory, 3) == 6
+
+    resharded = ShardedDatabase(directory, 3)
+    assert resharded.data == {i: {"title": f"t{i}"} for i in range(7) if i != 3}
+    assert all(
+        key % 3 == index for index, shard in enumerate(resharded.shards) for key in shard.data
+    )
+    assert resharded.begin_transaction().create({"title": "new"}) == 7
@@ -0,0 +1,107 @@
+import pytest
+
+from src.core.domain.predicate import Where
+from src.infrastructure.database.json_database import JsonDatabase, SimpleDatabase
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.transaction import Transaction
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
+
+
+def book(i: int, status: str = "in_stock") -> dict:
+    return {"title": f"t{i}", "author": "A", "year": 1900 + i, "status": status}
+
+
+def spilling(database, tmp_path, threshold: int = 4):
+    database.spill_threshold = threshold
+    database.spill_dir = str(tmp_path)
+    return database
+
+
+@pytest.fixture
+def database(tmp_path):
+    return spilling(SimpleDatabase(SimpleWAL()), tmp_path)
+
+
+def test_oversized_transaction_spills_and_reads_back(database):
+    transaction = Transaction(database.next_tid, database)
+    keys = [transaction.create(book(i)) for i in range(10)]
+
+    assert transaction._spill is not None and transaction._spill.spills == 2
+    assert len(transaction._operations) == 2
+    assert transaction.get(keys[0]) == book(0)
+    transaction.flush()
+    assert len(transaction.get_all()) == 10
+    assert database.data == {}
+
+    transaction.commit()
+
+    assert database.data == {key: book(i) for i, key in enumerate(keys)}
+
+
+def test_spilled_records_are_updated_and_matched(database):
+    seed = Transaction(database.next_tid, database)
+    for i in range(3):
+        seed.create(book(i))
+    seed.commit()
+
+    transaction = Transaction(database.next_tid, database)
+    transaction.set(0, book(0, "issued"))
+    transaction.delete(1)
+    transaction.create(book(3, "issued"))
+    transaction.create(book(4))
+
+    assert transaction.get(1) is None
+    assert transaction.delete_where(Where.of(status="issued")) == [0, 3]
+    transaction.commit()
+
+    assert sorted(database.data) == [2, 4]
+
+
+def test_rollback_discards_the_spill_file(database):
+    transaction = Transaction(database.next_tid, database)
+    for i in range(6):
+        transaction.create(book(i))
+    transaction.rollback()
+
+    assert transaction._spill is None
+    assert transaction.get_all() == []
+
+
+@pytest.mark.parametrize("segmented", [True, False])
+def test_spilled_operations_reach_the_wal(tmp_path, segmented):
+    def open_database():
+        if segmented:
+            wal = SegmentedWriteAheadLog(str(tmp_path / "wal"))
+        else:
+            wal = WriteAheadLog(str(tmp_path / "wal.json"))
+        return spilling(JsonDatabase(str(tmp_path / "db.json"), wal), tmp_path)
+
+    database = open_database()
+    transaction = Transaction(database.next_tid, database)
+    for i in range(9):
+        transaction.create(book(i))
+    transaction.commit()
+
+    assert transaction._spill is None
+    assert len(database.wal.get_log()[transaction.tid]) == 9
+    assert open_database().data == database.data
+
+
+@pytest.mark.parametrize("segmented", [True, False])
+def test_next_transaction_keeps_the_spilled_commit(tmp_path, segmented):
+    def open_database():
+        if segmented:
+            wal = SegmentedWriteAheadLog(str(tmp_path / "wal"))
+        else:
+            wal = WriteAheadLog(str(tmp_path / "wal.json"))
+        return spilling(JsonDatabase(str(tmp_path / "db.json"), wal), tmp_path)
+
+    database = open_database()
+    transaction = database.begin_transaction()
+    for i in range(9):
+        transaction.create(book(i))
+    assert transaction.commit()
+    database.begin_transaction()
+
+    assert len(database.wal.get_log()[transaction.tid]) == 9
+    assert len(open_database().get_all()) == 9
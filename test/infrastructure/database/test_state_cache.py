@@ -0,0 +1,116 @@
+import json
+
+from src.infrastructure.database import json_database
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.recovery import LogFold
+from src.infrastructure.database.segmented_wal import SegmentedWriteAheadLog
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+
+
+def open_database(tmp_path) -> JsonDatabase:
+    return JsonDatabase(
+        str(tmp_path / "db.json"),
+        WriteAheadLog(str(tmp_path / "wal.json")),
+        state_cache_filepath=str(tmp_path / "db.cache"),
+    )
+
+
+def fail_json_load(monkeypatch) -> None:
+    def load(*args, **kwargs):
+        raise AssertionError("the snapshot was parsed")
+
+    monkeypatch.setattr(json_database.json, "load", load)
+
+
+def test_valid_cache_skips_parsing_and_replay(tmp_path, monkeypatch, commit):
+    database = open_database(tmp_path)
+    commit(database, {"n": 0})
+    database.checkpoint()
+    open_database(tmp_path)
+    recovered = []
+
+    def recover(database, records):
+        recovered.extend(records)
+        return LogFold()
+
+    monkeypatch.setattr(json_database, "recover", recover)
+    # The WAL is read by its own constructor before the database loads.
+    wal = WriteAheadLog(str(tmp_path / "wal.json"))
+    fail_json_load(monkeypatch)
+
+    reopened = JsonDatabase(
+        str(tmp_path / "db.json"), wal, state_cache_filepath=str(tmp_path / "db.cache")
+    )
+
+    assert reopened.data == {0: {"n": 0}}
+    assert reopened._next_lsn == database._next_lsn
+    assert recovered == []
+
+
+def test_cache_replays_only_the_wal_written_after_it(tmp_path, monkeypatch, commit):
+    database = open_database(tmp_path)
+    commit(database, {"n": 0})
+    database = open_database(tmp_path)
+    commit(database, {"n": 1})
+    wal = WriteAheadLog(str(tmp_path / "wal.json"))
+    fail_json_load(monkeypatch)
+
+    reopened = JsonDatabase(
+        str(tmp_path / "db.json"), wal, state_cache_filepath=str(tmp_path / "db.cache")
+    )
+
+    assert reopened.data == {0: {"n": 0}, 1: {"n": 1}}
+    assert reopened._next_id == 2
+
+
+def test_changed_snapshot_invalidates_the_cache(tmp_path):
+    open_database(tmp_path).create({"n": 0})
+    open_database(tmp_path)
+    snapshot = json.loads((tmp_path / "db.json").read_text())
+    snapshot["data"] = {"0": {"n": 5}}
+    (tmp_path / "db.json").write_text(json.dumps(snapshot))
+
+    assert open_database(tmp_path).data == {0: {"n": 5}}
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    open_database(tmp_path).create({"n": 0})
+    (tmp_path / "db.cache").write_bytes(b"not a pickle")
+
+    assert open_database(tmp_path).data == {0: {"n": 0}}
+    assert open_database(tmp_path).data == {0: {"n": 0}}
+
+
+def test_cache_keeps_records_waiting_for_a_delta_checkpoint(tmp_path, monkeypatch, commit):
+    def open_segmented():
+        wal = SegmentedWriteAheadLog(str(tmp_path / "wal"), segment_size=1, background=False)
+        return JsonDatabase(
+            str(tmp_path / "db.json"),
+            wal,
+            delta_merge_ratio=1000.0,
+            state_cache_filepath=str(tmp_path / "db.cache"),
+        )
+
+    commit(open_segmented(), {"n": 0})
+    monkeypatch.setattr(json_database, "STATE_CACHE_REFRESH", 0)
+    open_segmented()
+    database = open_segmented()
+
+    database.checkpoint()
+    (tmp_path / "db.cache").unlink()
+
+    assert open_segmented().data == {0: {"n": 0}}
+
+
+def test_truncated_wal_invalidates_the_cache(tmp_path, monkeypatch, commit):
+    database = open_database(tmp_path)
+    commit(database, {"n": 0})
+    database.checkpoint()
+    commit(database, {"n": 1})
+    # Saves the cache again with the replayed record in it.
+    monkeypatch.setattr(json_database, "STATE_CACHE_REFRESH", 1)
+    open_database(tmp_path)
+    # The WAL is swapped for an older copy that ends before the cached state.
+    (tmp_path / "wal.json").write_text("{}")
+
+    assert open_database(tmp_path).data == {0: {"n": 0}}
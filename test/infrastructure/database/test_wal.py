@@ -115,3 +115,33 @@ def test_sync_with_many_transactions(database):
         "test1_transaction_2",
         "test2_transaction_2",
     ]
+
+
+def test_sync_advances_counters(wal, log_filepath):
+    database = SimpleDatabase(wal)
+    transaction = database.begin_transaction()
+    transaction.create(value="test1")
+    transaction.create(value="test2")
+    transaction.commit()
+
+    database = SimpleDatabase(WriteAheadLog(log_filepath))
+    database.sync()
+    assert database.next_id == 2
+    assert database.next_tid == 1
+    assert database.next_lsn == 2
+
+
+def test_sync_with_delta_records(database):
+    transaction = database.begin_transaction()
+    key = transaction.create(value={"title": "t", "status": "in_stock"})
+    transaction.commit()
+    transaction = database.begin_transaction()
+    transaction.set(key=key, value={"title": "t", "status": "issued"})
+    transaction.commit()
+
+    assert database.wal.get_log()[1] == {
+        1: {"operation": "set", "key": key, "changes": {"status": "issued"}}
+    }
+    database.data = {}
+    database.sync()
+    assert database.get(key) == {"title": "t", "status": "issued"}
@@ -0,0 +1,101 @@
+import pytest
+
+from src.core.domain.book import BookStatus
+from src.core.dto.book_dto import BookDTO
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.database.json_database import SimpleDatabase
+from src.infrastructure.database.write_ahead_logger import SimpleWAL, WriteAheadLog
+
+
+@pytest.fixture
+def cache():
+    return LRUCache(max_size=2, collect_stats=True)
+
+
+@pytest.fixture
+def database(cache):
+    database = SimpleDatabase(SimpleWAL())
+    database.add_commit_listener(cache.invalidate)
+    return database
+
+
+@pytest.fixture
+def repository(cache):
+    return BookRepository(cache=cache)
+
+
+def create_book(database, repository, title="title") -> int:
+    session = database.begin_transaction()
+    book_id = repository.create(BookDTO(title, "author", 1950, BookStatus.IN_STOCK), session)
+    session.commit()
+    return book_id
+
+
+def test_lru_eviction(cache):
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert 2 not in cache
+    assert 1 in cache and 3 in cache
+    assert cache.stats.evictions == 1
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(max_size=0)
+
+
+def test_repository_hits_cache(database, repository, cache):
+    book_id = create_book(database, repository)
+    session = database.begin_transaction()
+    first = repository.get(book_id, session)
+    first.status = BookStatus.ISSUED
+    second = repository.get(book_id, session)
+    assert first is not second
+    assert second.status == BookStatus.IN_STOCK
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+def test_commit_invalidates_touched_keys(database, repository, cache):
+    first_id = create_book(database, repository, "first")
+    second_id = create_book(database, repository, "second")
+    session = database.begin_transaction()
+    repository.get(first_id, session)
+    repository.get(second_id, session)
+
+    session = database.begin_transaction()
+    repository.update(first_id, BookDTO("first", "author", 1950, BookStatus.ISSUED), session)
+    session.commit()
+
+    assert first_id not in cache
+    assert second_id in cache
+    book = repository.get(first_id, database.begin_transaction())
+    assert book.status == BookStatus.ISSUED
+
+
+def test_replay_invalidates(tmp_path, cache):
+    wal = WriteAheadLog(tmp_path / "wal.json")
+    database = SimpleDatabase(wal)
+    transaction = database.begin_transaction()
+    transaction.create(value={"title": "new"})
+    transaction.commit()
+
+    database.add_commit_listener(cache.invalidate)
+    cache.put(0, "stale")
+    database.sync()
+    assert 0 not in cache
+
+
+def test_spilled_writes_bypass_the_cache(database, repository):
+    book_id = create_book(database, repository)
+    repository.get(book_id, database.begin_transaction())
+
+    session = database.begin_transaction()
+    repository.update(book_id, BookDTO("title", "author", 1950, BookStatus.ISSUED), session)
+    session.spill()
+
+    assert book_id not in session._temp_data
+    assert repository.get(book_id, session).status == BookStatus.ISSUED
@@ -0,0 +1,60 @@
+import json
+
+from src.infrastructure import metrics
+from src.infrastructure.metrics import Histogram, MetricsRegistry, timed
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(2.0)
+    assert histogram.counts == [2, 0, 1]
+    assert histogram.count == 3
+
+
+def test_prometheus_export():
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("wal_bytes_written_total", 10)
+    registry.observe("transaction_commit_seconds", 0.002)
+    text = registry.to_prometheus()
+    assert "bookstorage_wal_bytes_written_total 10" in text
+    assert 'bookstorage_transaction_commit_seconds_bucket{le="+Inf"} 1' in text
+    assert "bookstorage_transaction_commit_seconds_count 1" in text
+
+
+def test_persist_and_merge(tmp_path):
+    filepath = tmp_path / "metrics.json"
+    registry = MetricsRegistry(enabled=True)
+    registry.attach(str(filepath))
+    registry.inc("records", 2)
+    registry.observe("latency", 0.5)
+    registry.flush()
+
+    restored = MetricsRegistry(enabled=True)
+    restored.attach(str(filepath))
+    restored.inc("records", 1)
+    assert restored.counters["records"] == 3
+    assert restored.histograms["latency"].count == 1
+    assert json.loads(restored.to_json())["counters"]["records"] == 3
+
+
+def test_disabled_timed_returns_original(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS", MetricsRegistry(enabled=False))
+
+    def func():
+        return 1
+
+    assert timed("func_seconds")(func) is func
+
+
+def test_enabled_timed_observes(monkeypatch):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr(metrics, "METRICS", registry)
+
+    @timed("func_seconds")
+    def func():
+        return 1
+
+    assert func() == 1
+    assert registry.histograms["func_seconds"].count == 1
@@ -0,0 +1,134 @@
+import os
+import signal
+from multiprocessing import Pipe
+
+import pytest
+
+from src.core.service.book_service import BookService
+from src.core.usecase import (
+    addBookUsecase,
+    deleteBookUsecase,
+    getBooksUsecase,
+    getBookUsecase,
+    setBookStatusUsecase,
+)
+from src.infrastructure.book_repository import BookRepository
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.database.json_database import JsonDatabase
+from src.infrastructure.database.sharded_database import ShardedDatabase
+from src.infrastructure.database.write_ahead_logger import WriteAheadLog
+from src.infrastructure.prefork_server import PreforkClient, PreforkServer
+
+
+def open_database(tmp_path) -> JsonDatabase:
+    return JsonDatabase(str(tmp_path / "db.json"), WriteAheadLog(str(tmp_path / "wal.json")))
+
+
+def create_server(database) -> PreforkServer:
+    cache: LRUCache = LRUCache(64)
+    database.add_commit_listener(cache.invalidate)
+    service = BookService(repository=BookRepository(cache=cache))
+    return PreforkServer(
+        database,
+        addBookUsecase(service=service),
+        deleteBookUsecase(service=service),
+        getBookUsecase(service=service),
+        setBookStatusUsecase(service=service),
+        getBooksUsecase(service=service),
+        port=0,
+        workers=2,
+    )
+
+
+@pytest.fixture
+def address(tmp_path):
+    server = create_server(open_database(tmp_path))
+    address = server.bind()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            server.serve_forever()
+        finally:
+            os._exit(0)
+    yield address
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+def add(client: PreforkClient, title: str) -> int:
+    response = client.call("add", title=title, author="A", year=2000, status="in_stock")
+    assert response["ok"], response
+    return response["result"]
+
+
+def test_writes_are_visible_to_every_worker(address):
+    with PreforkClient(address) as writer:
+        first = add(writer, "a")
+        second = add(writer, "b")
+        assert writer.call("set_status", id=first, status="issued")["ok"]
+
+    for _ in range(6):
+        with PreforkClient(address) as reader:
+            assert reader.call("get", id=first)["result"]["status"] == "issued"
+            assert reader.call("get", id=second)["result"]["title"] == "b"
+
+
+def test_delete_and_batch_reads(address):
+    with PreforkClient(address) as client:
+        keys = [add(client, title) for title in "abc"]
+        assert client.call("delete", id=keys[1])["ok"]
+
+        response = client.call("get_many", ids=keys)
+
+    assert [item["error"] is None for item in response["result"]] == [True, False, True]
+    assert response["result"][0]["result"]["title"] == "a"
+
+
+def test_errors_are_reported(address):
+    with PreforkClient(address) as client:
+        assert client.call("get", id=42) == {"ok": False, "error": "Book with id 42 not found"}
+        assert not client.call("delete", id=42)["ok"]
+        assert client.call("search") == {"ok": False, "error": "Unknown command: search"}
+
+
+def test_writes_beyond_a_pipe_buffer_reach_idle_workers(address):
+    # Each write is broadcast to every worker, including ones idle in accept().
+    with PreforkClient(address) as writer:
+        keys = [add(writer, f"t{i}") for i in range(400)]
+
+    for _ in range(4):
+        with PreforkClient(address) as reader:
+            assert reader.call("get", id=keys[-1])["result"]["title"] == "t399"
+
+
+def test_writer_persists_to_the_wal(tmp_path, address):
+    with PreforkClient(address) as client:
+        key = add(client, "durable")
+
+    assert open_database(tmp_path).get(key)["title"] == "durable"
+
+
+def test_failed_commit_is_reported_to_the_client(tmp_path, monkeypatch):
+    database = open_database(tmp_path)
+    server = create_server(database)
+    server_end, client_end = Pipe()
+
+    def fail(transaction):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(database.wal, "write_log", fail)
+    client_end.send(
+        {"command": "add", "title": "t", "author": "A", "year": 2000, "status": "in_stock"}
+    )
+    server._serve_writer(server_end)
+
+    assert client_end.recv() == (
+        "response",
+        {"ok": False, "error": "Commit failed, the write was rolled back"},
+    )
+    assert database.get_all() == []
+
+
+def test_sharded_backend_is_rejected(tmp_path):
+    with pytest.raises(TypeError):
+        create_server(ShardedDatabase(str(tmp_path / "shards"), 2))
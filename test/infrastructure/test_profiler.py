@@ -0,0 +1,41 @@
+import io
+
+from src.infrastructure.profiler import Profiler, parse_profiling_arguments
+
+
+def test_inactive_phase_is_noop():
+    profiler = Profiler()
+    with profiler.phase("load"):
+        pass
+    assert profiler.phases == {}
+
+
+def test_nested_phases(tmp_path):
+    profiler = Profiler()
+    profiler.start(str(tmp_path), top=5)
+    try:
+        with profiler.phase("execute"):
+            sum(range(1000))
+            with profiler.phase("persist"):
+                data = [0] * 10_000
+            del data
+    finally:
+        profiler.stop()
+
+    assert profiler.phases["execute"].calls == 1
+    assert profiler.phases["persist"].calls == 1
+    assert profiler.phases["persist"].peak_bytes > 0
+    assert profiler.phases["execute"].peak_bytes >= profiler.phases["persist"].peak_bytes
+
+    stream = io.StringIO()
+    profiler.report(stream, "add")
+    assert "persist" in stream.getvalue()
+    assert (tmp_path / "add-execute.pstats").exists()
+    assert (tmp_path / "add-persist.pstats").exists()
+
+
+def test_parse_profiling_arguments():
+    options = parse_profiling_arguments(["--profile", "get", "1"])
+    assert options.profile
+    assert options.command == "get"
+    assert not parse_profiling_arguments(["get", "1"]).profile